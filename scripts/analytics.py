@@ -0,0 +1,413 @@
+#!/usr/bin/env python3
+"""
+Analytics - Incremental daily rollups over orchestrator logs.
+
+Streams memory/logs/events-*.jsonl, calls.jsonl and session-*.json into
+one columnar rollup file per day (memory/analytics/rollup-YYYY-MM-DD.json).
+Rows are grouped by source, kind, agent, model, project and status and hold
+counts, successes/failures and mergeable latency and turns-to-completion
+histograms, so percentiles over months of history only read the day files
+in range. JSONL sources are read from the byte offset reached last time;
+a session file is re-read only when it changes, and its previous
+contribution is subtracted first. A task index (memory/analytics/tasks.json)
+answers day and task_id lookups.
+
+Usage:
+    python scripts/analytics.py ingest
+    python scripts/analytics.py summary [YYYY-MM-DD] [--format json|shell]
+    python scripts/analytics.py query --days 30 --by agent,model [--source session --kind turn]
+    python scripts/analytics.py task <task_id>
+    python scripts/analytics.py day <YYYY-MM-DD>
+
+Environment:
+    CLAWD_HOME - Clawd directory (default: ~/clawd)
+"""
+
+import argparse
+import fcntl
+import json
+import math
+import os
+import sys
+import time
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+CLAWD_HOME = Path(os.environ.get("CLAWD_HOME", Path.home() / "clawd"))
+LOGS_DIR = CLAWD_HOME / "memory" / "logs"
+ANALYTICS_DIR = CLAWD_HOME / "memory" / "analytics"
+
+ROLLUP_VERSION = 1
+DIMENSIONS = ("source", "kind", "agent", "model", "project", "status")
+# Latency histogram buckets grow by 10%, so percentiles are within ~10%
+BUCKET_BASE = 1.1
+
+
+def latency_bucket(ms: float) -> int:
+    return 0 if ms <= 1 else math.ceil(math.log(ms, BUCKET_BASE))
+
+
+def bucket_upper(bucket: int) -> int:
+    return round(BUCKET_BASE ** bucket)
+
+
+def histogram_percentile(hist: dict, pct: float, upper=int):
+    """Value at the pct-th percentile of a {bucket: count} histogram."""
+    total = sum(hist.values())
+    if not total:
+        return None
+    rank = pct / 100 * total
+    seen = 0
+    for key in sorted(hist, key=int):
+        seen += hist[key]
+        if seen >= rank:
+            return upper(int(key))
+    return upper(int(max(hist, key=int)))
+
+
+def _new_metrics() -> dict:
+    return {"count": 0, "ok": 0, "failed": 0, "latency": {}, "turns": {}}
+
+
+def _add(metrics: dict, sign: int = 1, ok=None, latency_ms=None, turns=None):
+    metrics["count"] += sign
+    if ok is not None:
+        metrics["ok" if ok else "failed"] += sign
+    for field, key in (("latency", None if latency_ms is None else str(latency_bucket(latency_ms))),
+                       ("turns", None if turns is None else str(int(turns)))):
+        if key is None:
+            continue
+        hist = metrics[field]
+        hist[key] = hist.get(key, 0) + sign
+        if hist[key] <= 0:
+            del hist[key]
+
+
+# =============================================================================
+# Rollup storage
+# =============================================================================
+
+class DayRollup:
+    """One day's rows, stored column-wise on disk and keyed by dimensions in memory."""
+
+    def __init__(self, day: str, rows: dict = None):
+        self.day = day
+        self.rows = rows or {}
+
+    def row(self, **dims) -> dict:
+        key = tuple(str(dims.get(d) or "") for d in DIMENSIONS)
+        return self.rows.setdefault(key, _new_metrics())
+
+    def prune(self):
+        self.rows = {k: m for k, m in self.rows.items() if m["count"] > 0}
+
+    def to_columns(self) -> dict:
+        keys = sorted(self.rows)
+        columns = {d: [k[i] for k in keys] for i, d in enumerate(DIMENSIONS)}
+        for field in ("count", "ok", "failed", "latency", "turns"):
+            columns[field] = [self.rows[k][field] for k in keys]
+        return {"version": ROLLUP_VERSION, "day": self.day, "columns": columns}
+
+    @classmethod
+    def from_columns(cls, data: dict) -> "DayRollup":
+        columns = data["columns"]
+        rows = {}
+        for i in range(len(columns["count"])):
+            key = tuple(columns[d][i] for d in DIMENSIONS)
+            rows[key] = {f: columns[f][i] for f in ("count", "ok", "failed", "latency", "turns")}
+        return cls(data["day"], rows)
+
+    def records(self) -> list:
+        return [{**dict(zip(DIMENSIONS, key)), **metrics} for key, metrics in self.rows.items()]
+
+
+class Analytics:
+    """Incremental ingestion plus queries over the day rollups and task index."""
+
+    def __init__(self, logs_dir: Path = LOGS_DIR, root: Path = ANALYTICS_DIR):
+        self.logs_dir = Path(logs_dir)
+        self.root = Path(root)
+        self._days = {}
+        self._dirty = set()
+
+    # -- Storage ----------------------------------------------------------------
+
+    def _rollup_path(self, day: str) -> Path:
+        return self.root / f"rollup-{day}.json"
+
+    def _read_json(self, path: Path, default):
+        return json.loads(path.read_text()) if path.exists() else default
+
+    def _write_json(self, path: Path, data):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(data, separators=(",", ":")))
+        os.replace(tmp, path)
+
+    def day(self, day: str) -> DayRollup:
+        if day not in self._days:
+            data = self._read_json(self._rollup_path(day), None)
+            self._days[day] = DayRollup.from_columns(data) if data else DayRollup(day)
+        return self._days[day]
+
+    def _touch(self, day: str) -> DayRollup:
+        self._dirty.add(day)
+        return self.day(day)
+
+    @contextmanager
+    def _locked(self):
+        self.root.mkdir(parents=True, exist_ok=True)
+        with open(self.root / "ingest.lock", "w") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            yield
+
+    # -- Ingestion ----------------------------------------------------------------
+
+    def _read_new_lines(self, path: Path, offsets: dict):
+        """Complete JSON lines appended since the stored offset."""
+        name = path.name
+        offset = offsets.get(name, 0)
+        size = path.stat().st_size
+        if size < offset:
+            offset = 0  # Truncated or replaced
+        if size == offset:
+            return
+        with open(path, "rb") as f:
+            f.seek(offset)
+            data = f.read()
+        end = data.rfind(b"\n") + 1
+        offsets[name] = offset + end
+        for line in data[:end].splitlines():
+            try:
+                yield json.loads(line)
+            except ValueError:
+                continue
+
+    def _ingest_event(self, event: dict) -> bool:
+        kind = event.get("event")
+        day = str(event.get("timestamp", ""))[:10]
+        if not kind or len(day) != 10:
+            return False
+        ok = event.get("success")
+        if kind == "worker_response" and ok is None:
+            ok = event.get("exit_code") == 0
+        elif kind == "director_response":
+            ok = True
+        elif kind == "director_error":
+            ok = False
+        row = self._touch(day).row(
+            source="event", kind=kind, agent=event.get("agent"), model=event.get("model"),
+            project=event.get("project"), status=event.get("status") or event.get("severity"),
+        )
+        _add(row, ok=ok, latency_ms=event.get("latency_ms"))
+        return True
+
+    def _ingest_call(self, call: dict) -> bool:
+        day = str(call.get("timestamp", ""))[:10]
+        if len(day) != 10:
+            return False
+        row = self._touch(day).row(source="call", kind="call", agent=call.get("agent"),
+                                   model=call.get("model"), status=call.get("status"))
+        _add(row, ok=call.get("status") == "success", latency_ms=call.get("latency_ms"))
+        return True
+
+    def _apply_task(self, entry: dict, sign: int):
+        day = self._touch(entry["day"])
+        dims = {"model": entry.get("model"), "project": entry.get("project")}
+        _add(day.row(source="session", kind="task", status=entry.get("status"), **dims), sign,
+             ok=entry.get("status") == "complete", latency_ms=entry.get("duration_ms"), turns=entry.get("turns"))
+        for agent, ok, ms in entry.get("turn_detail", []):
+            _add(day.row(source="session", kind="turn", agent=agent, **dims), sign, ok=ok, latency_ms=ms)
+
+    def _task_entry(self, session: dict, name: str) -> dict:
+        end = session.get("end_time") or ""
+        entry = {
+            "day": end[:10],
+            "status": session.get("status"),
+            "project": session.get("project"),
+            "model": session.get("model"),
+            "turns": session.get("metrics", {}).get("total_turns", len(session.get("turns", []))),
+            "start_time": session.get("start_time"),
+            "end_time": end,
+            "file": name,
+            "turn_detail": [[t.get("agent"), bool(t.get("success")), t.get("duration_ms") or 0]
+                            for t in session.get("turns", [])],
+        }
+        try:
+            delta = datetime.fromisoformat(end) - datetime.fromisoformat(session["start_time"])
+            entry["duration_ms"] = int(delta.total_seconds() * 1000)
+        except (KeyError, TypeError, ValueError):
+            entry["duration_ms"] = None
+        return entry
+
+    def ingest(self) -> dict:
+        """Fold new log content into the rollups. Returns what was read."""
+        start = time.time()
+        counts = {"events": 0, "calls": 0, "sessions": 0}
+        with self._locked():
+            state = self._read_json(self.root / "state.json", {"offsets": {}, "sessions": {}})
+            index = self._read_json(self.root / "tasks.json", {"tasks": {}, "days": {}})
+
+            if self.logs_dir.is_dir():
+                for path in sorted(self.logs_dir.glob("events-*.jsonl")):
+                    counts["events"] += sum(self._ingest_event(e) for e in self._read_new_lines(path, state["offsets"]))
+                calls = self.logs_dir / "calls.jsonl"
+                if calls.exists():
+                    counts["calls"] += sum(self._ingest_call(c) for c in self._read_new_lines(calls, state["offsets"]))
+
+                for path in sorted(self.logs_dir.glob("session-*.json")):
+                    mtime = path.stat().st_mtime
+                    if state["sessions"].get(path.name) == mtime:
+                        continue
+                    try:
+                        session = json.loads(path.read_text())
+                    except ValueError:
+                        continue  # Partially written; picked up next time
+                    task_id = str(session.get("session_id") or path.stem[len("session-"):])
+                    entry = self._task_entry(session, path.name)
+                    if len(entry["day"]) != 10:
+                        continue
+                    previous = index["tasks"].get(task_id)
+                    if previous:
+                        self._apply_task(previous, -1)
+                        index["days"][previous["day"]].remove(task_id)
+                    self._apply_task(entry, 1)
+                    index["tasks"][task_id] = entry
+                    index["days"].setdefault(entry["day"], []).append(task_id)
+                    state["sessions"][path.name] = mtime
+                    counts["sessions"] += 1
+
+            for day in sorted(self._dirty):
+                rollup = self._days[day]
+                rollup.prune()
+                self._write_json(self._rollup_path(day), rollup.to_columns())
+            self._dirty.clear()
+            if counts["sessions"]:
+                self._write_json(self.root / "tasks.json", index)
+            self._write_json(self.root / "state.json", state)
+
+        counts["ms"] = int((time.time() - start) * 1000)
+        return counts
+
+    # -- Queries ------------------------------------------------------------------
+
+    def records(self, start: str, end: str) -> list:
+        """All rollup rows for days in [start, end], each with its day."""
+        rows = []
+        day, last = date.fromisoformat(start), date.fromisoformat(end)
+        while day <= last:
+            if self._rollup_path(day.isoformat()).exists():
+                rows.extend({"day": day.isoformat(), **r} for r in self.day(day.isoformat()).records())
+            day += timedelta(days=1)
+        return rows
+
+    def query(self, start: str, end: str, by: tuple = ("agent",), **filters) -> list:
+        """Aggregate rows matching filters (e.g. source="session", kind="turn") by dimensions."""
+        groups = {}
+        for r in self.records(start, end):
+            if any(r.get(k) != v for k, v in filters.items()):
+                continue
+            metrics = groups.setdefault(tuple(r[d] for d in by), _new_metrics())
+            for field in ("count", "ok", "failed"):
+                metrics[field] += r[field]
+            for field in ("latency", "turns"):
+                for k, v in r[field].items():
+                    metrics[field][k] = metrics[field].get(k, 0) + v
+
+        results = []
+        for key, m in sorted(groups.items()):
+            known = m["ok"] + m["failed"]
+            results.append({
+                **dict(zip(by, key)),
+                "count": m["count"],
+                "success_rate": round(m["ok"] / known, 3) if known else None,
+                "p50_ms": histogram_percentile(m["latency"], 50, bucket_upper),
+                "p90_ms": histogram_percentile(m["latency"], 90, bucket_upper),
+                "p99_ms": histogram_percentile(m["latency"], 99, bucket_upper),
+                "p50_turns": histogram_percentile(m["turns"], 50),
+                "p90_turns": histogram_percentile(m["turns"], 90),
+            })
+        return results
+
+    def _index(self) -> dict:
+        return self._read_json(self.root / "tasks.json", {"tasks": {}, "days": {}})
+
+    def task(self, task_id: str) -> dict:
+        return self._index()["tasks"].get(task_id)
+
+    def tasks_on(self, day: str) -> list:
+        index = self._index()
+        return [{"task_id": t, **index["tasks"][t]} for t in index["days"].get(day, [])]
+
+    def daily_summary(self, day: str) -> dict:
+        """Counts for morning-summary.sh."""
+        summary = {"completed": 0, "escalated": 0, "halted": 0, "max_turns": 0,
+                   "director_turns": 0, "worker_calls": 0, "checkpoints": 0, "errors": 0}
+        statuses = {"complete": "completed", "escalated": "escalated", "halted": "halted", "max_turns": "max_turns"}
+        for r in self.records(day, day):
+            if r["source"] == "session" and r["kind"] == "task" and r["status"] in statuses:
+                summary[statuses[r["status"]]] += r["count"]
+            elif r["source"] == "event":
+                if r["kind"] == "director_call":
+                    summary["director_turns"] += r["count"]
+                elif r["kind"] == "worker_call":
+                    summary["worker_calls"] += r["count"]
+                elif r["kind"] == "checkpoint":
+                    summary["checkpoints"] += r["count"]
+                elif r["kind"] in ("worker_response", "director_error"):
+                    summary["errors"] += r["failed"]
+        return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Daily rollups over orchestrator logs")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("ingest", help="Fold new log content into the rollups")
+    s = sub.add_parser("summary", help="One day's counts for the morning summary")
+    s.add_argument("day", nargs="?", default=date.today().isoformat())
+    s.add_argument("--format", choices=["json", "shell"], default="json")
+    q = sub.add_parser("query", help="Aggregate stats over a range of days")
+    q.add_argument("--days", type=int, default=7)
+    q.add_argument("--by", default="agent", help=f"Comma-separated dimensions from {', '.join(DIMENSIONS)}")
+    for dim in DIMENSIONS:
+        q.add_argument(f"--{dim}", help=f"Only rows with this {dim}")
+    t = sub.add_parser("task", help="Look up one task")
+    t.add_argument("task_id")
+    d = sub.add_parser("day", help="List tasks that finished on a day")
+    d.add_argument("day")
+    args = parser.parse_args()
+
+    analytics = Analytics()
+    ingested = analytics.ingest()
+    if args.command == "ingest":
+        print(json.dumps(ingested))
+    elif args.command == "summary":
+        summary = analytics.daily_summary(args.day)
+        if args.format == "shell":
+            for key, value in summary.items():
+                print(f"{key.upper()}={value}")
+        else:
+            print(json.dumps(summary, indent=2))
+    elif args.command == "query":
+        by = tuple(args.by.split(","))
+        unknown = set(by) - set(DIMENSIONS)
+        if unknown:
+            parser.error(f"Unknown dimension(s): {', '.join(sorted(unknown))}")
+        end = date.today()
+        filters = {dim: getattr(args, dim) for dim in DIMENSIONS if getattr(args, dim) is not None}
+        for row in analytics.query((end - timedelta(days=args.days - 1)).isoformat(), end.isoformat(), by, **filters):
+            print(json.dumps(row))
+    elif args.command == "task":
+        entry = analytics.task(args.task_id)
+        if entry is None:
+            print(f"[ERROR] Unknown task: {args.task_id}", file=sys.stderr)
+            sys.exit(1)
+        print(json.dumps(entry, indent=2))
+    elif args.command == "day":
+        for entry in analytics.tasks_on(args.day):
+            print(f"{entry['task_id']}  {entry['status']}  {entry['turns']} turns  {entry.get('project') or '-'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Benchmark fixed vs dynamic num_ctx on representative worker prompts.
+
+Sends each prompt to Ollama twice - once with the old fixed 32768 context,
+once with the bucket chosen by context_sizing - and reports load, prompt
+eval and generation timings per mode.
+
+Usage:
+    python scripts/bench_num_ctx.py                 # Run against OLLAMA_URL
+    python scripts/bench_num_ctx.py --dry-run       # Show bucket choices only
+    python scripts/bench_num_ctx.py --rounds 3 --output bench.json
+
+Environment:
+    OLLAMA_URL - Worker endpoint (default: http://localhost:11434)
+    CLAWD_MODEL - Model to benchmark (default: qwen-coder-16k)
+    CLAWD_HOME - Clawd directory (default: ~/clawd)
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+import urllib.request
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+import context_sizing
+
+OLLAMA_URL = os.environ.get("OLLAMA_URL", "http://localhost:11434")
+WORKER_MODEL = os.environ.get("CLAWD_MODEL", "qwen-coder-16k")
+CLAWD_HOME = Path(os.environ.get("CLAWD_HOME", Path(__file__).parent.parent))
+FIXED_NUM_CTX = 32768
+
+SAMPLE_CODE = "\n".join(
+    f"def handler_{i}(event):\n    return process(event.get('payload_{i}'), retries={i % 5})\n"
+    for i in range(120)
+)
+
+# (agent, prompt) pairs shaped like real Director delegations
+REPRESENTATIVE_PROMPTS = [
+    ("scout", "Where is the Link Summon priority defined in the ygo-combo-pipeline repo?"),
+    ("architect", "Propose a module layout for adding retry logic to the Polymarket order client. "
+                  "List files to create and the public functions of each."),
+    ("inspector", "Run `python -m pytest tests/ -v` for budget-pipeline and report failures.\n\n"
+                  + "FAILED tests/test_import.py::test_parse_csv - KeyError: 'amount'\n" * 20),
+    ("builder", "Fix the KeyError in this module by using .get() with defaults:\n\n" + SAMPLE_CODE),
+    ("refactorer", "Reduce duplication in the following handlers without changing behavior:\n\n"
+                   + SAMPLE_CODE * 3),
+    ("scribe", "Summarize this session for memory/current-state.md: builder fixed KeyError, "
+               "inspector confirmed 42 tests pass, no blockers."),
+]
+
+
+def load_system_prompt(agent: str) -> str:
+    agent_file = CLAWD_HOME / "agents" / f"{agent}.md"
+    return agent_file.read_text() if agent_file.exists() else ""
+
+
+def generate(system_prompt: str, prompt: str, num_ctx: int, num_predict: int) -> dict:
+    """One non-streaming generation; returns Ollama's timing fields in ms."""
+    payload = {
+        "model": WORKER_MODEL,
+        "system": system_prompt,
+        "prompt": prompt,
+        "stream": False,
+        "options": {"num_ctx": num_ctx, "num_predict": num_predict},
+    }
+    req = urllib.request.Request(
+        f"{OLLAMA_URL}/api/generate",
+        data=json.dumps(payload).encode("utf-8"),
+        headers={"Content-Type": "application/json"},
+        method="POST",
+    )
+    start = time.time()
+    with urllib.request.urlopen(req, timeout=600) as response:
+        result = json.loads(response.read().decode("utf-8"))
+    eval_ns = result.get("eval_duration", 0) or 1
+    return {
+        "wall_ms": int((time.time() - start) * 1000),
+        "load_ms": result.get("load_duration", 0) // 1_000_000,
+        "prompt_eval_ms": result.get("prompt_eval_duration", 0) // 1_000_000,
+        "prompt_tokens": result.get("prompt_eval_count", 0),
+        "tokens_per_s": round(result.get("eval_count", 0) / (eval_ns / 1e9), 1),
+    }
+
+
+def summarize(samples: list) -> dict:
+    walls = [s["wall_ms"] for s in samples]
+    return {
+        "calls": len(samples),
+        "wall_ms_median": statistics.median(walls),
+        "wall_ms_total": sum(walls),
+        "load_ms_total": sum(s["load_ms"] for s in samples),
+        "tokens_per_s_median": statistics.median(s["tokens_per_s"] for s in samples),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rounds", type=int, default=1, help="Passes over the prompt set per mode")
+    parser.add_argument("--num-predict", type=int, default=64, help="Tokens to generate per call")
+    parser.add_argument("--dry-run", action="store_true", help="Print bucket choices without calling Ollama")
+    parser.add_argument("--output", help="Write JSON results to this file")
+    args = parser.parse_args()
+
+    plan = []
+    for agent, prompt in REPRESENTATIVE_PROMPTS:
+        system_prompt = load_system_prompt(agent)
+        sizing = context_sizing.choose_num_ctx(agent, system_prompt, prompt, sticky=False)
+        plan.append((agent, system_prompt, prompt, sizing))
+        print(f"{agent:<11} required={sizing['required_tokens']:>6}  num_ctx={sizing['num_ctx']}")
+
+    if args.dry_run:
+        return
+
+    results = {"model": WORKER_MODEL, "ollama_url": OLLAMA_URL, "modes": {}}
+    for mode in ("fixed", "dynamic"):
+        samples = []
+        for _ in range(args.rounds):
+            for agent, system_prompt, prompt, sizing in plan:
+                num_ctx = FIXED_NUM_CTX if mode == "fixed" else sizing["num_ctx"]
+                sample = generate(system_prompt, prompt, num_ctx, args.num_predict)
+                sample.update({"agent": agent, "num_ctx": num_ctx})
+                samples.append(sample)
+                print(f"[{mode}] {agent:<11} num_ctx={num_ctx:<6} {sample['wall_ms']}ms "
+                      f"(load {sample['load_ms']}ms, {sample['tokens_per_s']} tok/s)")
+        results["modes"][mode] = {"summary": summarize(samples), "samples": samples}
+
+    fixed = results["modes"]["fixed"]["summary"]["wall_ms_total"]
+    dynamic = results["modes"]["dynamic"]["summary"]["wall_ms_total"]
+    results["speedup"] = round(fixed / dynamic, 2) if dynamic else None
+    print(f"\nTotal wall time: fixed {fixed}ms, dynamic {dynamic}ms (speedup {results['speedup']}x)")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,357 @@
+#!/usr/bin/env python3
+"""
+Synthetic scaling benchmark for the orchestration loop.
+
+Runs run_orchestrator end to end in a scratch CLAWD_HOME against a fake
+Director (Messages API) and a fake Ollama, both local HTTP servers with
+configurable latency distributions and worker output sizes. The real
+call-agent.sh sits in between, so everything except the models is
+measured. Sweeps turns per task, worker output size and concurrent
+tasks. Each task is its own process, as under launchd.
+
+Per configuration it reports orchestrator CPU time, wall time, peak RSS,
+bytes written (syscall-level where /proc is available), the on-disk size
+of memory/checkpoints, memory/logs and memory/blobs, and per-turn
+overhead: wall time beyond the latency the fake models simulated. The
+full default sweep (up to 200 turns x 1MB x 4 tasks) takes several minutes.
+
+Usage:
+    python scripts/bench_orchestrator.py --output bench-orchestrator.json
+    python scripts/bench_orchestrator.py --turns 10,50 --output-sizes 1024,1048576 --concurrency 1,4
+    python scripts/bench_orchestrator.py --director-latency lognormal:0.05:0.6 --worker-latency uniform:0.01:0.2
+    python scripts/bench_orchestrator.py --baseline old.json --output new.json   # Exit 1 on regression
+
+Latency specs: fixed:SECONDS, uniform:LOW:HIGH, lognormal:MEDIAN:SIGMA
+"""
+
+import argparse
+import json
+import math
+import os
+import random
+import re
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+SCRIPTS_DIR = Path(__file__).parent
+REPO_ROOT = SCRIPTS_DIR.parent
+WORKER_AGENTS = ["scout", "builder", "inspector"]
+TASK_TIMEOUT = 900
+REGRESSION_METRICS = ["overhead_per_turn_ms", "cpu_per_turn_ms"]
+
+
+def parse_latency(spec: str):
+    """Turn a latency spec into a sampler taking a random.Random."""
+    kind, *params = spec.split(":")
+    values = [float(p) for p in params]
+    if kind == "fixed" and len(values) == 1:
+        return lambda rng: values[0]
+    if kind == "uniform" and len(values) == 2:
+        return lambda rng: rng.uniform(values[0], values[1])
+    if kind == "lognormal" and len(values) == 2:
+        return lambda rng: rng.lognormvariate(math.log(values[0]), values[1])
+    raise ValueError(f"bad latency spec: {spec}")
+
+
+def dir_size(path: Path) -> int:
+    return sum(p.stat().st_size for p in path.rglob("*") if p.is_file()) if path.exists() else 0
+
+
+def proc_write_bytes():
+    """Bytes this process has passed to write() so far (Linux only)."""
+    try:
+        for line in Path("/proc/self/io").read_text().splitlines():
+            if line.startswith("wchar:"):
+                return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+
+# =============================================================================
+# Fake models
+# =============================================================================
+
+class FakeModels:
+    """Shared state for the fake Director and Ollama: latency, output, accounting."""
+
+    def __init__(self, director_latency: str, worker_latency: str, output_bytes: int, seed: int = 1):
+        self.director_latency = parse_latency(director_latency)
+        self.worker_latency = parse_latency(worker_latency)
+        line = "    result = transform(record, options)  # synthetic worker output\n"
+        self.output = (line * (output_bytes // len(line) + 1))[:output_bytes]
+        self.rng = random.Random(seed)
+        self.simulated = {}  # task label -> seconds of simulated model latency
+        self._lock = threading.Lock()
+
+    def delay(self, sampler, task: str) -> float:
+        with self._lock:
+            seconds = max(0.0, sampler(self.rng))
+            self.simulated[task] = self.simulated.get(task, 0.0) + seconds
+        return seconds
+
+    def decide(self, message: str) -> dict:
+        """Scripted Director: one worker per turn until the task's turn budget is spent."""
+        task, turns = re.search(r"BENCH task=(\S+) turns=(\d+)", message).groups()
+        turn = int(re.search(r"## Turn: (\d+)", message).group(1))
+        time.sleep(self.delay(self.director_latency, task))
+        if turn > int(turns):
+            return {"thought": "Benchmark budget spent", "action": "complete"}
+        return {
+            "thought": f"Turn {turn} of {turns}",
+            "action": "spawn_agent",
+            "agent": WORKER_AGENTS[turn % len(WORKER_AGENTS)],
+            "prompt": f"[{task}] step {turn}: review module_{turn}.py and report findings",
+        }
+
+    def generate(self, prompt: str) -> str:
+        match = re.search(r"\[(\S+)\] step", prompt)
+        time.sleep(self.delay(self.worker_latency, match.group(1) if match else "unknown"))
+        return self.output
+
+
+class FakeModelHandler(BaseHTTPRequestHandler):
+    models: FakeModels = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def send_json(self, data: dict):
+        body = json.dumps(data).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        # /api/tags health checks and /api/ps pool probes
+        self.send_json({"models": []})
+
+    def do_POST(self):
+        request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+        if self.path == "/v1/messages":
+            decision = self.models.decide(request["messages"][0]["content"])
+            self.send_json({
+                "content": [{"type": "text", "text": f"```json\n{json.dumps(decision)}\n```"}],
+                "usage": {"input_tokens": 1, "output_tokens": 1},
+            })
+        elif self.path == "/api/generate":
+            self.send_json({"response": self.models.generate(request.get("prompt", "")), "done": True})
+        else:
+            self.send_error(404)
+
+
+def start_fake_server(models: FakeModels) -> ThreadingHTTPServer:
+    handler = type("BoundFakeModelHandler", (FakeModelHandler,), {"models": models})
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+# =============================================================================
+# Task runner (child process)
+# =============================================================================
+
+def run_task(task_file: str, result_file: str, turns: int, label: str):
+    """Run one task in this process and write its resource usage as JSON."""
+    import resource
+    import orchestrator
+
+    orchestrator.MAX_TURNS = turns + 1
+    # Task ids are second-resolution timestamps; concurrent tasks would collide
+    init_state = orchestrator.init_state
+    orchestrator.init_state = lambda task: {**init_state(task), "task_id": f"task-{label}"}
+
+    written = proc_write_bytes()
+    cpu_start, wall_start = time.process_time(), time.perf_counter()
+    state = orchestrator.run_orchestrator(task_file=task_file)
+    wall = time.perf_counter() - wall_start
+    cpu = time.process_time() - cpu_start
+    if written is not None:
+        written = proc_write_bytes() - written
+
+    # ru_maxrss is KB on Linux, bytes on macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    rss_mb = rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    Path(result_file).write_text(json.dumps({
+        "label": label,
+        "status": state["status"] if state else None,
+        "turns": state["turn"] if state else 0,
+        "wall_s": wall,
+        "cpu_s": cpu,
+        "worker_cli_cpu_s": children.ru_utime + children.ru_stime,
+        "peak_rss_mb": round(rss_mb, 1),
+        "write_bytes": written,
+    }))
+
+
+# =============================================================================
+# Sweep
+# =============================================================================
+
+def run_config(turns: int, output_bytes: int, concurrency: int, director_latency: str,
+               worker_latency: str, seed: int = 1) -> dict:
+    """Run `concurrency` tasks of `turns` turns each and summarize them."""
+    models = FakeModels(director_latency, worker_latency, output_bytes, seed)
+    server = start_fake_server(models)
+    url = f"http://127.0.0.1:{server.server_address[1]}"
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            home = Path(tmp)
+            clawd = home / "clawd"
+            (clawd / "scripts").mkdir(parents=True)
+            (clawd / "tasks").mkdir()
+            (clawd / "scripts" / "call-agent.sh").symlink_to(SCRIPTS_DIR / "call-agent.sh")
+            if (REPO_ROOT / "agents").is_dir():
+                (clawd / "agents").symlink_to(REPO_ROOT / "agents")
+
+            env = {
+                **os.environ,
+                "HOME": str(home),  # call-agent.sh reads ~/clawd/agents and logs under ~/clawd
+                "CLAWD_HOME": str(clawd),
+                "ANTHROPIC_API_KEY": "bench",
+                "ANTHROPIC_API_URL": f"{url}/v1/messages",
+                "OLLAMA_URL": url,
+                "OLLAMA_URLS": "",
+                "DIRECTOR_LOCAL_MODEL": "none",  # Every turn exercises the remote Director path
+                "DIRECTOR_RPM": "1000000",
+                "DIRECTOR_ITPM": "1000000000",
+                "DIRECTOR_OTPM": "1000000000",
+                "MAX_RETRIES": "1",
+            }
+            processes = []
+            for i in range(concurrency):
+                label = f"bench-{i}"
+                task_file = clawd / "tasks" / f"{label}.md"
+                task_file.write_text(f"# Benchmark task\n\nBENCH task={label} turns={turns}\n"
+                                     "Synthetic workload for the orchestrator scaling benchmark.\n")
+                result_file = home / f"{label}.json"
+                command = [sys.executable, str(Path(__file__).resolve()), "run-task", str(task_file),
+                           str(result_file), "--turns", str(turns), "--label", label]
+                processes.append((subprocess.Popen(command, env=env, cwd=clawd, stdout=subprocess.DEVNULL,
+                                                   stderr=subprocess.PIPE), result_file))
+
+            tasks = []
+            for process, result_file in processes:
+                _, stderr = process.communicate(timeout=TASK_TIMEOUT)
+                if process.returncode != 0:
+                    raise RuntimeError(f"benchmark task failed:\n{stderr.decode()[-2000:]}")
+                tasks.append(json.loads(result_file.read_text()))
+
+            disk = {name: dir_size(clawd / "memory" / name) for name in ("checkpoints", "logs", "blobs")}
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    for task in tasks:
+        task["simulated_s"] = models.simulated.get(task["label"], 0.0)
+        task["overhead_per_turn_ms"] = (task["wall_s"] - task["simulated_s"]) / max(1, task["turns"]) * 1000
+
+    writes = [t["write_bytes"] for t in tasks]
+    return {
+        "turns": turns,
+        "output_bytes": output_bytes,
+        "concurrency": concurrency,
+        "completed": sum(1 for t in tasks if t["status"] == "complete"),
+        "wall_s": round(max(t["wall_s"] for t in tasks), 3),
+        "cpu_s": round(sum(t["cpu_s"] for t in tasks), 3),
+        "cpu_per_turn_ms": round(sum(t["cpu_s"] / max(1, t["turns"]) for t in tasks) / len(tasks) * 1000, 2),
+        "worker_cli_cpu_s": round(sum(t["worker_cli_cpu_s"] for t in tasks), 3),
+        "peak_rss_mb": max(t["peak_rss_mb"] for t in tasks),
+        "simulated_latency_s": round(sum(t["simulated_s"] for t in tasks) / len(tasks), 3),
+        "overhead_per_turn_ms": round(sum(t["overhead_per_turn_ms"] for t in tasks) / len(tasks), 2),
+        "write_bytes": None if None in writes else sum(writes),
+        "disk_bytes": disk,
+    }
+
+
+def config_key(run: dict) -> str:
+    return f"{run['turns']}x{run['output_bytes']}x{run['concurrency']}"
+
+
+def find_regressions(runs: list, baseline: dict, tolerance: float) -> list:
+    """Metrics that grew by more than `tolerance` against a previous results file."""
+    previous = {config_key(run): run for run in baseline.get("runs", [])}
+    regressions = []
+    for run in runs:
+        old = previous.get(config_key(run))
+        if not old:
+            continue
+        for metric in REGRESSION_METRICS:
+            if old.get(metric) and run[metric] > old[metric] * tolerance:
+                regressions.append(f"{config_key(run)} {metric}: {old[metric]} -> {run[metric]}")
+    return regressions
+
+
+def int_list(value: str) -> list:
+    return [int(v) for v in value.split(",") if v.strip()]
+
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == "run-task":
+        parser = argparse.ArgumentParser(prog="bench_orchestrator.py run-task")
+        parser.add_argument("task_file")
+        parser.add_argument("result_file")
+        parser.add_argument("--turns", type=int, required=True)
+        parser.add_argument("--label", required=True)
+        args = parser.parse_args(sys.argv[2:])
+        run_task(args.task_file, args.result_file, args.turns, args.label)
+        return
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--turns", type=int_list, default=[10, 50, 200], help="Turns per task (comma-separated)")
+    parser.add_argument("--output-sizes", type=int_list, default=[1024, 65536, 1048576],
+                        help="Worker output bytes (comma-separated)")
+    parser.add_argument("--concurrency", type=int_list, default=[1, 4], help="Concurrent tasks (comma-separated)")
+    parser.add_argument("--director-latency", default="fixed:0.005", help="Director latency spec")
+    parser.add_argument("--worker-latency", default="fixed:0.005", help="Worker latency spec")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="Write JSON results to this file")
+    parser.add_argument("--baseline", help="Previous results file to compare against")
+    parser.add_argument("--tolerance", type=float, default=1.25, help="Allowed growth ratio vs baseline")
+    args = parser.parse_args()
+
+    runs = []
+    print(f"{'turns':>5} {'output':>8} {'tasks':>5} {'wall s':>8} {'cpu ms/turn':>11} {'overhead ms/turn':>16} "
+          f"{'rss MB':>7} {'written':>11} {'checkpoints':>11} {'logs':>9}")
+    for turns in args.turns:
+        for output_bytes in args.output_sizes:
+            for concurrency in args.concurrency:
+                run = run_config(turns, output_bytes, concurrency, args.director_latency,
+                                 args.worker_latency, args.seed)
+                runs.append(run)
+                print(f"{turns:>5} {output_bytes:>8} {concurrency:>5} {run['wall_s']:>8} "
+                      f"{run['cpu_per_turn_ms']:>11} {run['overhead_per_turn_ms']:>16} {run['peak_rss_mb']:>7} "
+                      f"{run['write_bytes'] if run['write_bytes'] is not None else '-':>11} "
+                      f"{run['disk_bytes']['checkpoints']:>11} {run['disk_bytes']['logs']:>9}", flush=True)
+
+    results = {
+        "generated_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": sys.version.split()[0],
+        "platform": sys.platform,
+        "director_latency": args.director_latency,
+        "worker_latency": args.worker_latency,
+        "runs": runs,
+    }
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2))
+        print(f"\nResults written to {args.output}")
+
+    if args.baseline:
+        regressions = find_regressions(runs, json.loads(Path(args.baseline).read_text()), args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,367 @@
+#!/usr/bin/env python3
+"""
+Load test and microbenchmarks for sentry-webhook-handler.py.
+
+Load mode starts the real handler as a subprocess in a scratch CLAWD_HOME,
+with a fake `clawdbot` first on PATH, and replays synthetic, HMAC-signed
+Sentry payloads (varied projects, error types and stack depths) at a fixed
+rate or as fast as possible. It reports throughput, p50/p99 latency, error
+rate, the handler's peak RSS (Linux) and how much the webhook log directory
+grew. --breadcrumb-kb pads each event with breadcrumbs the handler does not
+need, to check that memory stays flat as events grow. With --rate, latency is
+measured from each request's scheduled send time, so a backed-up handler
+shows up as latency instead of quietly lowering the offered load.
+
+Micro mode times verify_signature, extract_error_context (by stack depth)
+and triage_error in-process.
+
+Usage:
+    python scripts/bench_webhook.py                       # Both, defaults
+    python scripts/bench_webhook.py load --rate 50 --requests 1000 --concurrency 8
+    python scripts/bench_webhook.py load --clawdbot-delay 0.5   # Slow gateway
+    python scripts/bench_webhook.py load --breadcrumb-kb 1024   # 1 MiB events
+    python scripts/bench_webhook.py micro --iterations 20000
+    python scripts/bench_webhook.py --output bench-webhook.json
+"""
+
+import argparse
+import hashlib
+import hmac
+import http.client
+import importlib.util
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+HANDLER_PATH = Path(__file__).parent / "sentry-webhook-handler.py"
+SECRET = "bench-secret"
+
+# (Sentry slug, abs_path prefix) pairs covering each project mapping
+PROJECTS = [
+    ("polymarket-copytrader", "/Users/dev/Projects/Polymarket_CopyTrader"),
+    ("ygo-combo-pipeline", "/Users/dev/Desktop/testing"),
+    ("budget-pipeline", "/Users/dev/Desktop/budget"),
+    ("kalshi-arbitrage", "/Users/dev/Projects/Kalshi_Arbitrage"),
+    ("clawd", "/Users/dev/clawd"),
+    ("unknown-service", "/srv/app"),
+]
+
+# (type, message) mixing auto-fixable, escalated and unknown errors
+ERRORS = [
+    ("KeyError", "'amount'"),
+    ("ImportError", "cannot import name 'parse_csv' from 'budget.io'"),
+    ("AttributeError", "'NoneType' object has no attribute 'price'"),
+    ("TypeError", "unsupported operand type(s) for +: 'int' and 'NoneType'"),
+    ("IndexError", "list index out of range"),
+    ("ConnectionError", "HTTPSConnectionPool: Max retries exceeded (connection refused)"),
+    ("OperationalError", "database is locked"),
+    ("ValueError", "invalid literal for int() with base 10: 'n/a'"),
+    ("RecursionError", "maximum recursion depth exceeded"),
+]
+
+STACK_DEPTHS = [1, 5, 20, 60, 200]
+
+
+# =============================================================================
+# Payloads
+# =============================================================================
+
+def make_payload(rng: random.Random, depth: int = None, breadcrumb_kb: int = 0) -> dict:
+    """A Sentry issue-alert payload shaped like the ones the handler receives."""
+    slug, root = rng.choice(PROJECTS)
+    error_type, message = rng.choice(ERRORS)
+    depth = depth or rng.choice(STACK_DEPTHS)
+    frames = []
+    for i in range(depth):
+        in_app = i >= depth // 2
+        module = f"pkg/mod_{i % 17}.py" if in_app else f"site-packages/lib_{i % 9}/core.py"
+        frames.append({
+            "filename": module,
+            "abs_path": f"{root}/{module}" if in_app else f"/usr/lib/python3.11/{module}",
+            "lineno": rng.randint(1, 900),
+            "function": f"func_{i}",
+            "in_app": in_app,
+            "context_line": "    result = handler(event, **options)",
+        })
+    issue_id = rng.randint(10 ** 6, 10 ** 7)
+    crumb = {"category": "http", "level": "info", "message": "GET https://clob.polymarket.com/book " + "x" * 900,
+             "data": {"status_code": 200, "reason": "OK"}}
+    breadcrumbs = [dict(crumb, timestamp=i) for i in range(breadcrumb_kb)]
+    return {
+        "action": "triggered",
+        "data": {
+            "event": {
+                "event_id": "%032x" % rng.getrandbits(128),
+                "level": "error",
+                "culprit": f"pkg.mod_{depth % 17} in func_{depth - 1}",
+                "title": f"{error_type}: {message}",
+                "url": f"https://sentry.io/api/0/projects/acme/{slug}/events/{issue_id}/",
+                "web_url": f"https://acme.sentry.io/issues/{issue_id}/",
+                "exception": {"values": [{"type": error_type, "value": message,
+                                          "stacktrace": {"frames": frames}}]},
+                "tags": [["environment", "production"], ["release", f"1.{depth}.0"]],
+                "breadcrumbs": {"values": breadcrumbs},
+            },
+            "triggered_rule": "High error rate",
+        },
+    }
+
+
+def sign(body: bytes, secret: str = SECRET) -> str:
+    return hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+
+
+def percentile(values: list, pct: float):
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def dir_size(path: Path) -> tuple:
+    files = [p for p in path.rglob("*") if p.is_file()] if path.exists() else []
+    return sum(p.stat().st_size for p in files), len(files)
+
+
+# =============================================================================
+# Load test
+# =============================================================================
+
+FAKE_CLAWDBOT = """#!/bin/sh
+# Stand-in for the clawdbot CLI: records the call, optionally stalls
+echo "$*" >> "$FAKE_CLAWDBOT_LOG"
+if [ -n "$FAKE_CLAWDBOT_DELAY" ]; then sleep "$FAKE_CLAWDBOT_DELAY"; fi
+exit 0
+"""
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_handler(home: Path, clawdbot_delay: float) -> tuple:
+    """Run the handler with a fake clawdbot; returns (process, port, calls log)."""
+    bin_dir = home / "bin"
+    bin_dir.mkdir(parents=True)
+    fake = bin_dir / "clawdbot"
+    fake.write_text(FAKE_CLAWDBOT)
+    fake.chmod(0o755)
+    calls_log = home / "clawdbot-calls.log"
+    port = free_port()
+    env = {
+        **os.environ,
+        "PATH": f"{bin_dir}{os.pathsep}{os.environ.get('PATH', '')}",
+        "CLAWD_HOME": str(home),
+        "WEBHOOK_PORT": str(port),
+        "SENTRY_CLIENT_SECRET": SECRET,
+        "FAKE_CLAWDBOT_LOG": str(calls_log),
+        "FAKE_CLAWDBOT_DELAY": str(clawdbot_delay) if clawdbot_delay else "",
+        "PYTHONUNBUFFERED": "1",
+    }
+    process = subprocess.Popen([sys.executable, str(HANDLER_PATH)], env=env,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.time() + 10
+    while time.time() < deadline:
+        try:
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=1)
+            conn.request("GET", "/")
+            if conn.getresponse().status == 200:
+                return process, port, calls_log
+        except OSError:
+            time.sleep(0.05)
+    process.kill()
+    raise RuntimeError("webhook handler did not start")
+
+
+def peak_rss_mb(pid: int):
+    """High-water RSS of a live process from /proc, or None off Linux."""
+    try:
+        for line in Path(f"/proc/{pid}/status").read_text().splitlines():
+            if line.startswith("VmHWM:"):
+                return round(int(line.split()[1]) / 1024, 1)
+    except OSError:
+        pass
+    return None
+
+
+def run_load(requests: int = 500, rate: float = 0, concurrency: int = 4, clawdbot_delay: float = 0,
+             invalid_ratio: float = 0.0, seed: int = 1, timeout: float = 30, breadcrumb_kb: int = 0) -> dict:
+    """Replay signed payloads against a live handler and summarize the run."""
+    rng = random.Random(seed)
+    bodies = []
+    for i in range(requests):
+        body = json.dumps(make_payload(rng, breadcrumb_kb=breadcrumb_kb)).encode("utf-8")
+        valid = rng.random() >= invalid_ratio
+        bodies.append((body, sign(body) if valid else "0" * 64, 200 if valid else 401))
+    payload_bytes = sum(len(b) for b, _, _ in bodies)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        home = Path(tmp)
+        process, port, calls_log = start_handler(home, clawdbot_delay)
+        log_dir = home / "logs" / "sentry-webhooks"
+        disk_before, files_before = dir_size(log_dir)
+        latencies, errors, statuses = [], 0, {}
+        lock = threading.Lock()
+        next_index = iter(range(requests))
+        start = time.perf_counter()
+
+        def worker():
+            nonlocal errors
+            for i in next_index:
+                body, signature, expected = bodies[i]
+                scheduled = start + i / rate if rate else None
+                if scheduled:
+                    delay = scheduled - time.perf_counter()
+                    if delay > 0:
+                        time.sleep(delay)
+                sent = time.perf_counter()
+                try:
+                    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=timeout)
+                    conn.request("POST", "/", body=body, headers={
+                        "Content-Type": "application/json", "Sentry-Hook-Signature": signature,
+                        "Sentry-Hook-Resource": "event_alert"})
+                    status = conn.getresponse().status
+                    conn.close()
+                except OSError:
+                    status = "connection_error"
+                done = time.perf_counter()
+                with lock:
+                    latencies.append((done - (scheduled or sent)) * 1000)
+                    statuses[str(status)] = statuses.get(str(status), 0) + 1
+                    if status != expected:
+                        errors += 1
+
+        # next() on a shared iterator is atomic enough under the GIL for index handout
+        threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        elapsed = time.perf_counter() - start
+
+        handler_rss = peak_rss_mb(process.pid)
+        process.terminate()
+        process.wait(timeout=10)
+        disk_after, files_after = dir_size(log_dir)
+        clawdbot_calls = len(calls_log.read_text().splitlines()) if calls_log.exists() else 0
+        queue_dir = home / "memory" / "tasks" / "queue"
+        ledger_file = queue_dir / "fingerprints.json"
+        ledger = json.loads(ledger_file.read_text()) if ledger_file.exists() else {}
+        tasks_queued = len(list(queue_dir.glob("*.md")))
+
+    return {
+        "requests": requests,
+        "offered_rate": rate or None,
+        "concurrency": concurrency,
+        "clawdbot_delay_s": clawdbot_delay,
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(requests / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 50), 2),
+        "p99_ms": round(percentile(latencies, 99), 2),
+        "max_ms": round(max(latencies), 2),
+        "error_rate": round(errors / requests, 4),
+        "statuses": statuses,
+        "clawdbot_calls": clawdbot_calls,
+        "autofix_tasks_queued": tasks_queued,
+        "autofix_duplicates": sum(entry["duplicates"] for entry in ledger.values()),
+        "payload_bytes": payload_bytes,
+        "handler_peak_rss_mb": handler_rss,
+        "disk_growth_bytes": disk_after - disk_before,
+        "disk_growth_per_request": round((disk_after - disk_before) / requests, 1),
+        "log_files_written": files_after - files_before,
+    }
+
+
+# =============================================================================
+# Microbenchmarks
+# =============================================================================
+
+def load_handler_module():
+    spec = importlib.util.spec_from_file_location("sentry_webhook_handler", HANDLER_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    module.SENTRY_CLIENT_SECRET = SECRET
+    return module
+
+
+def time_per_call(fn, args_list: list, iterations: int) -> float:
+    """Mean microseconds per call, cycling through args_list."""
+    n = len(args_list)
+    start = time.perf_counter()
+    for i in range(iterations):
+        fn(*args_list[i % n])
+    return round((time.perf_counter() - start) / iterations * 1e6, 2)
+
+
+def run_micro(iterations: int = 5000, seed: int = 1) -> dict:
+    handler = load_handler_module()
+    rng = random.Random(seed)
+    results = {"iterations": iterations}
+
+    for depth in (5, 200):
+        body = json.dumps(make_payload(rng, depth)).encode("utf-8")
+        results[f"verify_signature_{len(body) // 1024}kb_us"] = time_per_call(
+            handler.verify_signature, [(body, sign(body))], iterations)
+
+    for depth in STACK_DEPTHS:
+        payloads = [(make_payload(rng, depth),) for _ in range(20)]
+        results[f"extract_error_context_depth{depth}_us"] = time_per_call(
+            handler.extract_error_context, payloads, iterations)
+
+    contexts = [(handler.extract_error_context(make_payload(rng)),) for _ in range(50)]
+    results["triage_error_us"] = time_per_call(handler.triage_error, contexts, iterations)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("mode", nargs="?", choices=["all", "load", "micro"], default="all")
+    parser.add_argument("--requests", type=int, default=500, help="Webhooks to send")
+    parser.add_argument("--rate", type=float, default=0, help="Offered requests/second (0 = as fast as possible)")
+    parser.add_argument("--concurrency", type=int, default=4, help="Concurrent senders")
+    parser.add_argument("--clawdbot-delay", type=float, default=0, help="Seconds the fake clawdbot stalls")
+    parser.add_argument("--breadcrumb-kb", type=int, default=0, help="Breadcrumb padding per event, in KB")
+    parser.add_argument("--invalid-ratio", type=float, default=0, help="Fraction sent with bad signatures")
+    parser.add_argument("--iterations", type=int, default=5000, help="Calls per microbenchmark")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="Write JSON results to this file")
+    args = parser.parse_args()
+
+    results = {}
+    if args.mode in ("all", "micro"):
+        results["micro"] = run_micro(args.iterations, args.seed)
+        print("Microbenchmarks (µs/call):")
+        for key, value in results["micro"].items():
+            print(f"  {key:40s} {value}")
+    if args.mode in ("all", "load"):
+        results["load"] = run_load(args.requests, args.rate, args.concurrency, args.clawdbot_delay,
+                                   args.invalid_ratio, args.seed, breadcrumb_kb=args.breadcrumb_kb)
+        load = results["load"]
+        print(f"\nLoad: {load['requests']} requests, concurrency {load['concurrency']}, "
+              f"rate {load['offered_rate'] or 'max'}, clawdbot delay {load['clawdbot_delay_s']}s")
+        print(f"  throughput   {load['throughput_rps']} req/s")
+        print(f"  latency      p50 {load['p50_ms']}ms  p99 {load['p99_ms']}ms  max {load['max_ms']}ms")
+        print(f"  error rate   {load['error_rate']:.2%}  {load['statuses']}")
+        print(f"  handler RSS  {load['handler_peak_rss_mb']} MB peak, "
+              f"{load['payload_bytes'] // load['requests']} bytes/payload")
+        print(f"  auto-fix     {load['autofix_tasks_queued']} tasks queued, "
+              f"{load['autofix_duplicates']} duplicates suppressed")
+        print(f"  disk growth  {load['disk_growth_bytes']} bytes ({load['disk_growth_per_request']}/request), "
+              f"{load['log_files_written']} log files for {load['requests']} requests")
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2))
+        print(f"\nResults written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""Content-addressed, compressed storage for large worker outputs.
+
+Blobs live at <root>/<first 2 hex chars>/<sha256>.gz so identical outputs
+are stored once. State history keeps only the reference, size and a preview.
+Blobs that no saved state refers to any more are removed by sweep().
+"""
+
+import gzip
+import hashlib
+import os
+import re
+import tempfile
+import time
+from pathlib import Path
+
+# Outputs at or below this many characters stay inline in history
+BLOB_THRESHOLD = int(os.environ.get("CLAWD_BLOB_THRESHOLD", 2048))
+PREVIEW_CHARS = 500
+# Unreferenced blobs younger than this are kept: their run may not have checkpointed yet
+BLOB_GC_GRACE = int(os.environ.get("CLAWD_BLOB_GC_GRACE", 3600))
+
+RESULT_REF_RE = re.compile(r'"result_ref":\s*"([0-9a-f]{64})"')
+
+
+class BlobStore:
+    """gzip-compressed blobs addressed by the SHA-256 of their UTF-8 text."""
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+
+    def _path(self, digest: str) -> Path:
+        return self.root / digest[:2] / f"{digest}.gz"
+
+    def put(self, text: str) -> str:
+        """Store text (deduplicated) and return its hex digest."""
+        data = text.encode("utf-8")
+        digest = hashlib.sha256(data).hexdigest()
+        path = self._path(digest)
+        try:
+            os.utime(path)  # A fresh mtime keeps a reused blob out of the next sweep
+            return digest
+        except FileNotFoundError:
+            pass
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Write to a temp file and rename so readers never see a partial blob
+        fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(gzip.compress(data, compresslevel=6))
+            os.replace(tmp, path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+        return digest
+
+    def get(self, digest: str) -> str:
+        """Load a blob's text. Raises FileNotFoundError if missing."""
+        with open(self._path(digest), "rb") as f:
+            return gzip.decompress(f.read()).decode("utf-8")
+
+    def exists(self, digest: str) -> bool:
+        return self._path(digest).exists()
+
+    def sweep(self, keep: set, grace: float = BLOB_GC_GRACE, dry_run: bool = False) -> dict:
+        """Delete blobs whose digest is not in keep and that are older than grace seconds.
+
+        Returns:
+            {"blobs_deleted", "blob_bytes_freed"}
+        """
+        summary = {"blobs_deleted": 0, "blob_bytes_freed": 0}
+        cutoff = time.time() - grace
+        for path in self.root.glob("*/*.gz"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            if path.name[:-3] in keep or stat.st_mtime > cutoff:
+                continue
+            summary["blobs_deleted"] += 1
+            summary["blob_bytes_freed"] += stat.st_size
+            if not dry_run:
+                path.unlink(missing_ok=True)
+        return summary
+
+
+def referenced_digests(paths) -> set:
+    """Blob digests referenced from saved state files (plain or .gz JSON)."""
+    digests = set()
+    for path in paths:
+        opener = gzip.open if path.name.endswith(".gz") else open
+        try:
+            with opener(path, "rt") as f:
+                digests.update(RESULT_REF_RE.findall(f.read()))
+        except (OSError, EOFError):
+            continue  # Deleted meanwhile, or unreadable: nothing to restore from it
+    return digests
+
+
+def spill_result(store: BlobStore, result: str) -> dict:
+    """History fields for a worker result, spilling large ones to the store.
+
+    Returns:
+        {"result": text} for small outputs, otherwise
+        {"result_ref", "result_size", "result_preview"}.
+    """
+    if len(result) <= BLOB_THRESHOLD:
+        return {"result": result}
+    return {
+        "result_ref": store.put(result),
+        "result_size": len(result),
+        "result_preview": result[:PREVIEW_CHARS],
+    }
+
+
+def load_result(store: BlobStore, entry: dict) -> str:
+    """Full result text for a history entry, loading the blob if spilled."""
+    if "result_ref" in entry:
+        return store.get(entry["result_ref"])
+    return entry.get("result", "")
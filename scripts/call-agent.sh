@@ -6,11 +6,14 @@
 #
 # Environment variables:
 #   OLLAMA_URL      - Ollama API URL (default: http://localhost:11434)
+#   OLLAMA_URLS     - Comma-separated fallback hosts tried if OLLAMA_URL is unhealthy
 #   CLAWD_MODEL     - Model to use (default: qwen-coder-16k)
 #   TIMEOUT         - Request timeout in seconds (default: 300)
 #   MAX_RETRIES     - Maximum retry attempts (default: 3)
 #   LOG_DIR         - Log directory (default: ~/clawd/memory/logs)
 #   THINKING_MODE   - Enable thinking mode: true/false (default: false for 7B models)
+#   NUM_CTX         - Context window; estimated from prompt size if unset
+#   CLAWD_CTX_LADDER - Context buckets to choose from (default: 4096,8192,16384,32768)
 
 set -euo pipefail
 
@@ -19,11 +22,15 @@ set -euo pipefail
 # ============================================================================
 
 OLLAMA_URL="${OLLAMA_URL:-http://localhost:11434}"
+OLLAMA_URLS="${OLLAMA_URLS:-}"
 OLLAMA_MODEL="${CLAWD_MODEL:-qwen-coder-16k}"
 TIMEOUT="${TIMEOUT:-300}"
 MAX_RETRIES="${MAX_RETRIES:-3}"
 LOG_DIR="${LOG_DIR:-$HOME/clawd/memory/logs}"
 THINKING_MODE="${THINKING_MODE:-false}"
+NUM_CTX="${NUM_CTX:-}"
+CLAWD_CTX_LADDER="${CLAWD_CTX_LADDER:-4096,8192,16384,32768}"
+EXPECTED_OUTPUT_TOKENS=2048
 ALERTS_DIR="${ALERTS_DIR:-$HOME/clawd/memory/alerts}"
 
 # Retry configuration
@@ -70,7 +77,25 @@ log_json() {
     timestamp="$(date -Iseconds)"
     
     # Append to JSONL log
-    echo "{\"timestamp\":\"$timestamp\",\"session\":\"$SESSION_ID\",\"agent\":\"$agent\",\"status\":\"$status\",\"latency_ms\":$latency_ms,\"error\":\"$error\"}" >> "$LOG_DIR/calls.jsonl"
+    echo "{\"timestamp\":\"$timestamp\",\"session\":\"$SESSION_ID\",\"agent\":\"$agent\",\"model\":\"$OLLAMA_MODEL\",\"status\":\"$status\",\"latency_ms\":$latency_ms,\"num_ctx\":${REQUEST_NUM_CTX:-0},\"error\":\"$error\"}" >> "$LOG_DIR/calls.jsonl"
+}
+
+choose_num_ctx() {
+    # Smallest ladder bucket fitting prompt + system prompt + expected output
+    # (~3 chars/token, 10% headroom). Mirrors scripts/context_sizing.py.
+    local chars="$1"
+    local required=$(( (chars / 3 + EXPECTED_OUTPUT_TOKENS) * 11 / 10 ))
+    local bucket
+    local largest=0
+    IFS=',' read -ra buckets <<< "$CLAWD_CTX_LADDER"
+    for bucket in "${buckets[@]}"; do
+        if [[ $bucket -ge $required ]]; then
+            echo "$bucket"
+            return
+        fi
+        largest=$bucket
+    done
+    echo "$largest"
 }
 
 check_ollama_health() {
@@ -143,6 +168,10 @@ call_ollama() {
         log "WARN" "No agent file found at $agent_file, using prompt only"
     fi
     
+    # Size the context window to the request (orchestrator passes NUM_CTX)
+    REQUEST_NUM_CTX="${NUM_CTX:-$(choose_num_ctx $(( ${#system_prompt} + ${#prompt} )))}"
+    log "INFO" "Using num_ctx $REQUEST_NUM_CTX"
+    
     # Build request body
     local request_body
     if [[ -n "$system_prompt" ]]; then
@@ -151,13 +180,14 @@ call_ollama() {
             --arg system "$system_prompt" \
             --arg prompt "$prompt" \
             --argjson think "$THINKING_MODE" \
+            --argjson num_ctx "$REQUEST_NUM_CTX" \
             '{
                 model: $model,
                 system: $system,
                 prompt: $prompt,
                 stream: false,
                 options: {
-                    num_ctx: 32768
+                    num_ctx: $num_ctx
                 },
                 think: $think
             }')
@@ -166,12 +196,13 @@ call_ollama() {
             --arg model "$OLLAMA_MODEL" \
             --arg prompt "$prompt" \
             --argjson think "$THINKING_MODE" \
+            --argjson num_ctx "$REQUEST_NUM_CTX" \
             '{
                 model: $model,
                 prompt: $prompt,
                 stream: false,
                 options: {
-                    num_ctx: 32768
+                    num_ctx: $num_ctx
                 },
                 think: $think
             }')
@@ -266,7 +297,22 @@ main() {
     log "INFO" "Starting call to agent '$agent' (session: $SESSION_ID)"
     log "INFO" "Prompt: ${prompt:0:100}..."  # Log first 100 chars
     
-    # Health check
+    # Health check (fall back to the other pool hosts if the primary is down)
+    if ! check_ollama_health && [[ -n "$OLLAMA_URLS" ]]; then
+        local primary="$OLLAMA_URL"
+        local candidate
+        IFS=',' read -ra candidates <<< "$OLLAMA_URLS"
+        for candidate in "${candidates[@]}"; do
+            candidate="${candidate// /}"
+            [[ -z "$candidate" || "$candidate" == "$primary" ]] && continue
+            OLLAMA_URL="$candidate"
+            if check_ollama_health; then
+                log "WARN" "Ollama at $primary unhealthy, failing over to $OLLAMA_URL"
+                break
+            fi
+            OLLAMA_URL="$primary"
+        done
+    fi
     if ! check_ollama_health; then
         log "ERROR" "Ollama health check failed at $OLLAMA_URL"
         echo "ERROR: Ollama is not responding at $OLLAMA_URL" >&2
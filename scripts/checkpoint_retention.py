@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+Checkpoint retention - Thin and compress memory/checkpoints.
+
+Policy, applied per task:
+    - The newest CHECKPOINT_KEEP_LAST checkpoints stay as plain JSON
+    - Terminal checkpoints (status other than "running") are always kept
+    - Older checkpoints are thinned to one per hour for the last day,
+      one per day up to CHECKPOINT_MAX_DAYS, and deleted after that
+    - Every kept checkpoint outside the newest N is gzip-compressed
+
+Blobs (large worker outputs in memory/blobs) that no remaining checkpoint
+or current-state.json refers to are then deleted.
+
+The orchestrator applies this inline for the running task after each
+checkpoint; this script sweeps the whole directory.
+
+Usage:
+    python scripts/checkpoint_retention.py              # Sweep all tasks
+    python scripts/checkpoint_retention.py --dry-run    # Show what would change
+    python scripts/checkpoint_retention.py --task task-20260130-114014
+
+Environment:
+    CLAWD_HOME - Clawd directory (default: ~/clawd)
+    CHECKPOINT_KEEP_LAST - Recent checkpoints kept uncompressed (default: 10)
+    CHECKPOINT_MAX_DAYS - Age after which non-terminal ones are deleted (default: 30)
+    CLAWD_BLOB_GC_GRACE - Seconds an unreferenced blob is kept (default: 3600)
+"""
+
+import argparse
+import gzip
+import json
+import os
+import re
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Optional
+
+from blob_store import BlobStore, referenced_digests
+
+CLAWD_HOME = Path(os.environ.get("CLAWD_HOME", Path.home() / "clawd"))
+CHECKPOINT_DIR = CLAWD_HOME / "memory" / "checkpoints"
+
+CHECKPOINT_KEEP_LAST = int(os.environ.get("CHECKPOINT_KEEP_LAST", 10))
+CHECKPOINT_MAX_DAYS = int(os.environ.get("CHECKPOINT_MAX_DAYS", 30))
+HOURLY_WINDOW = timedelta(days=1)
+
+CHECKPOINT_RE = re.compile(r"^chk-(?P<task>.+)-(?P<ts>\d{8}-\d{6})\.json(?:\.gz)?$")
+
+
+def parse_checkpoint_name(path: Path) -> Optional[tuple]:
+    """(task_id, timestamp) from a checkpoint filename, or None if not one."""
+    match = CHECKPOINT_RE.match(path.name)
+    if not match:
+        return None
+    return match.group("task"), datetime.strptime(match.group("ts"), "%Y%m%d-%H%M%S")
+
+
+def checkpoint_sort_key(path: Path) -> str:
+    """Sort key that orders compressed and plain checkpoints together."""
+    return path.name[:-3] if path.name.endswith(".gz") else path.name
+
+
+def list_checkpoints(checkpoint_dir: Path, task_id: str = None) -> list:
+    """Checkpoint files (plain and compressed), oldest first."""
+    if not checkpoint_dir.exists():
+        return []
+    pattern = f"chk-{task_id}-*.json*" if task_id else "chk-*.json*"
+    paths = [
+        p for p in checkpoint_dir.glob(pattern)
+        if parse_checkpoint_name(p) and (task_id is None or parse_checkpoint_name(p)[0] == task_id)
+    ]
+    return sorted(paths, key=checkpoint_sort_key)
+
+
+def read_checkpoint(path: Path) -> dict:
+    """Load a checkpoint, transparently handling .json.gz"""
+    if path.name.endswith(".gz"):
+        with gzip.open(path, "rt") as f:
+            return json.load(f)
+    with open(path) as f:
+        return json.load(f)
+
+
+def compress_checkpoint(path: Path) -> Path:
+    """gzip a plain checkpoint in place (atomic rename), returning the new path."""
+    target = path.with_name(path.name + ".gz")
+    tmp = path.with_name(path.name + ".gz.tmp")
+    with open(path, "rb") as src, gzip.open(tmp, "wb", compresslevel=6) as dst:
+        dst.write(src.read())
+    os.replace(tmp, target)
+    path.unlink()
+    return target
+
+
+def is_terminal(path: Path) -> bool:
+    try:
+        return read_checkpoint(path).get("status", "running") != "running"
+    except (OSError, ValueError, EOFError):
+        return False
+
+
+def plan_task_retention(paths: list, now: datetime, keep_last: int = None, max_days: int = None) -> dict:
+    """Decide what to keep, compress and delete for one task's checkpoints.
+
+    Args:
+        paths: The task's checkpoints, oldest first.
+
+    Returns:
+        {"keep": [...], "compress": [...], "delete": [...]}
+    """
+    keep_last = CHECKPOINT_KEEP_LAST if keep_last is None else keep_last
+    max_days = CHECKPOINT_MAX_DAYS if max_days is None else max_days
+
+    recent = paths[-keep_last:] if keep_last else []
+    older = paths[:len(paths) - len(recent)]
+    plan = {"keep": list(recent), "compress": [], "delete": []}
+
+    # Newest first, so each hour/day bucket keeps its latest checkpoint
+    seen_buckets = set()
+    for path in reversed(older):
+        _, ts = parse_checkpoint_name(path)
+        age = now - ts
+        if age <= HOURLY_WINDOW:
+            bucket = ts.strftime("%Y%m%d%H")
+        elif age <= timedelta(days=max_days):
+            bucket = ts.strftime("%Y%m%d")
+        else:
+            bucket = None
+
+        if bucket is not None and bucket not in seen_buckets:
+            seen_buckets.add(bucket)
+            keep = True
+        else:
+            keep = is_terminal(path)
+
+        if not keep:
+            plan["delete"].append(path)
+        elif path.name.endswith(".gz"):
+            plan["keep"].append(path)
+        else:
+            plan["compress"].append(path)
+    return plan
+
+
+def apply_retention(checkpoint_dir: Path = CHECKPOINT_DIR, task_id: str = None,
+                    now: datetime = None, dry_run: bool = False) -> dict:
+    """Apply the retention policy to one task (or every task) in checkpoint_dir.
+
+    Returns:
+        Counts of kept, compressed and deleted files and bytes freed.
+    """
+    now = now or datetime.now()
+    by_task = {}
+    for path in list_checkpoints(checkpoint_dir, task_id):
+        by_task.setdefault(parse_checkpoint_name(path)[0], []).append(path)
+
+    summary = {"kept": 0, "compressed": 0, "deleted": 0, "bytes_freed": 0}
+    for paths in by_task.values():
+        plan = plan_task_retention(paths, now)
+        summary["kept"] += len(plan["keep"])
+        for path in plan["delete"]:
+            summary["deleted"] += 1
+            summary["bytes_freed"] += path.stat().st_size
+            if not dry_run:
+                path.unlink()
+        for path in plan["compress"]:
+            summary["compressed"] += 1
+            if dry_run:
+                continue
+            before = path.stat().st_size
+            summary["bytes_freed"] += before - compress_checkpoint(path).stat().st_size
+    return summary
+
+
+def sweep_blobs(checkpoint_dir: Path, blobs_dir: Path, state_files: list = (), dry_run: bool = False) -> dict:
+    """Delete blobs that no checkpoint in checkpoint_dir (or state file) refers to."""
+    keep = referenced_digests([*list_checkpoints(checkpoint_dir), *state_files])
+    return BlobStore(blobs_dir).sweep(keep, dry_run=dry_run)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Thin and compress orchestrator checkpoints")
+    parser.add_argument("--dir", type=Path, default=CHECKPOINT_DIR, help="Checkpoint directory")
+    parser.add_argument("--task", help="Only sweep this task id")
+    parser.add_argument("--dry-run", action="store_true", help="Report without changing files")
+    args = parser.parse_args()
+
+    summary = apply_retention(args.dir, task_id=args.task, dry_run=args.dry_run)
+    prefix = "[DRY RUN] " if args.dry_run else ""
+    print(f"{prefix}Checkpoints kept: {summary['kept']}, compressed: {summary['compressed']}, "
+          f"deleted: {summary['deleted']}, freed: {summary['bytes_freed'] / 1024:.1f} KB")
+    # A dry run still counts the checkpoints it would delete as references
+    memory = args.dir.parent
+    blobs = sweep_blobs(args.dir, memory / "blobs", [memory / "current-state.json"], dry_run=args.dry_run)
+    print(f"{prefix}Unreferenced blobs deleted: {blobs['blobs_deleted']}, "
+          f"freed: {blobs['blob_bytes_freed'] / 1024:.1f} KB")
+
+
+if __name__ == "__main__":
+    main()
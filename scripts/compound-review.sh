@@ -7,6 +7,8 @@
 #
 # This script runs the "Compound" phase, extracting patterns,
 # decisions, and lessons from recent work to make future work easier.
+# Only sections not distilled by an earlier run are reviewed (tracked in
+# memory/learnings/compound-watermark.json), in token-sized batches.
 #
 # Usage:
 #   ./scripts/compound-review.sh              # Review last 24 hours
@@ -17,11 +19,14 @@
 set -euo pipefail
 
 # Configuration
+SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
 CLAWD_HOME="${CLAWD_HOME:-$HOME/clawd}"
 LOGS_DIR="$CLAWD_HOME/memory"  # Daily session logs are in memory/, not memory/logs/
 LEARNINGS_DIR="$CLAWD_HOME/memory/learnings"
 TEMPLATES_FILE="$CLAWD_HOME/docs/compound-templates.md"
+WATERMARK_FILE="$LEARNINGS_DIR/compound-watermark.json"
 DAYS_BACK=1
+BATCH_TOKENS="${COMPOUND_BATCH_TOKENS:-6000}"
 DRY_RUN=false
 VERBOSE=false
 
@@ -56,6 +61,7 @@ Extract learnings from recent session logs using Claude (Scribe agent).
 
 Options:
   --days N        Review logs from last N days (default: 1)
+  --batch-tokens N  Approximate tokens of log content per Scribe call (default: 6000)
   --dry-run       Preview extraction without committing changes
   --verbose       Show detailed output
   --help          Show this help message
@@ -68,6 +74,7 @@ Examples:
 Environment:
   CLAWD_HOME      Base directory for clawd (default: ~/clawd)
   SCRIBE_MODEL    Ollama model for Scribe (default: qwen2.5:7b)
+  COMPOUND_BATCH_TOKENS  Default for --batch-tokens
 
 EOF
 }
@@ -79,6 +86,10 @@ while [[ $# -gt 0 ]]; do
             DAYS_BACK="$2"
             shift 2
             ;;
+        --batch-tokens)
+            BATCH_TOKENS="$2"
+            shift 2
+            ;;
         --dry-run)
             DRY_RUN=true
             shift
@@ -115,29 +126,28 @@ if [[ ! -d "$LEARNINGS_DIR" ]]; then
     mkdir -p "$LEARNINGS_DIR"
 fi
 
-# Find recent log files
-log_info "Searching for logs from the last $DAYS_BACK day(s)..."
+# Collect only content not yet distilled (see compound_watermark.py)
+log_info "Collecting new session content from the last $DAYS_BACK day(s)..."
 
-if [[ "$(uname)" == "Darwin" ]]; then
-    # macOS
-    RECENT_LOGS=$(find "$LOGS_DIR" -name "*.md" -mtime -"$DAYS_BACK" -type f 2>/dev/null || true)
-else
-    # Linux
-    RECENT_LOGS=$(find "$LOGS_DIR" -name "*.md" -mtime -"$DAYS_BACK" -type f 2>/dev/null || true)
-fi
+BATCH_DIR=$(mktemp -d)
+trap 'rm -rf "$BATCH_DIR"' EXIT
+
+BATCH_COUNT=$(CLAWD_HOME="$CLAWD_HOME" python3 "$SCRIPT_DIR/compound_watermark.py" collect \
+    --days "$DAYS_BACK" --out-dir "$BATCH_DIR" --batch-tokens "$BATCH_TOKENS")
 
-if [[ -z "$RECENT_LOGS" ]]; then
-    log_warn "No log files found from the last $DAYS_BACK day(s)"
+if [[ "$BATCH_COUNT" -eq 0 ]]; then
+    log_warn "No new session content since the last review"
     log_info "Nothing to compound. Exiting."
     exit 0
 fi
 
-LOG_COUNT=$(echo "$RECENT_LOGS" | wc -l | tr -d ' ')
-log_info "Found $LOG_COUNT log file(s) to review"
+NEW_LOGS=$(grep -h "^### File: " "$BATCH_DIR"/batch-*.md | sed 's/^### File: //' | sort -u)
+LOG_COUNT=$(echo "$NEW_LOGS" | wc -l | tr -d ' ')
+log_info "Found new content in $LOG_COUNT log file(s), $BATCH_COUNT batch(es)"
 
 if $VERBOSE; then
-    echo "$RECENT_LOGS" | while read -r f; do
-        echo "  - $(basename "$f")"
+    echo "$NEW_LOGS" | while read -r f; do
+        echo "  - $f"
     done
 fi
 
@@ -208,43 +218,21 @@ Be selective - only extract genuinely reusable learnings, not one-off fixes.
 PROMPT_END
 )
 
-# Collect log content
-LOG_CONTENT=""
-while IFS= read -r log_file; do
-    if [[ -n "$log_file" && -f "$log_file" ]]; then
-        LOG_CONTENT+="
-### File: $(basename "$log_file")
-$(cat "$log_file")
-
----
-"
-    fi
-done <<< "$RECENT_LOGS"
-
-FULL_PROMPT="$COMPOUND_PROMPT
-
-$LOG_CONTENT"
-
-# Create temporary file for the prompt
-TEMP_PROMPT=$(mktemp)
-echo "$FULL_PROMPT" > "$TEMP_PROMPT"
-
-log_info "Running compound review with Scribe..."
-
 if $DRY_RUN; then
     log_warn "DRY RUN - would process the following:"
     echo "---"
-    echo "Prompt length: $(wc -c < "$TEMP_PROMPT") characters"
+    for batch_file in "$BATCH_DIR"/batch-*.md; do
+        echo "$(basename "$batch_file" .md): $(( ${#COMPOUND_PROMPT} + $(wc -c < "$batch_file") )) characters"
+    done
     echo "Log files: $LOG_COUNT"
     echo "---"
-    
+
     if $VERBOSE; then
-        echo "Full prompt preview (first 2000 chars):"
-        head -c 2000 "$TEMP_PROMPT"
+        echo "First batch preview (first 2000 chars):"
+        head -c 2000 "$BATCH_DIR/batch-001.md"
         echo "..."
     fi
-    
-    rm "$TEMP_PROMPT"
+
     exit 0
 fi
 
@@ -254,49 +242,65 @@ OUTPUT_FILE="$LEARNINGS_DIR/compound-$(date +%Y-%m-%d).md"
 
 if command -v claude &> /dev/null; then
     log_info "Using Claude (claude -p) for compound review..."
-    
-    # Claude Code headless mode
-    RESULT=$(claude -p "$(cat "$TEMP_PROMPT")" 2>&1) || {
-        log_error "Claude command failed"
-        rm "$TEMP_PROMPT"
-        exit 1
-    }
+    SUMMARIZER=claude
 else
     log_info "Claude not found, using Ollama Scribe..."
-    
+
     SCRIBE_MODEL="${SCRIBE_MODEL:-qwen2.5:7b}"
-    
+
     if ! command -v ollama &> /dev/null; then
         log_error "Neither claude nor ollama found. Cannot run compound review."
-        rm "$TEMP_PROMPT"
         exit 1
     fi
-    
-    RESULT=$(ollama run "$SCRIBE_MODEL" "$(cat "$TEMP_PROMPT")" 2>&1) || {
-        log_error "Ollama command failed"
-        rm "$TEMP_PROMPT"
-        exit 1
-    }
+    SUMMARIZER=ollama
 fi
 
-rm "$TEMP_PROMPT"
-
-# Save the output
-cat << EOF > "$OUTPUT_FILE"
+# Later runs on the same day append to the existing file
+if [[ ! -f "$OUTPUT_FILE" ]]; then
+    cat << EOF > "$OUTPUT_FILE"
 # Compound Review - $(date +%Y-%m-%d)
 
 > Auto-generated by compound-review.sh
-> Reviewed $LOG_COUNT log file(s) from the last $DAYS_BACK day(s)
+EOF
+fi
 
----
+# One Scribe call per batch. The watermark advances only after a batch's
+# learnings are saved, so a failed run resumes from that batch next time.
+DONE_BATCHES=0
+for batch_file in "$BATCH_DIR"/batch-*.md; do
+    batch=$(basename "$batch_file" .md)
+    log_info "Running compound review with Scribe ($batch of $BATCH_COUNT)..."
 
-$RESULT
+    FULL_PROMPT="$COMPOUND_PROMPT
+
+$(cat "$batch_file")"
+
+    if [[ "$SUMMARIZER" == "claude" ]]; then
+        # Claude Code headless mode
+        RESULT=$(claude -p "$FULL_PROMPT" 2>&1) || {
+            log_error "Claude command failed on $batch ($DONE_BATCHES of $BATCH_COUNT batches saved)"
+            exit 1
+        }
+    else
+        RESULT=$(ollama run "$SCRIBE_MODEL" "$FULL_PROMPT" 2>&1) || {
+            log_error "Ollama command failed on $batch ($DONE_BATCHES of $BATCH_COUNT batches saved)"
+            exit 1
+        }
+    fi
+
+    cat << EOF >> "$OUTPUT_FILE"
 
 ---
 
-*Generated: $(date -Iseconds)*
+$RESULT
+
+*Generated: $(date -Iseconds) from $batch of $BATCH_COUNT, last $DAYS_BACK day(s)*
 EOF
 
+    CLAWD_HOME="$CLAWD_HOME" python3 "$SCRIPT_DIR/compound_watermark.py" commit --out-dir "$BATCH_DIR" "$batch"
+    DONE_BATCHES=$((DONE_BATCHES + 1))
+done
+
 log_success "Learnings extracted to: $OUTPUT_FILE"
 
 # Git commit if not dry run and in a git repo
@@ -304,7 +308,7 @@ if [[ -d "$CLAWD_HOME/.git" ]]; then
     log_info "Committing learnings to git..."
     
     cd "$CLAWD_HOME"
-    git add "$OUTPUT_FILE"
+    git add "$OUTPUT_FILE" "$WATERMARK_FILE"
     
     # Check if there are changes to commit
     if git diff --cached --quiet; then
@@ -312,7 +316,7 @@ if [[ -d "$CLAWD_HOME/.git" ]]; then
     else
         git commit -m "compound: learnings from $(date +%Y-%m-%d)
 
-Reviewed $LOG_COUNT log file(s) from the last $DAYS_BACK day(s).
+Reviewed new content in $LOG_COUNT log file(s) from the last $DAYS_BACK day(s).
 
 🤖 Generated with compound-review.sh
 Co-Authored-By: Claude <noreply@anthropic.com>"
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Compound Watermark - Track which session-log content has been distilled.
+
+compound-review.sh uses this so each run only sends new material to the
+Scribe. Session logs in memory/*.md are split into heading sections; the
+watermark stores a hash per distilled section, so appended turns and edited
+sections are picked up while already-reviewed ones are skipped, however
+much the --days windows overlap. Files whose mtime and size are unchanged
+are skipped without reading.
+
+Usage:
+    compound_watermark.py collect --days N --out-dir DIR [--batch-tokens T]
+        Write new sections as DIR/batch-NNN.md (each within T tokens) and
+        DIR/pending.json; prints the number of batches.
+    compound_watermark.py commit --out-dir DIR BATCH
+        Mark a batch as distilled once its learnings are saved.
+
+Environment:
+    CLAWD_HOME - Clawd directory (default: ~/clawd)
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import time
+from pathlib import Path
+
+CLAWD_HOME = Path(os.environ.get("CLAWD_HOME", Path.home() / "clawd"))
+LOGS_DIR = CLAWD_HOME / "memory"  # Daily session logs are in memory/, not memory/logs/
+WATERMARK_FILE = CLAWD_HOME / "memory" / "learnings" / "compound-watermark.json"
+
+# Our own output and machine-written state are never review input
+SKIP_DIRS = {"learnings", "checkpoints", "logs", "index", "blobs", "tasks", "test-cache"}
+DEFAULT_BATCH_TOKENS = 6000
+CHARS_PER_TOKEN = 4
+
+SECTION_RE = re.compile(r"^(?=#{1,3}\s)", re.MULTILINE)
+
+
+def split_sections(text: str) -> list:
+    """Split markdown at level 1-3 headings, keeping each heading with its body."""
+    return [s for s in SECTION_RE.split(text) if s.strip()]
+
+
+def section_hash(section: str) -> str:
+    return hashlib.sha256(section.strip().encode("utf-8")).hexdigest()[:16]
+
+
+def load_watermark(path: Path = WATERMARK_FILE) -> dict:
+    if path.exists():
+        return json.loads(path.read_text())
+    return {"files": {}}
+
+
+def save_watermark(watermark: dict, path: Path = WATERMARK_FILE):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps(watermark, indent=2))
+    os.replace(tmp, path)
+
+
+def recent_logs(logs_dir: Path, days: float) -> list:
+    cutoff = time.time() - days * 86400
+    found = []
+    for dirpath, dirnames, filenames in os.walk(logs_dir):
+        dirnames[:] = [d for d in dirnames if d not in SKIP_DIRS and not d.startswith(".")]
+        for name in filenames:
+            path = Path(dirpath) / name
+            if name.endswith(".md") and path.stat().st_mtime >= cutoff:
+                found.append(path)
+    return sorted(found)
+
+
+def new_sections(paths: list, watermark: dict, base: Path) -> list:
+    """(file, hash, text) for sections not yet distilled, in file order."""
+    pending = []
+    for path in paths:
+        rel = str(path.relative_to(base))
+        stat = path.stat()
+        entry = watermark["files"].get(rel, {})
+        if entry.get("mtime") == stat.st_mtime and entry.get("size") == stat.st_size:
+            continue
+        done = set(entry.get("sections", []))
+        for section in split_sections(path.read_text(encoding="utf-8", errors="replace")):
+            digest = section_hash(section)
+            if digest not in done:
+                pending.append((rel, digest, section.strip()))
+    return pending
+
+
+def batch_sections(sections: list, batch_tokens: int) -> list:
+    """Group sections into batches of at most batch_tokens (oversized ones are cut)."""
+    limit = batch_tokens * CHARS_PER_TOKEN
+    batches, current, size = [], [], 0
+    for rel, digest, text in sections:
+        if len(text) > limit:
+            text = text[:limit] + "\n... [truncated]"
+        if current and size + len(text) > limit:
+            batches.append(current)
+            current, size = [], 0
+        current.append((rel, digest, text))
+        size += len(text)
+    if current:
+        batches.append(current)
+    return batches
+
+
+def collect(days: float, out_dir: Path, batch_tokens: int = DEFAULT_BATCH_TOKENS,
+            logs_dir: Path = LOGS_DIR, watermark_file: Path = WATERMARK_FILE) -> int:
+    """Write pending batches to out_dir. Returns the number of batches."""
+    watermark = load_watermark(watermark_file)
+    paths = recent_logs(logs_dir, days)
+    batches = batch_sections(new_sections(paths, watermark, logs_dir), batch_tokens)
+
+    out_dir.mkdir(parents=True, exist_ok=True)
+    manifest = {"files": {}, "batches": {}}
+    for path in paths:
+        stat = path.stat()
+        manifest["files"][str(path.relative_to(logs_dir))] = {"mtime": stat.st_mtime, "size": stat.st_size}
+
+    for i, batch in enumerate(batches, 1):
+        name = f"batch-{i:03d}"
+        parts = []
+        last_file = None
+        for rel, _, text in batch:
+            if rel != last_file:
+                parts.append(f"### File: {rel}\n")
+                last_file = rel
+            parts.append(text + "\n\n---\n")
+        (out_dir / f"{name}.md").write_text("\n".join(parts))
+        manifest["batches"][name] = [[rel, digest] for rel, digest, _ in batch]
+
+    (out_dir / "pending.json").write_text(json.dumps(manifest))
+    return len(batches)
+
+
+def commit(out_dir: Path, batch: str, watermark_file: Path = WATERMARK_FILE):
+    """Record a batch's sections as distilled.
+
+    A file's mtime/size fast-path is only stored once none of its sections
+    remain pending, so a failed batch is retried on the next run.
+    """
+    manifest = json.loads((out_dir / "pending.json").read_text())
+    watermark = load_watermark(watermark_file)
+
+    for rel, digest in manifest["batches"].pop(batch, []):
+        entry = watermark["files"].setdefault(rel, {"sections": []})
+        if digest not in entry["sections"]:
+            entry["sections"].append(digest)
+
+    still_pending = {rel for items in manifest["batches"].values() for rel, _ in items}
+    for rel, stat in manifest["files"].items():
+        entry = watermark["files"].setdefault(rel, {"sections": []})
+        if rel not in still_pending:
+            entry.update(stat)
+
+    save_watermark(watermark, watermark_file)
+    (out_dir / "pending.json").write_text(json.dumps(manifest))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Incremental watermark for compound review")
+    sub = parser.add_subparsers(dest="command", required=True)
+    c = sub.add_parser("collect", help="Write new, not-yet-distilled sections as batches")
+    c.add_argument("--days", type=float, default=1)
+    c.add_argument("--out-dir", type=Path, required=True)
+    c.add_argument("--batch-tokens", type=int, default=DEFAULT_BATCH_TOKENS)
+    m = sub.add_parser("commit", help="Mark a batch as distilled")
+    m.add_argument("--out-dir", type=Path, required=True)
+    m.add_argument("batch")
+    args = parser.parse_args()
+
+    if args.command == "collect":
+        print(collect(args.days, args.out_dir, args.batch_tokens))
+    else:
+        commit(args.out_dir, args.batch)
+
+
+if __name__ == "__main__":
+    main()
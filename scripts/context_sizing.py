@@ -0,0 +1,78 @@
+"""Per-request num_ctx sizing for Ollama worker calls.
+
+Picks the smallest context bucket from a ladder that fits the system prompt,
+the user prompt and the agent's expected output. Changing num_ctx makes
+Ollama reload the model runner, so by default the previous bucket is reused
+when it still fits and is no more than one rung larger than needed.
+"""
+
+import os
+import threading
+from typing import Optional
+
+CTX_LADDER = [
+    int(n) for n in os.environ.get("CLAWD_CTX_LADDER", "4096,8192,16384,32768").split(",") if n.strip()
+]
+CTX_STICKY = os.environ.get("CLAWD_CTX_STICKY", "true").lower() == "true"
+
+# Deliberately conservative for code-heavy prompts; overflowing num_ctx
+# silently truncates the prompt, which is worse than a larger bucket
+CHARS_PER_TOKEN = 3.0
+HEADROOM = 1.10
+
+# Typical response budget per agent, in tokens
+EXPECTED_OUTPUT = {
+    "architect": 2048,
+    "scout": 1024,
+    "builder": 4096,
+    "refactorer": 4096,
+    "inspector": 1024,
+    "scribe": 1024,
+}
+DEFAULT_EXPECTED_OUTPUT = 2048
+
+_last_bucket: Optional[int] = None
+_lock = threading.Lock()
+
+
+def estimate_prompt_tokens(system_prompt: str, prompt: str) -> int:
+    """Estimate input tokens for a worker request."""
+    return int((len(system_prompt) + len(prompt)) / CHARS_PER_TOKEN) + 1
+
+
+def required_context(agent: str, system_prompt: str, prompt: str) -> int:
+    """Tokens needed for the prompt plus expected output, with headroom."""
+    expected = EXPECTED_OUTPUT.get(agent, DEFAULT_EXPECTED_OUTPUT)
+    return int((estimate_prompt_tokens(system_prompt, prompt) + expected) * HEADROOM)
+
+
+def choose_num_ctx(agent: str, system_prompt: str, prompt: str, ladder: list = None, sticky: bool = None) -> dict:
+    """Pick a num_ctx bucket for a worker request.
+
+    Returns:
+        Dict with num_ctx, required tokens and whether the previous bucket was reused.
+    """
+    global _last_bucket
+    ladder = sorted(ladder or CTX_LADDER)
+    sticky = CTX_STICKY if sticky is None else sticky
+    required = required_context(agent, system_prompt, prompt)
+
+    fitting = [b for b in ladder if b >= required]
+    # Nothing fits: use the largest bucket and let Ollama truncate
+    smallest = fitting[0] if fitting else ladder[-1]
+
+    with _lock:
+        reused = False
+        num_ctx = smallest
+        if sticky and _last_bucket in fitting:
+            if fitting.index(_last_bucket) <= 1:
+                num_ctx = _last_bucket
+                reused = num_ctx != smallest
+        _last_bucket = num_ctx
+
+    return {
+        "num_ctx": num_ctx,
+        "required_tokens": required,
+        "reused_bucket": reused,
+        "overflow": not fitting,
+    }
@@ -0,0 +1,377 @@
+#!/usr/bin/env python3
+"""
+Impact Runner - Test-impact selection and result caching for the inspector.
+
+Maps each test file to the project modules it imports (transitively, via the
+Python AST), runs only the tests affected by the current changes, and caches
+pass results keyed by the hashes of the test file and its dependencies. The
+full suite can optionally follow, skipping cached passes and sharding the
+rest across CPU cores. Prints a compact JSON summary for the Director.
+
+Usage:
+    python scripts/impact_runner.py <project>                 # Affected tests only
+    python scripts/impact_runner.py <project> --full          # Then the rest of the suite
+    python scripts/impact_runner.py <project> --full --shards 0   # Shard across all cores
+    python scripts/impact_runner.py /path/to/worktree --changed src/a.py
+
+<project> is a key from config/repositories.json or a directory (e.g. a fix
+worktree); changed files default to `git diff HEAD` plus untracked files.
+
+Environment:
+    CLAWD_HOME - Clawd directory (default: ~/clawd)
+"""
+
+import argparse
+import ast
+import hashlib
+import json
+import os
+import shlex
+import subprocess
+import sys
+import tempfile
+import time
+import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Optional
+
+CLAWD_HOME = Path(os.environ.get("CLAWD_HOME", Path.home() / "clawd"))
+CONFIG_FILE = CLAWD_HOME / "config" / "repositories.json"
+CACHE_DIR = CLAWD_HOME / "memory" / "test-cache"
+
+SKIP_DIRS = {".git", ".venv", "venv", "__pycache__", "node_modules", ".tox", ".nox", "build", "dist"}
+# Changes to these invalidate every test
+GLOBAL_FILES = {"pyproject.toml", "setup.cfg", "setup.py", "pytest.ini", "tox.ini", "requirements.txt"}
+MAX_FAILURES_REPORTED = 10
+
+
+# =============================================================================
+# Dependency mapping
+# =============================================================================
+
+def iter_python_files(root: Path):
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = [d for d in dirnames if d not in SKIP_DIRS and not d.startswith(".")]
+        for name in filenames:
+            if name.endswith(".py"):
+                yield Path(dirpath) / name
+
+
+def is_test_file(path: Path) -> bool:
+    return path.name.startswith("test_") or path.name.endswith("_test.py")
+
+
+def module_names(rel: Path) -> list:
+    """Importable names for a project file, from the root and from src/."""
+    parts = list(rel.with_suffix("").parts)
+    if parts[-1] == "__init__":
+        parts = parts[:-1]
+    names = [".".join(parts)] if parts else []
+    if len(parts) > 1 and parts[0] == "src":
+        names.append(".".join(parts[1:]))
+    # Tests often import siblings by bare name (rootdir/sys.path insertion)
+    if len(parts) > 1:
+        names.append(parts[-1])
+    return names
+
+
+def parse_imports(path: Path, rel: Path) -> list:
+    """Candidate module names imported by a file (absolute and resolved relative)."""
+    try:
+        tree = ast.parse(path.read_text(encoding="utf-8", errors="replace"))
+    except SyntaxError:
+        return []
+    package = list(rel.parent.parts)
+    names = []
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            names.extend(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom):
+            if node.level:
+                base = package[:len(package) - node.level + 1]
+                prefix = ".".join(base + ([node.module] if node.module else []))
+            else:
+                prefix = node.module or ""
+            names.append(prefix)
+            names.extend(f"{prefix}.{alias.name}" if prefix else alias.name for alias in node.names)
+    return names
+
+
+class DependencyMap:
+    """Test file -> project files it (transitively) imports."""
+
+    def __init__(self, root: Path):
+        self.root = root
+        self.files = [p.relative_to(root) for p in iter_python_files(root)]
+        self._file_set = set(self.files)
+        self.by_module = {}
+        for rel in self.files:
+            for name in module_names(rel):
+                # Prefer the shortest path for ambiguous bare names
+                if name not in self.by_module or len(rel.parts) < len(self.by_module[name].parts):
+                    self.by_module[name] = rel
+        self._direct = {}
+        self._closure = {}
+
+    def direct_deps(self, rel: Path) -> set:
+        if rel not in self._direct:
+            deps = set()
+            for name in parse_imports(self.root / rel, rel):
+                # "pkg.mod.func" may name an attribute; walk up to a module
+                parts = name.split(".")
+                while parts:
+                    target = self.by_module.get(".".join(parts))
+                    if target is not None:
+                        if target != rel:
+                            deps.add(target)
+                        break
+                    parts.pop()
+            # Package __init__ files run on import of any submodule
+            for parent in rel.parents:
+                init = parent / "__init__.py"
+                if init != rel and init in self._file_set:
+                    deps.add(init)
+            self._direct[rel] = deps
+        return self._direct[rel]
+
+    def closure(self, rel: Path) -> set:
+        if rel not in self._closure:
+            seen, stack = set(), [rel]
+            while stack:
+                current = stack.pop()
+                for dep in self.direct_deps(current):
+                    if dep not in seen:
+                        seen.add(dep)
+                        stack.append(dep)
+            self._closure[rel] = seen
+        return self._closure[rel]
+
+    def test_deps(self, test: Path) -> set:
+        """Imports plus every conftest.py that applies to the test."""
+        deps = set(self.closure(test))
+        for parent in test.parents:
+            conftest = parent / "conftest.py"
+            if (self.root / conftest).exists():
+                deps.add(conftest)
+                deps |= self.closure(conftest)
+        deps.discard(test)
+        return deps
+
+
+# =============================================================================
+# Selection and caching
+# =============================================================================
+
+def file_hash(path: Path) -> str:
+    return hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+def cache_key(root: Path, test: Path, deps: set, hashes: dict) -> str:
+    digest = hashlib.sha256(sys.version.encode())
+    for rel in [test, *sorted(deps)]:
+        if rel not in hashes:
+            hashes[rel] = file_hash(root / rel)
+        digest.update(f"{rel}:{hashes[rel]}\n".encode())
+    return digest.hexdigest()
+
+
+def changed_files(root: Path) -> list:
+    """Files changed against HEAD plus untracked files, relative to root."""
+    def git_lines(*args):
+        result = subprocess.run(["git", *args], cwd=root, capture_output=True, text=True)
+        return result.stdout.splitlines() if result.returncode == 0 else []
+    return sorted(set(git_lines("diff", "--name-only", "HEAD")) |
+                  set(git_lines("ls-files", "--others", "--exclude-standard")))
+
+
+def discover_tests(root: Path, test_command: str, dep_map: DependencyMap) -> list:
+    """Test files under the paths named in test_command (default: tests/)."""
+    args = [a for a in shlex.split(test_command or "") if not a.startswith("-")]
+    dirs = [Path(a) for a in args if (root / a).exists()] or [Path("tests")]
+    return sorted(
+        rel for rel in dep_map.files
+        if is_test_file(rel) and any(d == rel or d in rel.parents for d in dirs)
+    )
+
+
+def select_affected(tests: list, changed: list, dep_map: DependencyMap) -> list:
+    if any(Path(c).name in GLOBAL_FILES for c in changed):
+        return list(tests)
+    changed_set = {Path(c) for c in changed}
+    return [t for t in tests if t in changed_set or dep_map.test_deps(t) & changed_set]
+
+
+# =============================================================================
+# Execution
+# =============================================================================
+
+def run_pytest(root: Path, python: str, tests: list) -> dict:
+    """Run pytest on test files; returns per-file results and failures."""
+    with tempfile.TemporaryDirectory() as tmp:
+        junit = Path(tmp) / "junit.xml"
+        cmd = [python, "-m", "pytest", "-q", "-p", "no:cacheprovider",
+               "-o", "junit_family=xunit1", f"--junitxml={junit}", *map(str, tests)]
+        start = time.time()
+        proc = subprocess.run(cmd, cwd=root, capture_output=True, text=True)
+        duration = time.time() - start
+
+        files = {str(t): {"passed": 0, "failed": 0, "skipped": 0} for t in tests}
+        failures = []
+        if junit.exists():
+            for case in ET.parse(junit).getroot().iter("testcase"):
+                file = case.get("file") or ""
+                counts = files.setdefault(file, {"passed": 0, "failed": 0, "skipped": 0})
+                problem = case.find("failure")
+                if problem is None:
+                    problem = case.find("error")
+                if problem is not None:
+                    counts["failed"] += 1
+                    message = (problem.get("message") or "").strip().splitlines()
+                    failures.append({
+                        "test": f"{file}::{case.get('name')}",
+                        "message": (message[0] if message else problem.tag)[:200],
+                    })
+                elif case.find("skipped") is not None:
+                    counts["skipped"] += 1
+                else:
+                    counts["passed"] += 1
+
+    # A file with no recorded outcome failed to collect or crashed pytest
+    if proc.returncode not in (0, 5):
+        output = proc.stdout.strip().splitlines()
+        for file, counts in files.items():
+            if not any(counts.values()):
+                counts["failed"] += 1
+                failures.append({"test": file, "message": output[-1][:200] if output else "pytest error"})
+    return {"files": files, "failures": failures, "duration_s": duration, "exit_code": proc.returncode}
+
+
+def shard(tests: list, shards: int, durations: dict) -> list:
+    """Greedy longest-first split of tests into balanced shards."""
+    buckets = [[] for _ in range(max(1, min(shards, len(tests))))]
+    totals = [0.0] * len(buckets)
+    for test in sorted(tests, key=lambda t: -durations.get(str(t), 1.0)):
+        i = totals.index(min(totals))
+        buckets[i].append(test)
+        totals[i] += durations.get(str(test), 1.0)
+    return [b for b in buckets if b]
+
+
+def run_sharded(root: Path, python: str, tests: list, shards: int, durations: dict) -> dict:
+    groups = shard(tests, shards, durations) if tests else []
+    merged = {"files": {}, "failures": [], "duration_s": 0.0, "exit_code": 0}
+    if not groups:
+        return merged
+    start = time.time()
+    with ThreadPoolExecutor(max_workers=len(groups)) as executor:
+        for result in executor.map(lambda g: run_pytest(root, python, g), groups):
+            merged["files"].update(result["files"])
+            merged["failures"].extend(result["failures"])
+            merged["exit_code"] = max(merged["exit_code"], result["exit_code"])
+    merged["duration_s"] = time.time() - start
+    return merged
+
+
+# =============================================================================
+# Runner
+# =============================================================================
+
+def resolve_project(target: str) -> tuple:
+    """(root, test_command, cache name) for a project key or directory."""
+    if Path(target).expanduser().is_dir():
+        root = Path(target).expanduser().resolve()
+        return root, "python -m pytest tests/", root.name
+    with open(CONFIG_FILE) as f:
+        project = json.load(f)["projects"][target]
+    return Path(project["path"]).expanduser(), project.get("test_command", ""), target
+
+
+def project_python(root: Path) -> str:
+    venv_python = root / ".venv" / "bin" / "python"
+    return str(venv_python) if venv_python.exists() else sys.executable
+
+
+def run_impact(root: Path, test_command: str = "", changed: Optional[list] = None, full: bool = False,
+               shards: int = 1, cache_file: Optional[Path] = None, python: str = None) -> dict:
+    """Run affected tests (and optionally the rest), returning a compact summary."""
+    start = time.time()
+    python = python or project_python(root)
+    dep_map = DependencyMap(root)
+    tests = discover_tests(root, test_command, dep_map)
+    changed = changed_files(root) if changed is None else changed
+
+    cache = {}
+    if cache_file and cache_file.exists():
+        cache = json.loads(cache_file.read_text())
+    durations = {t: entry.get("duration_s", 1.0) for t, entry in cache.items()}
+
+    hashes = {}
+    keys = {t: cache_key(root, t, dep_map.test_deps(t), hashes) for t in tests}
+    affected = select_affected(tests, changed, dep_map)
+    phases = [("affected", affected)]
+    if full:
+        phases.append(("full", [t for t in tests if t not in set(affected)]))
+
+    summary = {
+        "changed": len(changed),
+        "tests_total": len(tests),
+        "affected": len(affected),
+        "ran": 0,
+        "cached": 0,
+        "passed": 0,
+        "failed": 0,
+        "skipped": 0,
+        "failures": [],
+    }
+    for phase, selected in phases:
+        to_run = [t for t in selected if cache.get(str(t), {}).get("key") != keys[t]]
+        summary["cached"] += len(selected) - len(to_run)
+        result = run_sharded(root, python, to_run, shards, durations)
+        summary["ran"] += len(to_run)
+        summary["failures"].extend(result["failures"])
+        per_file_time = result["duration_s"] / max(1, len(to_run))
+        for test in to_run:
+            counts = result["files"].get(str(test), {})
+            for k in ("passed", "failed", "skipped"):
+                summary[k] += counts.get(k, 0)
+            if counts and not counts.get("failed"):
+                cache[str(test)] = {"key": keys[test], "duration_s": round(per_file_time, 3)}
+            else:
+                cache.pop(str(test), None)
+        # Stop before the full suite if affected tests already fail
+        if summary["failed"]:
+            summary["stopped_after"] = phase
+            break
+
+    if cache_file:
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp = cache_file.with_suffix(".tmp")
+        tmp.write_text(json.dumps(cache))
+        os.replace(tmp, cache_file)
+
+    summary["failures"] = summary["failures"][:MAX_FAILURES_REPORTED]
+    summary["status"] = "fail" if summary["failed"] else "pass"
+    summary["duration_s"] = round(time.time() - start, 2)
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run tests affected by current changes")
+    parser.add_argument("project", help="Project key from repositories.json or a directory")
+    parser.add_argument("--changed", nargs="*", help="Changed files (default: git diff HEAD + untracked)")
+    parser.add_argument("--full", action="store_true", help="Run the rest of the suite after affected tests")
+    parser.add_argument("--shards", type=int, default=1, help="Parallel pytest processes (0 = CPU count)")
+    parser.add_argument("--no-cache", action="store_true", help="Ignore and don't update cached passes")
+    args = parser.parse_args()
+
+    root, test_command, name = resolve_project(args.project)
+    shards = args.shards or os.cpu_count() or 1
+    cache_file = None if args.no_cache else CACHE_DIR / f"{name}.json"
+    summary = run_impact(root, test_command, args.changed, args.full, shards, cache_file)
+    print(json.dumps(summary, indent=2))
+    sys.exit(0 if summary["status"] == "pass" else 1)
+
+
+if __name__ == "__main__":
+    main()
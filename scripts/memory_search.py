@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+"""
+Memory Search - In-process BM25 index over memory/ and docs/ markdown.
+
+Markdown files are split into heading-sized chunks and indexed into an
+inverted index persisted at memory/index/memory-search.json. Updates
+re-chunk only files whose mtime or size changed, so the orchestrator can
+check for new lessons every turn without noticeable latency.
+
+Optionally (CLAWD_EMBED_MODEL set), chunks are also embedded through
+Ollama's /api/embed and results are re-ranked by a BM25/cosine blend.
+
+Usage:
+    python scripts/memory_search.py "ollama timeout retries"
+    python scripts/memory_search.py --update
+
+Environment:
+    CLAWD_HOME - Clawd directory (default: ~/clawd)
+    CLAWD_EMBED_MODEL - Ollama embedding model for hybrid ranking (default: off)
+    OLLAMA_URL - Endpoint for embeddings (default: http://localhost:11434)
+"""
+
+import argparse
+import json
+import math
+import os
+import re
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Optional
+
+CLAWD_HOME = Path(os.environ.get("CLAWD_HOME", Path.home() / "clawd"))
+INDEX_FILE = CLAWD_HOME / "memory" / "index" / "memory-search.json"
+EMBED_MODEL = os.environ.get("CLAWD_EMBED_MODEL", "")
+OLLAMA_URL = os.environ.get("OLLAMA_URL", "http://localhost:11434")
+
+INDEX_VERSION = 1
+# Machine-written state, not lessons
+SKIP_DIRS = {"checkpoints", "logs", "index", "blobs", "tasks", "alerts", "test-cache"}
+MAX_CHUNK_CHARS = 1500
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+TOKEN_RE = re.compile(r"[a-z0-9_]{2,}")
+HEADING_RE = re.compile(r"^#{1,3}\s+(.*)$", re.MULTILINE)
+STOPWORDS = {
+    "the", "and", "for", "with", "that", "this", "from", "are", "was", "were", "will", "should",
+    "into", "not", "but", "you", "your", "our", "has", "have", "had", "can", "all", "any", "use",
+    "its", "it", "is", "in", "on", "of", "to", "be", "as", "by", "or", "an", "at", "if", "do",
+}
+
+
+def tokenize(text: str) -> list:
+    return [t for t in TOKEN_RE.findall(text.lower()) if t not in STOPWORDS]
+
+
+def chunk_markdown(text: str) -> list:
+    """Split markdown at headings into (heading, text) chunks of bounded size."""
+    positions = [m.start() for m in HEADING_RE.finditer(text)]
+    if not positions or positions[0] != 0:
+        positions.insert(0, 0)
+    positions.append(len(text))
+
+    chunks = []
+    for start, end in zip(positions, positions[1:]):
+        section = text[start:end].strip()
+        if not section:
+            continue
+        match = HEADING_RE.match(section)
+        heading = match.group(1).strip() if match else ""
+        for i in range(0, len(section), MAX_CHUNK_CHARS):
+            piece = section[i:i + MAX_CHUNK_CHARS].strip()
+            if tokenize(piece):
+                chunks.append((heading, piece))
+    return chunks
+
+
+def embed(texts: list) -> Optional[list]:
+    """Embeddings from Ollama, or None if disabled/unavailable."""
+    if not EMBED_MODEL or not texts:
+        return None
+    import urllib.request  # Embeddings are optional; keeps startup light
+
+    payload = json.dumps({"model": EMBED_MODEL, "input": texts}).encode("utf-8")
+    req = urllib.request.Request(f"{OLLAMA_URL}/api/embed", data=payload,
+                                 headers={"Content-Type": "application/json"}, method="POST")
+    try:
+        with urllib.request.urlopen(req, timeout=30) as response:
+            return json.loads(response.read().decode("utf-8")).get("embeddings")
+    except Exception:
+        return None
+
+
+def cosine(a: list, b: list) -> float:
+    dot = sum(x * y for x, y in zip(a, b))
+    norm = math.sqrt(sum(x * x for x in a)) * math.sqrt(sum(y * y for y in b))
+    return dot / norm if norm else 0.0
+
+
+class MemoryIndex:
+    """Persistent BM25 index over markdown chunks, updated per file."""
+
+    def __init__(self, roots: list, index_file: Path = INDEX_FILE, base: Path = CLAWD_HOME):
+        self.roots = [Path(r) for r in roots]
+        self.base = Path(base)
+        self.index_file = Path(index_file)
+        self.files = {}
+        if self.index_file.exists():
+            data = json.loads(self.index_file.read_text())
+            if data.get("version") == INDEX_VERSION and data.get("embed_model") == EMBED_MODEL:
+                self.files = data["files"]
+        self._postings = None
+        self._query_embeddings = {}
+
+    def _iter_markdown(self):
+        for root in self.roots:
+            if not root.is_dir():
+                continue
+            for dirpath, dirnames, filenames in os.walk(root):
+                dirnames[:] = [d for d in dirnames if d not in SKIP_DIRS and not d.startswith(".")]
+                for name in filenames:
+                    if name.endswith(".md"):
+                        yield Path(dirpath) / name
+
+    def _rel(self, path: Path) -> str:
+        try:
+            return str(path.relative_to(self.base))
+        except ValueError:
+            return str(path)
+
+    def update(self) -> int:
+        """Re-index changed files and drop deleted ones. Returns files changed."""
+        seen, changed = set(), 0
+        for path in self._iter_markdown():
+            rel = self._rel(path)
+            seen.add(rel)
+            stat = path.stat()
+            entry = self.files.get(rel)
+            if entry and entry["mtime"] == stat.st_mtime and entry["size"] == stat.st_size:
+                continue
+            chunks = chunk_markdown(path.read_text(encoding="utf-8", errors="replace"))
+            vectors = embed([text for _, text in chunks]) or [None] * len(chunks)
+            indexed = []
+            for (heading, text), vector in zip(chunks, vectors):
+                tokens = tokenize(text)
+                indexed.append({"heading": heading, "text": text, "tf": dict(Counter(tokens)),
+                                "length": len(tokens), "embedding": vector})
+            self.files[rel] = {"mtime": stat.st_mtime, "size": stat.st_size, "chunks": indexed}
+            changed += 1
+        for rel in set(self.files) - seen:
+            del self.files[rel]
+            changed += 1
+        if changed:
+            self._postings = None
+        return changed
+
+    def save(self):
+        self.index_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.index_file.with_suffix(".tmp")
+        tmp.write_text(json.dumps({"version": INDEX_VERSION, "embed_model": EMBED_MODEL, "files": self.files}))
+        os.replace(tmp, self.index_file)
+
+    def _build(self):
+        """Inverted index: term -> [(chunk ref, tf)], plus corpus stats."""
+        postings, chunks, total_length = {}, [], 0
+        for rel, entry in self.files.items():
+            for chunk in entry["chunks"]:
+                ref = len(chunks)
+                chunks.append((rel, chunk))
+                total_length += chunk["length"]
+                for term, tf in chunk["tf"].items():
+                    postings.setdefault(term, []).append((ref, tf))
+        self._postings = postings
+        self._chunks = chunks
+        self._avg_length = total_length / len(chunks) if chunks else 0
+
+    def search(self, query: str, k: int = 5, exclude: set = None) -> list:
+        """Top-k chunks for the query as dicts with file, heading, text, score."""
+        if self._postings is None:
+            self._build()
+        n = len(self._chunks)
+        scores = {}
+        for term in set(tokenize(query)):
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + (n - len(postings) + 0.5) / (len(postings) + 0.5))
+            for ref, tf in postings:
+                length = self._chunks[ref][1]["length"]
+                norm = BM25_K1 * (1 - BM25_B + BM25_B * length / (self._avg_length or 1))
+                scores[ref] = scores.get(ref, 0.0) + idf * tf * (BM25_K1 + 1) / (tf + norm)
+
+        exclude = exclude or set()
+        ranked = [(s, ref) for ref, s in scores.items() if self._chunks[ref][0] not in exclude]
+        ranked.sort(reverse=True)
+        ranked = ranked[:k * 3] if EMBED_MODEL else ranked[:k]
+
+        if EMBED_MODEL and ranked:
+            if query not in self._query_embeddings:
+                vectors = embed([query])
+                self._query_embeddings[query] = vectors[0] if vectors else None
+            query_vec = self._query_embeddings[query]
+            if query_vec is not None:
+                top = ranked[0][0]
+                ranked = sorted(
+                    ((0.5 * s / top + 0.5 * cosine(query_vec, self._chunks[ref][1]["embedding"] or []), ref)
+                     for s, ref in ranked),
+                    reverse=True,
+                )
+            ranked = ranked[:k]
+
+        return [
+            {"file": self._chunks[ref][0], "heading": self._chunks[ref][1]["heading"],
+             "text": self._chunks[ref][1]["text"], "score": round(score, 3)}
+            for score, ref in ranked
+        ]
+
+
+def format_lessons(results: list, max_tokens: int) -> list:
+    """Markdown lines for search results, cut to a ~4 chars/token budget."""
+    lines, budget = [], max_tokens * 4
+    for r in results:
+        title = f"### {r['file']}" + (f" — {r['heading']}" if r["heading"] else "")
+        room = budget - len(title) - 1
+        if room < 200:
+            break
+        text = r["text"] if len(r["text"]) <= room else r["text"][:room] + "... [truncated]"
+        lines.extend([title, text, ""])
+        budget -= len(title) + len(text) + 2
+    return lines
+
+
+def default_index() -> MemoryIndex:
+    return MemoryIndex([CLAWD_HOME / "memory", CLAWD_HOME / "docs"])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Search memory/ and docs/ with BM25")
+    parser.add_argument("query", nargs="?", help="Search text")
+    parser.add_argument("-k", type=int, default=5, help="Number of results")
+    parser.add_argument("--update", action="store_true", help="Only update the index")
+    args = parser.parse_args()
+
+    index = default_index()
+    start = time.time()
+    changed = index.update()
+    if changed:
+        index.save()
+    if args.update or not args.query:
+        print(f"Indexed {len(index.files)} files ({changed} changed) in {(time.time() - start) * 1000:.0f}ms")
+        return
+
+    start = time.time()
+    for r in index.search(args.query, args.k):
+        print(f"{r['score']:>7.3f}  {r['file']}  {r['heading']}")
+    print(f"({(time.time() - start) * 1000:.1f}ms)", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
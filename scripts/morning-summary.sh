@@ -14,7 +14,6 @@ set -euo pipefail
 CLAWD_HOME="${CLAWD_HOME:-$HOME/clawd}"
 SCRIPTS_DIR="$CLAWD_HOME/scripts"
 LOGS_DIR="$CLAWD_HOME/memory/logs"
-CHECKPOINTS_DIR="$CLAWD_HOME/memory/checkpoints"
 LEARNINGS_DIR="$CLAWD_HOME/memory/learnings"
 
 # Date to summarize (default: today, which covers last night's run)
@@ -36,28 +35,13 @@ if [[ ! -f "$ORCHESTRATOR_LOG" ]] && [[ ! -f "$EVENTS_LOG" ]]; then
     exit 0
 fi
 
-# Initialize counters
-TASKS_COMPLETED=0
-TASKS_ESCALATED=0
-TASKS_HALTED=0
-ERRORS=0
-TURNS=0
-
-# Parse orchestrator log if exists
-if [[ -f "$ORCHESTRATOR_LOG" ]]; then
-    TASKS_COMPLETED=$(grep -c "Task completed\|status: complete" "$ORCHESTRATOR_LOG" 2>/dev/null || echo 0)
-    TASKS_ESCALATED=$(grep -c "ESCALATE\|status: escalated" "$ORCHESTRATOR_LOG" 2>/dev/null || echo 0)
-    TASKS_HALTED=$(grep -c "HALT\|status: halted" "$ORCHESTRATOR_LOG" 2>/dev/null || echo 0)
-    ERRORS=$(grep -c "\[ERROR\]" "$ORCHESTRATOR_LOG" 2>/dev/null || echo 0)
-    TURNS=$(grep -c "Calling Director\|Director decision" "$ORCHESTRATOR_LOG" 2>/dev/null || echo 0)
-fi
-
-# Parse events log if exists (JSONL format)
-if [[ -f "$EVENTS_LOG" ]]; then
-    # Count events by type
-    WORKER_CALLS=$(grep -c '"type":"worker_call"' "$EVENTS_LOG" 2>/dev/null || echo 0)
-    CHECKPOINTS=$(grep -c '"type":"checkpoint"' "$EVENTS_LOG" 2>/dev/null || echo 0)
-fi
+# Counts come from the analytics rollups (see analytics.py), which only
+# read log content added since the last ingest
+eval "$(python3 "$SCRIPTS_DIR/analytics.py" summary "$TARGET_DATE" --format shell)"
+TASKS_COMPLETED=$COMPLETED
+TASKS_ESCALATED=$ESCALATED
+TASKS_HALTED=$((HALTED + MAX_TURNS))
+TURNS=$DIRECTOR_TURNS
 
 # Check for new compound learnings
 LEARNINGS_ADDED=0
@@ -65,9 +49,6 @@ if [[ -f "$COMPOUND_LOG" ]]; then
     LEARNINGS_ADDED=$(grep -c "^### " "$COMPOUND_LOG" 2>/dev/null || echo 0)
 fi
 
-# Count checkpoints created
-CHECKPOINTS_TODAY=$(find "$CHECKPOINTS_DIR" -name "*$TARGET_DATE*" -type f 2>/dev/null | wc -l | tr -d ' ')
-
 # Build summary
 SUMMARY="Overnight Run Summary ($TARGET_DATE):
 
@@ -78,8 +59,8 @@ Tasks:
 
 Activity:
 - Director turns: $TURNS
-- Worker calls: ${WORKER_CALLS:-N/A}
-- Checkpoints: $CHECKPOINTS_TODAY
+- Worker calls: $WORKER_CALLS
+- Checkpoints: $CHECKPOINTS
 - Errors: $ERRORS
 
 Compound Learning:
@@ -4,6 +4,10 @@
 # Usage: ./ollama-watchdog.sh &
 #        (Run in a separate terminal or as background process)
 #
+# Only catches hard failures (no response from /api/tags). ollama_watchdog.py
+# also runs canary generations and acts on sustained slowdowns; both write
+# the same watchdog-status.json, so run one or the other.
+#
 # Environment variables:
 #   OLLAMA_URL        - Ollama API URL (default: http://localhost:11434)
 #   CHECK_INTERVAL    - Seconds between checks (default: 300 = 5 min)
@@ -0,0 +1,262 @@
+"""Load balancing across multiple Ollama hosts for worker calls.
+
+Picks the host with the fewest outstanding requests, preferring hosts that
+already have the model loaded (from /api/ps). Hosts that keep failing are
+ejected for a cooldown period and then retried. Hosts the throughput
+watchdog (ollama_watchdog.py) reports as degraded or down are avoided while
+a healthier host is available. The process-wide pool publishes its
+outstanding calls per host to memory/logs/ollama-inflight/<pid>.json, so the
+watchdog never judges or restarts a host that is busy with real work.
+"""
+
+import json
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Optional
+
+# Comma-separated list of Ollama base URLs; falls back to OLLAMA_URL
+OLLAMA_URLS = os.environ.get("OLLAMA_URLS", "")
+OLLAMA_URL = os.environ.get("OLLAMA_URL", "http://localhost:11434")
+
+PROBE_INTERVAL = 15  # seconds between /api/ps refreshes
+PROBE_TIMEOUT = 2
+EJECT_AFTER = 3  # consecutive failures before ejection
+EJECT_SECONDS = 60
+# A host without the model loaded counts as this many extra outstanding
+# requests (cold loads cost far more than a short queue)
+AFFINITY_WEIGHT = float(os.environ.get("OLLAMA_AFFINITY_WEIGHT", 2))
+LATENCY_WINDOW = 100
+WATCHDOG_STATUS_FILE = (Path(os.environ.get("CLAWD_HOME", Path.home() / "clawd"))
+                        / "memory" / "logs" / "watchdog-status.json")
+INFLIGHT_DIR = WATCHDOG_STATUS_FILE.parent / "ollama-inflight"
+WATCHDOG_STALE_SECONDS = 900  # An older status means the watchdog is not running
+
+
+def normalize_model(name: str) -> str:
+    """Ollama reports "qwen3:14b" and "foo:latest"; untagged names mean :latest."""
+    return name if ":" in name else f"{name}:latest"
+
+
+def percentile(values, pct: float) -> Optional[float]:
+    """Nearest-rank percentile of a sequence, or None if empty."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+def watchdog_unhealthy(status_file: Path = WATCHDOG_STATUS_FILE) -> set:
+    """URLs of hosts the watchdog currently reports as degraded or down."""
+    try:
+        status = json.loads(Path(status_file).read_text())
+    except (OSError, ValueError):
+        return set()
+    if time.time() - status.get("updated_at", 0) > WATCHDOG_STALE_SECONDS:
+        return set()
+    return {url.rstrip("/") for url, host in status.get("hosts", {}).items()
+            if host.get("status") in ("degraded", "down")}
+
+
+def outstanding_calls(inflight_dir: Path = INFLIGHT_DIR) -> dict:
+    """Calls in flight per host URL, summed over every live process's pool."""
+    totals = {}
+    for path in Path(inflight_dir).glob("*.json"):
+        try:
+            os.kill(int(path.stem), 0)
+            hosts = json.loads(path.read_text())["hosts"]
+        except PermissionError:
+            continue  # Another user's process; not ours to count
+        except (OSError, ValueError, KeyError):
+            continue  # Process gone, or file replaced mid-read
+        for url, count in hosts.items():
+            totals[url] = totals.get(url, 0) + count
+    return totals
+
+
+class OllamaHost:
+    """Runtime state for one Ollama endpoint."""
+
+    def __init__(self, url: str):
+        self.url = url.rstrip("/")
+        self.outstanding = 0
+        self.consecutive_failures = 0
+        self.ejected_until = 0.0
+        self.loaded_models: set = set()
+        self.latencies_ms = deque(maxlen=LATENCY_WINDOW)
+        self.calls = 0
+        self.failures = 0
+
+    def is_ejected(self, now: float) -> bool:
+        return now < self.ejected_until
+
+    def stats(self) -> dict:
+        return {
+            "host": self.url,
+            "outstanding": self.outstanding,
+            "calls": self.calls,
+            "failures": self.failures,
+            "p50_ms": percentile(self.latencies_ms, 50),
+            "p95_ms": percentile(self.latencies_ms, 95),
+            "loaded_models": sorted(self.loaded_models),
+        }
+
+
+class OllamaPool:
+    """Least-outstanding-requests balancer with model affinity and ejection."""
+
+    def __init__(self, urls: list, clock=time.monotonic, watchdog_status_file: Path = WATCHDOG_STATUS_FILE,
+                 inflight_dir: Path = None):
+        if not urls:
+            raise ValueError("OllamaPool needs at least one URL")
+        self.hosts = [OllamaHost(u) for u in urls]
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._last_probe = float("-inf")
+        self.watchdog_status_file = watchdog_status_file
+        self._watchdog_unhealthy: set = set()
+        self.inflight_file = Path(inflight_dir) / f"{os.getpid()}.json" if inflight_dir else None
+
+    def _publish(self):
+        """Write outstanding calls for the watchdog (called with the lock held)."""
+        if self.inflight_file is None:
+            return
+        hosts = {h.url: h.outstanding for h in self.hosts if h.outstanding}
+        try:
+            if not hosts:
+                self.inflight_file.unlink(missing_ok=True)
+                return
+            self.inflight_file.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.inflight_file.with_suffix(".tmp")
+            tmp.write_text(json.dumps({"hosts": hosts}))
+            os.replace(tmp, self.inflight_file)
+        except OSError:
+            pass  # Advisory only; never fail a worker call over it
+
+    # -- Probing --------------------------------------------------------------
+
+    def _probe(self, host: OllamaHost) -> Optional[set]:
+        """Fetch loaded models from /api/ps, or None if the host is unreachable."""
+        import urllib.request  # Only multi-host pools probe; keeps startup light
+
+        try:
+            with urllib.request.urlopen(f"{host.url}/api/ps", timeout=PROBE_TIMEOUT) as response:
+                data = json.loads(response.read().decode("utf-8"))
+            return {normalize_model(m.get("name") or m.get("model", "")) for m in data.get("models", [])}
+        except Exception:
+            return None
+
+    def refresh(self, force: bool = False):
+        """Re-probe every host's loaded models (at most once per PROBE_INTERVAL)."""
+        # A single host has nothing to choose between
+        if len(self.hosts) == 1:
+            return
+        with self._lock:
+            now = self._clock()
+            if not force and now - self._last_probe < PROBE_INTERVAL:
+                return
+            self._last_probe = now
+
+        with ThreadPoolExecutor(max_workers=len(self.hosts)) as executor:
+            results = list(executor.map(self._probe, self.hosts))
+        unhealthy = watchdog_unhealthy(self.watchdog_status_file)
+
+        with self._lock:
+            self._watchdog_unhealthy = unhealthy
+            for host, models in zip(self.hosts, results):
+                if models is None:
+                    self._record_failure(host)
+                else:
+                    host.loaded_models = models
+                    if host.consecutive_failures:
+                        host.consecutive_failures = 0
+                        host.ejected_until = 0.0
+
+    # -- Selection ------------------------------------------------------------
+
+    def acquire(self, model: str, exclude: OllamaHost = None) -> Optional[OllamaHost]:
+        """Pick a host for `model` and count the request as outstanding.
+
+        With `exclude` (a host already serving the same request) only a
+        different healthy host will do; returns None if there is none.
+        """
+        self.refresh()
+        wanted = normalize_model(model)
+        with self._lock:
+            now = self._clock()
+            candidates = [h for h in self.hosts if not h.is_ejected(now) and h is not exclude]
+            # Reachable but slow hosts are a last resort, and never worth a hedge
+            preferred = [h for h in candidates if h.url not in self._watchdog_unhealthy]
+            if preferred or exclude is not None:
+                candidates = preferred
+            if not candidates and exclude is not None:
+                return None
+            if not candidates:
+                # Everything is ejected: try the one that comes back soonest
+                candidates = [min(self.hosts, key=lambda h: h.ejected_until)]
+
+            def load(host: OllamaHost):
+                cold = 0 if wanted in host.loaded_models else AFFINITY_WEIGHT
+                p50 = percentile(host.latencies_ms, 50) or 0
+                return (host.outstanding + cold, p50)
+
+            host = min(candidates, key=load)
+            host.outstanding += 1
+            self._publish()
+            return host
+
+    def release(self, host: OllamaHost, success: bool, latency_ms: int, model: str = None):
+        """Return a host after a call, updating health and latency stats."""
+        with self._lock:
+            host.outstanding = max(0, host.outstanding - 1)
+            self._publish()
+            host.calls += 1
+            if success:
+                host.latencies_ms.append(latency_ms)
+                host.consecutive_failures = 0
+                host.ejected_until = 0.0
+                if model:
+                    # A successful generation leaves the model resident
+                    host.loaded_models.add(normalize_model(model))
+            else:
+                self._record_failure(host)
+
+    def cancel(self, host: OllamaHost):
+        """Return a host whose call was abandoned (a hedge loser); not a health signal."""
+        with self._lock:
+            host.outstanding = max(0, host.outstanding - 1)
+            self._publish()
+
+    def _record_failure(self, host: OllamaHost):
+        host.failures += 1
+        host.consecutive_failures += 1
+        if host.consecutive_failures >= EJECT_AFTER:
+            host.ejected_until = self._clock() + EJECT_SECONDS
+
+    def stats(self) -> list:
+        with self._lock:
+            now = self._clock()
+            return [{**h.stats(), "ejected": h.is_ejected(now), "watchdog_unhealthy": h.url in self._watchdog_unhealthy}
+                    for h in self.hosts]
+
+
+def pool_urls_from_env() -> list:
+    urls = [u.strip() for u in OLLAMA_URLS.split(",") if u.strip()]
+    return urls or [OLLAMA_URL]
+
+
+_pool: Optional[OllamaPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_ollama_pool() -> OllamaPool:
+    """Process-wide pool built from OLLAMA_URLS / OLLAMA_URL."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = OllamaPool(pool_urls_from_env(), inflight_dir=INFLIGHT_DIR)
+        return _pool
@@ -0,0 +1,478 @@
+#!/usr/bin/env python3
+"""
+Ollama Watchdog - Throughput-based health monitoring for Ollama hosts.
+
+Each round runs a tiny canary generation on every idle host and measures
+decode speed (tokens/sec) and time to first token, both from Ollama's own
+eval timings, so time spent queued behind other requests never counts. The
+canary uses the num_ctx of the loaded model so it does not force a reload.
+Both numbers are compared with the host's rolling baseline: the median of
+its recent healthy canaries. A canary is slow when tokens/sec drops below
+TPS_RATIO of baseline or time to first token grows past TTFT_RATIO times
+baseline. That catches a server that still answers /api/tags but generates
+at a crawl (memory pressure, swapping, a wedged model). After
+DEGRADED_CHECKS slow canaries in a row the host is degraded and the
+watchdog reloads the model, then restarts Ollama if the reload did not
+help. Failed canaries restart Ollama after MAX_FAILURES, as the shell
+watchdog did. Restarts only touch local hosts unless OLLAMA_RESTART_COMMAND
+is set.
+
+Hosts with worker calls in flight (published by OllamaPool) are skipped: no
+canary, and no reload or restart under a live call. A canary that fails or
+is slow while a call started meanwhile is discounted.
+
+Status is written to memory/logs/watchdog-status.json (overall status plus
+a section per host); OllamaPool steers work away from hosts it reports as
+degraded or down.
+
+Usage:
+    python scripts/ollama_watchdog.py          # Monitor until stopped
+    python scripts/ollama_watchdog.py --once   # One round, print the status
+
+Environment:
+    OLLAMA_URLS / OLLAMA_URL - Hosts to watch (default: http://localhost:11434)
+    MODEL_TO_LOAD - Canary and reload model (default: CLAWD_MODEL or qwen-coder-16k)
+    CHECK_INTERVAL - Seconds between rounds (default: 120)
+    MAX_FAILURES - Failed canaries in a row before a restart (default: 3)
+    DEGRADED_CHECKS - Slow canaries in a row before remediation (default: 3)
+    OLLAMA_RESTART_COMMAND - Shell command that restarts Ollama (default: pkill + ollama serve)
+    CLAWD_HOME - Clawd directory (default: ~/clawd)
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from collections import deque
+from datetime import datetime
+from pathlib import Path
+from urllib.parse import urlparse
+
+sys.path.insert(0, str(Path(__file__).parent))
+from context_sizing import CTX_LADDER
+from ollama_pool import normalize_model, outstanding_calls, pool_urls_from_env
+
+CLAWD_HOME = Path(os.environ.get("CLAWD_HOME", Path.home() / "clawd"))
+LOGS_DIR = CLAWD_HOME / "memory" / "logs"
+ALERTS_DIR = CLAWD_HOME / "memory" / "alerts"
+STATUS_FILE = LOGS_DIR / "watchdog-status.json"
+LOG_FILE = LOGS_DIR / "watchdog.log"
+
+MODEL_TO_LOAD = os.environ.get("MODEL_TO_LOAD", os.environ.get("CLAWD_MODEL", "qwen-coder-16k"))
+CHECK_INTERVAL = int(os.environ.get("CHECK_INTERVAL", 120))
+MAX_FAILURES = int(os.environ.get("MAX_FAILURES", 3))
+DEGRADED_CHECKS = int(os.environ.get("DEGRADED_CHECKS", 3))
+OLLAMA_RESTART_COMMAND = os.environ.get("OLLAMA_RESTART_COMMAND", "")
+
+CANARY_PROMPT = "Count from 1 to 30, separated by spaces."
+CANARY_TOKENS = 32
+CANARY_TIMEOUT = 60
+BASELINE_WINDOW = 20
+BASELINE_MIN_SAMPLES = 5
+TPS_RATIO = 0.5  # Slow below half the baseline decode speed
+TTFT_RATIO = 3.0  # Slow at three times the baseline time to first token
+TTFT_FLOOR_MS = 500  # First tokens faster than this are never called slow
+RESTART_COOLDOWN = 1800
+MEMORY_ALERT_PERCENT = 95
+MEMORY_ALERT_INTERVAL = 3600
+
+# Statuses in order of severity; the pool avoids the last two
+STATUSES = ["healthy", "warming", "recovering", "slow", "failing", "degraded", "down"]
+UNHEALTHY_STATUSES = {"degraded", "down"}
+
+
+def log(level: str, message: str):
+    line = f"[{datetime.now().isoformat(timespec='seconds')}] [{level}] {message}"
+    print(line, flush=True)
+    LOGS_DIR.mkdir(parents=True, exist_ok=True)
+    with open(LOG_FILE, "a") as f:
+        f.write(line + "\n")
+
+
+def create_alert(title: str, severity: str, description: str, url: str = ""):
+    ALERTS_DIR.mkdir(parents=True, exist_ok=True)
+    host = f"-{urlparse(url).hostname}" if url else ""
+    alert_file = ALERTS_DIR / f"OLLAMA-{datetime.now().strftime('%Y%m%d-%H%M%S')}{host}.md"
+    alert_file.write_text(f"""# ESCALATION: {title}
+
+**Timestamp**: {datetime.now().isoformat()}
+**Severity**: {severity}
+**Agent**: Watchdog
+
+## Issue
+
+{description}
+
+## Human Action Needed
+
+Check Ollama logs at: {LOGS_DIR / 'ollama-serve.log'}
+Check watchdog status at: {STATUS_FILE}
+""")
+    log("ALERT", f"Created alert: {alert_file.name}")
+
+
+def memory_percent():
+    """Share of system memory in use, or None if it cannot be read."""
+    try:
+        if Path("/proc/meminfo").exists():
+            info = dict(line.split(":", 1) for line in Path("/proc/meminfo").read_text().splitlines())
+            total = int(info["MemTotal"].split()[0])
+            available = int(info["MemAvailable"].split()[0])
+            return round(100 * (total - available) / total)
+        output = subprocess.run(["vm_stat"], capture_output=True, text=True, timeout=5).stdout
+        pages = {line.split(":")[0]: int(line.split(":")[1].strip(" .")) for line in output.splitlines()[1:]
+                 if ":" in line and line.split(":")[1].strip(" .").isdigit()}
+        used = pages["Pages active"] + pages["Pages wired down"]
+        total = used + pages["Pages free"] + pages["Pages inactive"]
+        return round(100 * used / total)
+    except (OSError, KeyError, ValueError, ZeroDivisionError, subprocess.SubprocessError):
+        return None
+
+
+# =============================================================================
+# Canary
+# =============================================================================
+
+def _post(url: str, payload: dict, timeout: float):
+    import urllib.request  # Only needed once a check runs
+
+    req = urllib.request.Request(url, data=json.dumps(payload).encode("utf-8"),
+                                 headers={"Content-Type": "application/json"}, method="POST")
+    return urllib.request.urlopen(req, timeout=timeout)
+
+
+def loaded_num_ctx(url: str, model: str) -> int:
+    """Context size the model is loaded with, so the canary does not reload it."""
+    import urllib.request
+
+    try:
+        with urllib.request.urlopen(f"{url}/api/ps", timeout=5) as response:
+            models = json.loads(response.read()).get("models", [])
+        for m in models:
+            if normalize_model(m.get("name") or m.get("model", "")) == normalize_model(model):
+                return int(m["context_length"])
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+    return min(CTX_LADDER)  # Not loaded (or an older Ollama): the workers' smallest bucket
+
+
+def run_canary(url: str, model: str = MODEL_TO_LOAD, timeout: float = CANARY_TIMEOUT) -> dict:
+    """Stream a short generation and time it; raises if the host cannot serve it."""
+    payload = {"model": model, "prompt": CANARY_PROMPT, "stream": True,
+               "options": {"num_predict": CANARY_TOKENS, "temperature": 0, "seed": 1,
+                           "num_ctx": loaded_num_ctx(url, model)}}
+    start = time.monotonic()
+    first_token = None
+    final = {}
+    with _post(f"{url}/api/generate", payload, timeout) as response:
+        for line in response:
+            if not line.strip():
+                continue
+            chunk = json.loads(line)
+            if chunk.get("error"):
+                raise RuntimeError(chunk["error"])
+            if first_token is None and chunk.get("response"):
+                first_token = time.monotonic()
+            if chunk.get("done"):
+                final = chunk
+                break
+    if not final.get("eval_count"):
+        raise RuntimeError("canary produced no tokens")
+
+    load_ms = int(final.get("load_duration", 0) / 1e6)
+    # Server-side prompt processing: excludes queueing, network and model load
+    ttft_ms = int(final.get("prompt_eval_duration", 0) / 1e6)
+    client_ttft_ms = int(((first_token or time.monotonic()) - start) * 1000)
+    eval_seconds = final.get("eval_duration", 0) / 1e9
+    return {
+        "tokens": final["eval_count"],
+        "tokens_per_sec": round(final["eval_count"] / eval_seconds, 2) if eval_seconds else None,
+        "ttft_ms": ttft_ms,
+        "wait_ms": max(0, client_ttft_ms - load_ms - ttft_ms),  # Queued or in transit; informational
+        "load_ms": load_ms,
+        "num_ctx": payload["options"]["num_ctx"],
+        "total_ms": int((time.monotonic() - start) * 1000),
+    }
+
+
+def reload_model(url: str, model: str = MODEL_TO_LOAD):
+    """Unload the model, then load it again."""
+    with _post(f"{url}/api/generate", {"model": model, "keep_alive": 0}, CANARY_TIMEOUT) as response:
+        response.read()
+    with _post(f"{url}/api/generate", {"model": model, "prompt": "", "keep_alive": "30m"}, 300) as response:
+        response.read()
+
+
+def restart_ollama(url: str) -> bool:
+    """Restart the Ollama server and wait for it to answer again."""
+    import urllib.request
+
+    if OLLAMA_RESTART_COMMAND:
+        subprocess.run(OLLAMA_RESTART_COMMAND, shell=True, timeout=120)
+    else:
+        subprocess.run(["pkill", "-f", "ollama serve"], capture_output=True)
+        time.sleep(3)
+        LOGS_DIR.mkdir(parents=True, exist_ok=True)
+        with open(LOGS_DIR / "ollama-serve.log", "a") as serve_log:
+            subprocess.Popen(["ollama", "serve"], stdout=serve_log, stderr=subprocess.STDOUT,
+                             start_new_session=True)
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        try:
+            with urllib.request.urlopen(f"{url}/api/tags", timeout=5):
+                return True
+        except OSError:
+            time.sleep(2)
+    return False
+
+
+def is_local(url: str) -> bool:
+    return urlparse(url).hostname in ("localhost", "127.0.0.1", "::1")
+
+
+# =============================================================================
+# Baseline and per-host state
+# =============================================================================
+
+class Baseline:
+    """Rolling window of healthy canaries; medians are the reference."""
+
+    def __init__(self, samples: list = None):
+        self.samples = deque(samples or [], maxlen=BASELINE_WINDOW)
+
+    def ready(self) -> bool:
+        return len(self.samples) >= BASELINE_MIN_SAMPLES
+
+    def medians(self) -> dict:
+        if not self.samples:
+            return {"tokens_per_sec": None, "ttft_ms": None, "samples": 0}
+        return {
+            "tokens_per_sec": round(statistics.median(s[0] for s in self.samples), 2),
+            "ttft_ms": int(statistics.median(s[1] for s in self.samples)),
+            "samples": len(self.samples),
+        }
+
+    def judge(self, canary: dict) -> list:
+        """Reasons the canary is slow against the baseline (empty if it is not)."""
+        if not self.ready():
+            return []
+        reference = self.medians()
+        reasons = []
+        tps = canary["tokens_per_sec"]
+        if tps is not None and tps < reference["tokens_per_sec"] * TPS_RATIO:
+            reasons.append(f"{tps} tok/s vs baseline {reference['tokens_per_sec']}")
+        if canary["ttft_ms"] > max(TTFT_FLOOR_MS, reference["ttft_ms"] * TTFT_RATIO):
+            reasons.append(f"first token {canary['ttft_ms']}ms vs baseline {reference['ttft_ms']}ms")
+        return reasons
+
+    def add(self, canary: dict):
+        if canary["tokens_per_sec"] is not None:
+            self.samples.append([canary["tokens_per_sec"], canary["ttft_ms"]])
+
+
+class HostState:
+    def __init__(self, url: str, saved: dict = None):
+        saved = saved or {}
+        self.url = url
+        self.baseline = Baseline(saved.get("baseline_samples"))
+        self.status = "warming"
+        self.message = ""
+        self.canary = None
+        self.slow_streak = 0
+        self.failure_count = 0
+        self.reloaded = False
+        self.restart_count = saved.get("restart_count", 0)
+        self.reload_count = saved.get("reload_count", 0)
+        self.last_restart = saved.get("last_restart", 0.0)
+
+    def to_dict(self) -> dict:
+        return {
+            "status": self.status,
+            "message": self.message,
+            "canary": self.canary,
+            "baseline": self.baseline.medians(),
+            "baseline_samples": list(self.baseline.samples),
+            "slow_streak": self.slow_streak,
+            "failure_count": self.failure_count,
+            "restart_count": self.restart_count,
+            "reload_count": self.reload_count,
+            "last_restart": self.last_restart,
+        }
+
+
+# =============================================================================
+# Watchdog
+# =============================================================================
+
+class Watchdog:
+    def __init__(self, urls: list, model: str = MODEL_TO_LOAD, status_file: Path = STATUS_FILE,
+                 canary=run_canary, reload=reload_model, restart=restart_ollama, clock=time.time,
+                 outstanding=outstanding_calls):
+        self.model = model
+        self.status_file = Path(status_file)
+        self._canary, self._reload, self._restart, self._clock = canary, reload, restart, clock
+        self._outstanding = outstanding
+        self.started = clock()
+        self._last_memory_alert = float("-inf")
+        saved = self._load_status().get("hosts", {})
+        self.hosts = [HostState(u.rstrip("/"), saved.get(u.rstrip("/"))) for u in urls]
+
+    def _load_status(self) -> dict:
+        try:
+            return json.loads(self.status_file.read_text())
+        except (OSError, ValueError):
+            return {}
+
+    def busy(self, host: HostState) -> int:
+        """Worker calls in flight on the host."""
+        return self._outstanding().get(host.url, 0)
+
+    def check(self, host: HostState):
+        """Run one canary on a host and act on the result."""
+        calls = self.busy(host)
+        if calls:
+            log("INFO", f"{host.url}: {calls} worker call(s) in flight, skipping canary")
+            return
+        try:
+            canary = self._canary(host.url, self.model)
+        except Exception as e:
+            if self.busy(host):
+                log("INFO", f"{host.url}: canary failed while a worker call started ({e}); not counted")
+                return
+            host.canary = {"error": str(e)}
+            host.failure_count += 1
+            host.status = "down" if host.failure_count >= MAX_FAILURES else "failing"
+            host.message = f"Canary failed ({host.failure_count}/{MAX_FAILURES}): {e}"
+            log("WARN", f"{host.url}: {host.message}")
+            if host.failure_count % MAX_FAILURES == 0:
+                self.restart(host, f"{MAX_FAILURES} failed canaries in a row")
+            return
+
+        if host.failure_count:
+            log("INFO", f"{host.url}: recovered after {host.failure_count} failed canaries")
+        host.failure_count = 0
+        host.canary = canary
+        reasons = host.baseline.judge(canary)
+        if not reasons:
+            host.slow_streak = 0
+            host.reloaded = False
+            host.baseline.add(canary)
+            host.status = "healthy" if host.baseline.ready() else "warming"
+            host.message = f"{canary['tokens_per_sec']} tok/s, first token {canary['ttft_ms']}ms"
+            return
+
+        if self.busy(host):
+            log("INFO", f"{host.url}: slow canary shared the host with a worker call; not counted")
+            return
+        host.slow_streak += 1
+        host.message = "; ".join(reasons)
+        host.status = "degraded" if host.slow_streak >= DEGRADED_CHECKS else "slow"
+        log("WARN", f"{host.url}: slow canary {host.slow_streak}/{DEGRADED_CHECKS}: {host.message}")
+        if host.slow_streak < DEGRADED_CHECKS:
+            return
+
+        # Sustained degradation: reload the model first, restart if that did not help
+        if self.busy(host):
+            log("WARN", f"{host.url}: degraded, but a worker call is in flight; deferring remediation")
+            return
+        host.slow_streak = 0
+        if not host.reloaded:
+            log("WARN", f"{host.url}: sustained degradation, reloading {self.model}")
+            host.reloaded = True
+            host.reload_count += 1
+            try:
+                self._reload(host.url, self.model)
+            except Exception as e:
+                log("ERROR", f"{host.url}: model reload failed: {e}")
+        else:
+            self.restart(host, f"still degraded after reloading {self.model}: {host.message}")
+
+    def restart(self, host: HostState, reason: str):
+        if self.busy(host):
+            log("WARN", f"{host.url}: {reason}, but a worker call is in flight; not restarting")
+            return
+        now = self._clock()
+        if not (is_local(host.url) or OLLAMA_RESTART_COMMAND):
+            create_alert("Ollama Host Unhealthy", "HIGH", f"{host.url}: {reason}. Remote host; not restarting.",
+                         host.url)
+            return
+        if now - host.last_restart < RESTART_COOLDOWN:
+            log("ERROR", f"{host.url}: {reason}, but restarted {int(now - host.last_restart)}s ago; not restarting again")
+            return
+        create_alert("Ollama Degraded", "HIGH", f"{host.url}: {reason}. Attempting automatic restart.", host.url)
+        host.last_restart = now
+        host.restart_count += 1
+        host.reloaded = False
+        host.failure_count = 0
+        if self._restart(host.url):
+            host.status = "recovering"
+            host.message = f"Restarted: {reason}"
+            log("INFO", f"{host.url}: Ollama restarted")
+        else:
+            create_alert("Ollama Restart Failed", "CRITICAL", f"Failed to restart Ollama at {host.url}. "
+                         "Manual intervention required.", host.url)
+            host.status = "down"
+
+    def status(self) -> dict:
+        hosts = {h.url: h.to_dict() for h in self.hosts}
+        worst = max((h.status for h in self.hosts), key=lambda s: STATUSES.index(s) if s in STATUSES else 0)
+        now = self._clock()
+        return {
+            "status": worst,
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "updated_at": now,
+            "uptime_seconds": int(now - self.started),
+            "model": self.model,
+            "failure_count": sum(h.failure_count for h in self.hosts),
+            "restart_count": sum(h.restart_count for h in self.hosts),
+            "memory_percent": memory_percent(),
+            "message": "; ".join(f"{h.url}: {h.message}" for h in self.hosts if h.status != "healthy"),
+            "hosts": hosts,
+        }
+
+    def write_status(self) -> dict:
+        status = self.status()
+        self.status_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.status_file.with_suffix(".tmp")
+        tmp.write_text(json.dumps(status, indent=2))
+        os.replace(tmp, self.status_file)
+        return status
+
+    def run_once(self) -> dict:
+        for host in self.hosts:
+            self.check(host)
+        status = self.write_status()
+        now = self._clock()
+        if (status["memory_percent"] or 0) > MEMORY_ALERT_PERCENT and now - self._last_memory_alert > MEMORY_ALERT_INTERVAL:
+            self._last_memory_alert = now
+            create_alert("Critical Memory Pressure", "HIGH",
+                         f"System memory at {status['memory_percent']}%. Ollama may become unstable.")
+        return status
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--once", action="store_true", help="Run one round and print the status")
+    parser.add_argument("--interval", type=int, default=CHECK_INTERVAL)
+    args = parser.parse_args()
+
+    watchdog = Watchdog(pool_urls_from_env())
+    if args.once:
+        print(json.dumps(watchdog.run_once(), indent=2))
+        return
+
+    log("INFO", f"Ollama watchdog watching {', '.join(h.url for h in watchdog.hosts)} "
+                f"with {watchdog.model} every {args.interval}s")
+    try:
+        while True:
+            watchdog.run_once()
+            time.sleep(args.interval)
+    except KeyboardInterrupt:
+        log("INFO", "Watchdog shutting down")
+
+
+if __name__ == "__main__":
+    main()
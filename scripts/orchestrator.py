@@ -6,35 +6,88 @@ Usage:
     python scripts/orchestrator.py [task_file]
     python scripts/orchestrator.py memory/smoke-test-task.md
     python scripts/orchestrator.py --resume  # Resume from latest checkpoint
+    python scripts/orchestrator.py --list    # List checkpoints available to resume
+
+Exits 0 only when the task completes; halted, escalated, max_turns and
+failed-to-start runs exit 1.
 
 Environment:
     ANTHROPIC_API_KEY - Required for Director
+    ANTHROPIC_API_URL - Messages endpoint (default: Anthropic API; benchmarks point it at a fake)
     OLLAMA_URL - Worker endpoint (default: http://localhost:11434)
+    OLLAMA_URLS - Comma-separated pool of worker endpoints (overrides OLLAMA_URL)
+    CLAWD_MODEL - Worker model, used for host affinity (default: qwen-coder-16k)
     CLAWD_HOME - Clawd directory (default: ~/clawd)
+    DIRECTOR_RPM / DIRECTOR_ITPM / DIRECTOR_OTPM - Director API per-minute
+        request, input-token and output-token limits (default: 50/30000/8000)
+    DIRECTOR_MAX_RETRIES - Attempts on 429/529/5xx (default: 5)
+    DIRECTOR_LOCAL_MODEL - Ollama model for routine turns and API outages
+        (default: none, which disables the local tier)
+    DIRECTOR_LOCAL_ROUTINE - Send routine turns to the local tier (default: true)
+    DIRECTOR_SLOW_SECONDS - Remote Director wait before falling back locally, when
+        the local tier is enabled (default: 45)
+    CLAWD_HEDGE_AGENTS - Read-only workers to hedge past their p95 latency,
+        e.g. scout,inspector,scribe (default: none)
+    CLAWD_HEDGE_MODEL - Model for hedge calls (default: CLAWD_MODEL on another host)
+    CLAWD_HEDGE_BUDGET - Largest share of eligible calls that may be hedged (default: 0.05)
 """
 
-# Initialize Sentry before other imports
-from sentry_config import init_sentry
-init_sentry()
-
 import json
 import subprocess
 import os
 import sys
 import re
+import signal
 import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
 from datetime import datetime
 from pathlib import Path
 from typing import Optional
-import urllib.request
-import urllib.error
+
+# Commands that never load .env or Sentry
+LIGHTWEIGHT_COMMANDS = {"--help", "-h", "--list"}
+
+def init_integrations():
+    """Load .env and start Sentry (sentry_sdk and dotenv are imported here)"""
+    from sentry_config import init_sentry
+    init_sentry()
+
+# Task runs read settings from .env, so load it before the sibling modules
+# below, which read their settings at import time. Lightweight commands and
+# importers skip it.
+if __name__ == "__main__" and len(sys.argv) > 1 and sys.argv[1] not in LIGHTWEIGHT_COMMANDS:
+    init_integrations()
+
+from rate_limiter import (
+    DIRECTOR_MAX_RETRIES,
+    RETRYABLE_STATUS,
+    backoff_delay,
+    estimate_tokens,
+    get_director_limiter,
+    parse_retry_after,
+)
+from ollama_pool import LATENCY_WINDOW, get_ollama_pool, percentile
+from context_sizing import choose_num_ctx
+from blob_store import BlobStore, load_result, spill_result
+from checkpoint_retention import (
+    apply_retention,
+    list_checkpoints,
+    parse_checkpoint_name,
+    read_checkpoint,
+    sweep_blobs,
+)
+import repo_index
+from memory_search import MemoryIndex, format_lessons
 
 # =============================================================================
 # Configuration
 # =============================================================================
 
 ANTHROPIC_API_KEY = os.environ.get("ANTHROPIC_API_KEY")
+ANTHROPIC_API_URL = os.environ.get("ANTHROPIC_API_URL", "https://api.anthropic.com/v1/messages")
 OLLAMA_URL = os.environ.get("OLLAMA_URL", "http://localhost:11434")
+WORKER_MODEL = os.environ.get("CLAWD_MODEL", "qwen-coder-16k")
 CLAWD_HOME = Path(os.environ.get("CLAWD_HOME", Path.home() / "clawd"))
 
 # Orchestration limits
@@ -42,6 +95,9 @@ MAX_TURNS = 50
 MAX_CONSECUTIVE_FAILURES = 3
 WORKER_TIMEOUT = 600  # 10 minutes
 DIRECTOR_TIMEOUT = 120  # 2 minutes
+MAX_PLAN_STEPS = 6  # Longest plan the Director may hand over at once
+PLAN_CARRY_CHARS = 3000  # Previous step output passed to the next step
+WORKER_AGENTS = {"architect", "scout", "builder", "refactorer", "inspector", "scribe"}
 
 # Paths
 AGENTS_DIR = CLAWD_HOME / "agents"
@@ -49,7 +105,38 @@ MEMORY_DIR = CLAWD_HOME / "memory"
 CHECKPOINT_DIR = MEMORY_DIR / "checkpoints"
 ALERTS_DIR = MEMORY_DIR / "alerts"
 LOGS_DIR = MEMORY_DIR / "logs"
+BLOBS_DIR = MEMORY_DIR / "blobs"
 SCRIPTS_DIR = CLAWD_HOME / "scripts"
+CONFIG_FILE = CLAWD_HOME / "config" / "repositories.json"
+
+# Token budget for lessons from memory/ and docs/ in Director context
+MEMORY_CONTEXT_TOKENS = int(os.environ.get("MEMORY_CONTEXT_TOKENS", 800))
+
+# Tiered Director (opt-in): a local Ollama model takes routine turns and
+# stands in while the Claude API is down or slow, using the same prompt and schema
+_local_model = os.environ.get("DIRECTOR_LOCAL_MODEL", "")
+DIRECTOR_LOCAL_MODEL = "" if _local_model.lower() in ("", "none") else _local_model
+DIRECTOR_LOCAL_ROUTINE = os.environ.get("DIRECTOR_LOCAL_ROUTINE", "true").lower() == "true"
+DIRECTOR_SLOW_SECONDS = int(os.environ.get("DIRECTOR_SLOW_SECONDS", 45))
+DIRECTOR_REMOTE_COOLDOWN = 120  # Seconds the local tier leads after a remote failure
+# Ending a task and multi-step plans stay with the remote Director
+LOCAL_DIRECTOR_ACTIONS = {"spawn_agent"}
+ROUTINE_AFTER = {"builder", "refactorer"}  # A success here is routinely followed by verification
+
+# Workers whose prompts get pre-seeded with source for mentioned symbols
+SNIPPET_AGENTS = {"scout", "builder", "refactorer", "inspector"}
+
+# Hedged calls: a slow read-only worker gets a duplicate on another host or
+# model and the first success wins. Never hedge agents that write files.
+READ_ONLY_AGENTS = {"scout", "inspector", "scribe"}
+# On routine turns the local Director may only send work to these
+LOCAL_ROUTINE_AGENTS = READ_ONLY_AGENTS
+HEDGE_AGENTS = {a.strip() for a in os.environ.get("CLAWD_HEDGE_AGENTS", "").split(",")} & READ_ONLY_AGENTS
+HEDGE_MODEL = os.environ.get("CLAWD_HEDGE_MODEL", "")
+HEDGE_MIN_SAMPLES = 20  # Successful calls seen before an agent's p95 is trusted
+HEDGE_MIN_DELAY = 10  # Seconds; short calls are never worth duplicating
+HEDGE_SEED_BYTES = 256 * 1024  # Tail of recent event logs read for past latencies
+HEDGE_BUDGET = float(os.environ.get("CLAWD_HEDGE_BUDGET", 0.05))
 
 # =============================================================================
 # Logging
@@ -75,16 +162,67 @@ def log_json(event: dict):
     with open(jsonl_file, "a") as f:
         f.write(json.dumps(event) + "\n")
 
+# =============================================================================
+# Background I/O
+# =============================================================================
+
+class IOLane:
+    """One background thread running writes in submission order"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._executor = None
+        self._pending = deque()
+
+    def submit(self, fn, *args) -> Future:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"clawd-{self.name}")
+        future = self._executor.submit(fn, *args)
+        self._pending.append(future)
+        return future
+
+    def drain(self) -> int:
+        """Wait for everything submitted so far and return the ms waited; re-raises a failed write"""
+        start = time.time()
+        while self._pending:
+            self._pending.popleft().result()
+        return int((time.time() - start) * 1000)
+
+# Checkpoints are written on the state lane while the next Director call is
+# in flight. Notifications and alerts wait on the notify lane until the
+# checkpoint of the turn that raised them is on disk, so nothing is announced
+# that a crash could take back.
+STATE_IO = IOLane("state")
+NOTIFY_IO = IOLane("notify")
+_unacknowledged: list = []
+
+def after_checkpoint(fn, *args):
+    """Hold a notification or alert until the next checkpoint is durable"""
+    _unacknowledged.append((fn, args))
+
+def acknowledge(checkpoint: Future, effects: list):
+    """Run held notifications and alerts once their checkpoint write has finished"""
+    wait([checkpoint])  # A failed write surfaces in the main loop; still deliver alerts
+    for fn, args in effects:
+        try:
+            fn(*args)
+        except Exception as e:
+            log("WARN", f"{fn.__name__} failed: {e}")
+
 # =============================================================================
 # Claude API (Director)
 # =============================================================================
 
-def call_claude_api(system_prompt: str, user_message: str) -> str:
+def call_claude_api(system_prompt: str, user_message: str, timeout: float = DIRECTOR_TIMEOUT) -> str:
     """Call Claude API directly (no SDK dependency)"""
+    # Imported on first use: urllib.request is the costliest stdlib import at startup
+    import urllib.request
+    import urllib.error
+
     if not ANTHROPIC_API_KEY:
         raise ValueError("ANTHROPIC_API_KEY not set")
     
-    url = "https://api.anthropic.com/v1/messages"
+    url = ANTHROPIC_API_URL
     headers = {
         "x-api-key": ANTHROPIC_API_KEY,
         "anthropic-version": "2023-06-01",
@@ -101,23 +239,49 @@ def call_claude_api(system_prompt: str, user_message: str) -> str:
     }
     
     data = json.dumps(payload).encode("utf-8")
-    req = urllib.request.Request(url, data=data, headers=headers, method="POST")
+    limiter = get_director_limiter()
+    estimated_input = estimate_tokens(system_prompt) + estimate_tokens(user_message)
     
-    try:
-        with urllib.request.urlopen(req, timeout=DIRECTOR_TIMEOUT) as response:
-            result = json.loads(response.read().decode("utf-8"))
+    attempt = 1
+    while True:
+        waited = limiter.acquire(estimated_input)
+        if waited > 0:
+            log("INFO", f"Rate limiter delayed Director call by {waited:.1f}s")
+            log_json({"event": "director_throttle", "waited_ms": int(waited * 1000)})
+        
+        req = urllib.request.Request(url, data=data, headers=headers, method="POST")
+        try:
+            with urllib.request.urlopen(req, timeout=timeout) as response:
+                result = json.loads(response.read().decode("utf-8"))
+            limiter.record_usage(result.get("usage", {}), estimated_input)
             # Extract text from response
             for block in result.get("content", []):
                 if block.get("type") == "text":
                     return block.get("text", "")
             return ""
-    except urllib.error.HTTPError as e:
-        error_body = e.read().decode("utf-8") if e.fp else str(e)
-        log("ERROR", f"Claude API error: {e.code} - {error_body}")
-        raise
-    except urllib.error.URLError as e:
-        log("ERROR", f"Claude API connection error: {e.reason}")
-        raise
+        except urllib.error.HTTPError as e:
+            error_body = e.read().decode("utf-8") if e.fp else str(e)
+            # Nothing was generated, so return the reserved input tokens
+            limiter.record_usage({"input_tokens": 0}, estimated_input)
+            if e.code not in RETRYABLE_STATUS or attempt >= DIRECTOR_MAX_RETRIES:
+                log("ERROR", f"Claude API error: {e.code} - {error_body}")
+                raise
+            retry_after = parse_retry_after(e.headers.get("retry-after") if e.headers else None)
+            delay = backoff_delay(attempt, retry_after)
+            # Pause the shared limiter so concurrent tasks back off too
+            limiter.pause(delay)
+            log("WARN", f"Claude API {e.code}, retry {attempt}/{DIRECTOR_MAX_RETRIES - 1} in {delay:.1f}s")
+            log_json({
+                "event": "director_retry",
+                "status": e.code,
+                "attempt": attempt,
+                "retry_after": retry_after,
+                "delay_ms": int(delay * 1000)
+            })
+            attempt += 1
+        except urllib.error.URLError as e:
+            log("ERROR", f"Claude API connection error: {e.reason}")
+            raise
 
 def load_director_prompt() -> str:
     """Load Director system prompt from file"""
@@ -128,8 +292,82 @@ def load_director_prompt() -> str:
         log("WARN", f"Director prompt not found at {director_file}, using default")
         return "You are the Director agent coordinating a multi-agent coding system."
 
+def call_local_director(system_prompt: str, user_message: str) -> str:
+    """Ask the local Ollama Director model for a decision"""
+    import urllib.request
+
+    pool = get_ollama_pool()
+    host = pool.acquire(DIRECTOR_LOCAL_MODEL)
+    payload = {
+        "model": DIRECTOR_LOCAL_MODEL,
+        "system": system_prompt,
+        "prompt": user_message,
+        "stream": False,
+        "format": "json",
+        "options": {"num_ctx": choose_num_ctx("director", system_prompt, user_message)["num_ctx"]}
+    }
+    req = urllib.request.Request(f"{host.url}/api/generate", data=json.dumps(payload).encode("utf-8"),
+                                 headers={"Content-Type": "application/json"}, method="POST")
+    success = False
+    start_time = time.time()
+    try:
+        with urllib.request.urlopen(req, timeout=DIRECTOR_TIMEOUT) as response:
+            text = json.loads(response.read().decode("utf-8")).get("response", "")
+        success = bool(text)
+        return text
+    finally:
+        pool.release(host, success, int((time.time() - start_time) * 1000), DIRECTOR_LOCAL_MODEL)
+
+def is_routine_turn(state: dict) -> bool:
+    """Low-stakes turn: a builder or refactorer just succeeded and nothing is wrong"""
+    history = state.get("history", [])
+    if not DIRECTOR_LOCAL_ROUTINE or not history or state.get("blockers") or state.get("consecutive_failures"):
+        return False
+    last = history[-1]
+    return bool(last.get("success")) and last.get("agent") in ROUTINE_AFTER and last.get("turn") == state["turn"] - 1
+
+_remote_down_until = 0.0
+
+def ask_director_tier(state: dict, tier: str, system_prompt: str, user_message: str, reason: str) -> Optional[dict]:
+    """One Director tier's decision, or None if it failed or deferred to another tier"""
+    global _remote_down_until
+    start_time = time.time()
+    try:
+        if tier == "remote":
+            # With a local tier to fall back on, a latency spike is not worth waiting out
+            timeout = DIRECTOR_SLOW_SECONDS if DIRECTOR_LOCAL_MODEL else DIRECTOR_TIMEOUT
+            response = call_claude_api(system_prompt, user_message, timeout=timeout)
+        else:
+            response = call_local_director(system_prompt, user_message)
+    except Exception as e:
+        latency_ms = int((time.time() - start_time) * 1000)
+        if tier == "remote":
+            _remote_down_until = time.time() + DIRECTOR_REMOTE_COOLDOWN
+        log("ERROR", f"Director call failed ({tier}): {e}")
+        log_json({"event": "director_error", "tier": tier, "error": str(e), "latency_ms": latency_ms})
+        return None
+
+    latency_ms = int((time.time() - start_time) * 1000)
+    decision = parse_director_decision(response)
+    if tier == "local" and (decision.get("action") not in LOCAL_DIRECTOR_ACTIONS or
+                            (reason == "routine" and decision.get("agent") not in LOCAL_ROUTINE_AGENTS)):
+        log("INFO", f"Local Director chose {decision.get('action')} {decision.get('agent') or ''}, "
+                    "deferring to the remote Director")
+        log_json({"event": "director_deferred", "tier": tier, "action": decision.get("action"),
+                  "reason": reason, "latency_ms": latency_ms})
+        return None
+    if tier == "remote":
+        _remote_down_until = 0.0
+
+    state["director_ms"] = state.get("director_ms", 0) + latency_ms
+    state.setdefault("director_latency", {}).setdefault(tier, []).append(latency_ms)
+    decision["tier"] = tier
+    log("INFO", f"Director ({tier}, {reason}) responded in {latency_ms / 1000:.1f}s")
+    log_json({"event": "director_response", "tier": tier, "reason": reason, "latency_ms": latency_ms})
+    return decision
+
 def call_director(state: dict) -> dict:
-    """Call Director and get structured decision"""
+    """Get a decision from the cheapest Director tier able to make it"""
     system_prompt = load_director_prompt()
     
     # Build the user message with current state
@@ -137,28 +375,51 @@ def call_director(state: dict) -> dict:
     
     log("INFO", f"Calling Director (turn {state['turn']})")
     log_json({"event": "director_call", "turn": state["turn"]})
-    
-    start_time = time.time()
+    state["director_calls"] = state.get("director_calls", 0) + 1
+
+    # Routine turns, and turns while the remote is failing, try the local model first
+    local_reason = None
+    if DIRECTOR_LOCAL_MODEL and is_routine_turn(state):
+        local_reason = "routine"
+    elif DIRECTOR_LOCAL_MODEL and time.time() < _remote_down_until:
+        local_reason = "remote_down"
+    tiers = [("local", local_reason)] if local_reason else []
+    tiers.append(("remote", "local_deferred" if local_reason else "default"))
+    if DIRECTOR_LOCAL_MODEL and not local_reason:
+        tiers.append(("local", "remote_failed"))
+
+    for tier, reason in tiers:
+        decision = ask_director_tier(state, tier, system_prompt, user_message, reason)
+        if decision:
+            # The last plan's outcome has now been seen; later turns don't repeat it
+            state.pop("last_plan", None)
+            return decision
+
+    # Halt when no tier could decide
+    return {
+        "thought": "Director call failed on every tier",
+        "action": "halt",
+        "reason": "director_error"
+    }
+
+_memory_index = None
+
+def relevant_lessons(state: dict) -> list:
+    """Top memory/ and docs/ chunks for the task, within MEMORY_CONTEXT_TOKENS"""
+    global _memory_index
     try:
-        response = call_claude_api(system_prompt, user_message)
-        latency = time.time() - start_time
-        log("INFO", f"Director responded in {latency:.1f}s")
-        log_json({"event": "director_response", "latency_ms": int(latency * 1000)})
-        
-        # Parse the decision from response
-        decision = parse_director_decision(response)
-        return decision
-        
+        if _memory_index is None:
+            _memory_index = MemoryIndex([MEMORY_DIR, CLAWD_HOME / "docs"],
+                                        MEMORY_DIR / "index" / "memory-search.json", CLAWD_HOME)
+        # Cheap stat check; only files written since last turn are re-chunked
+        if _memory_index.update():
+            _memory_index.save()
+        exclude = {state["task_file"]} if state.get("task_file") else set()
+        results = _memory_index.search(state.get("task", ""), k=5, exclude=exclude)
+        return format_lessons(results, MEMORY_CONTEXT_TOKENS)
     except Exception as e:
-        log("ERROR", f"Director call failed: {e}")
-        log_json({"event": "director_error", "error": str(e)})
-        
-        # Return a halt decision on error
-        return {
-            "thought": f"Director call failed: {e}",
-            "action": "halt",
-            "reason": "director_error"
-        }
+        log("WARN", f"Memory search failed: {e}")
+        return []
 
 def format_state_for_director(state: dict) -> str:
     """Format current state as a message for Director"""
@@ -173,6 +434,12 @@ def format_state_for_director(state: dict) -> str:
         "",
     ]
     
+    # Lessons from memory/ (learnings, decisions, debt) relevant to the task
+    lessons = relevant_lessons(state)
+    if lessons:
+        lines.append("## Relevant Lessons")
+        lines.extend(lessons)
+    
     # Recent history (last 5 agent interactions)
     history = state.get("history", [])
     if history:
@@ -180,12 +447,35 @@ def format_state_for_director(state: dict) -> str:
         for entry in history[-5:]:
             lines.append(f"\n### {entry.get('agent', 'unknown')} (Turn {entry.get('turn', '?')})")
             lines.append(f"**Prompt**: {entry.get('prompt', 'N/A')[:200]}...")
-            result = entry.get("result", "N/A")
-            if len(result) > 500:
-                result = result[:500] + "... [truncated]"
+            if "result_ref" in entry:
+                # Spilled to the blob store; the preview is all we need here
+                result = entry["result_preview"][:500] + "... [truncated]"
+            else:
+                result = entry.get("result", "N/A")
+                if len(result) > 500:
+                    result = result[:500] + "... [truncated]"
             lines.append(f"**Result**: {result}")
         lines.append("")
     
+    # How the last multi-step plan ended (why the Director is being asked)
+    last_plan = state.get("last_plan")
+    if last_plan:
+        lines.append("## Last Plan")
+        if last_plan["outcome"] == "completed":
+            lines.append(f"All {last_plan['steps']} steps ran; results are in the interactions above.")
+        elif last_plan["outcome"] == "stopped":
+            lines.append(f"Stopped at step {last_plan['step']} of {last_plan['steps']}: {last_plan['reason']}")
+        else:
+            lines.append(f"Plan rejected: {last_plan['reason']}")
+        lines.append("")
+
+    # Where task-mentioned symbols live (from the repo index)
+    repo_context = state.get("repo_context", [])
+    if repo_context:
+        lines.append(f"## Repository Index ({state.get('project')})")
+        lines.extend(repo_context)
+        lines.append("")
+    
     # Files modified
     files = state.get("files_modified", [])
     if files:
@@ -204,6 +494,7 @@ def format_state_for_director(state: dict) -> str:
     
     lines.append("## Your Decision")
     lines.append("Analyze the current state and provide your next decision as a JSON block.")
+    lines.append(f"For obviously sequential work you may return a plan of up to {MAX_PLAN_STEPS} steps.")
     lines.append("Available agents: architect, scout, builder, refactorer, inspector, scribe")
     
     return "\n".join(lines)
@@ -244,14 +535,168 @@ def parse_director_decision(response: str) -> dict:
         "raw_response": response[:500]
     }
 
+# =============================================================================
+# Director Plans
+# =============================================================================
+
+def start_plan(state: dict, decision: dict) -> dict:
+    """Validate a Director plan, store it in state and return its first step"""
+    steps = decision.get("steps") or []
+    problems = []
+    if not isinstance(steps, list):
+        problems.append(f"steps must be a list, not {type(steps).__name__}")
+        steps = []
+    elif not steps:
+        problems.append("plan has no steps")
+    if len(steps) > MAX_PLAN_STEPS:
+        problems.append(f"plan has {len(steps)} steps (max {MAX_PLAN_STEPS})")
+    for i, step in enumerate(steps, 1):
+        if not isinstance(step, dict):
+            problems.append(f"step {i}: expected an object with agent and prompt, got {step!r}")
+            continue
+        agent = step.get("agent")
+        if not isinstance(agent, str) or agent not in WORKER_AGENTS:
+            problems.append(f"step {i}: unknown agent {agent!r}")
+        if not isinstance(step.get("prompt"), str) or not step["prompt"]:
+            problems.append(f"step {i}: missing prompt")
+    if problems:
+        log("WARN", f"Rejecting Director plan: {'; '.join(problems)}")
+        state["last_plan"] = {"outcome": "rejected", "reason": "; ".join(problems)}
+        return {"thought": decision.get("thought", ""), "action": "invalid_plan"}
+
+    state["plan"] = {"steps": steps, "next": 0, "started_turn": state["turn"]}
+    state["plans_started"] = state.get("plans_started", 0) + 1
+    log("INFO", f"Director plan: {' -> '.join(step['agent'] for step in steps)}")
+    log_json({"event": "plan_start", "steps": [step["agent"] for step in steps], "turn": state["turn"]})
+    return next_plan_step(state)
+
+def next_plan_step(state: dict) -> Optional[dict]:
+    """Next step of the active plan as a spawn_agent decision, or None"""
+    plan = state.get("plan")
+    if not plan or plan["next"] >= len(plan["steps"]):
+        return None
+    step = plan["steps"][plan["next"]]
+    prompt = step["prompt"]
+    if step.get("with_previous_output") and state["history"]:
+        previous = state["history"][-1]
+        output = history_result(previous)
+        if len(output) > PLAN_CARRY_CHARS:
+            output = output[:PLAN_CARRY_CHARS] + "... [truncated]"
+        prompt = f"{prompt}\n\n## Output from previous step ({previous['agent']})\n\n{output}"
+    return {
+        "thought": step.get("thought", f"Plan step {plan['next'] + 1} of {len(plan['steps'])}"),
+        "action": "spawn_agent",
+        "agent": step["agent"],
+        "prompt": prompt,
+        "plan_step": plan["next"] + 1,
+    }
+
+def plan_breach(step: dict, result: dict) -> Optional[str]:
+    """Why a finished step stops the plan, or None to carry on"""
+    if not result.get("success") and step.get("on_failure", "stop") == "stop":
+        return f"{step['agent']} failed: {str(result.get('error'))[:200]}"
+    pattern = step.get("stop_if_output")
+    if pattern:
+        try:
+            if re.search(pattern, result.get("output", ""), re.IGNORECASE):
+                return f"{step['agent']} output matched stop condition /{pattern}/"
+        except re.error:
+            return f"invalid stop_if_output pattern /{pattern}/"
+    return None
+
+def advance_plan(state: dict, result: dict):
+    """Record a finished plan step; end the plan on completion or breach"""
+    plan = state["plan"]
+    step = plan["steps"][plan["next"]]
+    plan["next"] += 1
+    if plan["next"] > 1:
+        # Every step after the first would otherwise have cost a Director call
+        state["director_calls_saved"] = state.get("director_calls_saved", 0) + 1
+
+    breach = plan_breach(step, result)
+    if breach is None and plan["next"] < len(plan["steps"]):
+        return
+
+    total = len(plan["steps"])
+    if breach:
+        outcome = {"outcome": "stopped", "step": plan["next"], "steps": total, "reason": breach}
+        state["plan_breaches"] = state.get("plan_breaches", 0) + 1
+        log("WARN", f"Plan stopped at step {plan['next']}/{total}: {breach}")
+    else:
+        outcome = {"outcome": "completed", "step": total, "steps": total}
+        log("INFO", f"Plan completed ({total} steps)")
+    state["last_plan"] = outcome
+    state["plan"] = None
+    log_json({"event": "plan_end", "turn": state["turn"], **outcome})
+
+# =============================================================================
+# Repository Index
+# =============================================================================
+
+_repo_indexes = {}
+
+def detect_task_project(task: str) -> Optional[str]:
+    """Project from repositories.json that the task text refers to"""
+    try:
+        return repo_index.detect_project(task, repo_index.load_projects(CONFIG_FILE))
+    except Exception as e:
+        log("WARN", f"Could not detect project: {e}")
+        return None
+
+def get_repo_index(project: str):
+    """Incrementally updated symbol index for a project (None if unavailable)"""
+    try:
+        if project not in _repo_indexes:
+            projects = repo_index.load_projects(CONFIG_FILE)
+            _repo_indexes[project] = repo_index.open_index(project, projects)
+        else:
+            index = _repo_indexes[project]
+            if index.update()["updated"]:
+                index.save()
+        return _repo_indexes[project]
+    except Exception as e:
+        log("WARN", f"Repo index unavailable for {project}: {e}")
+        return None
+
+def build_repo_context(project: str, task: str, limit: int = 10) -> list:
+    """Definition locations for symbols the task mentions"""
+    index = get_repo_index(project)
+    if index is None:
+        return []
+    lines = []
+    for name in index.mentioned_symbols(task)[:limit]:
+        for d in index.definitions(name)[:2]:
+            lines.append(f"- `{d['qualname']}` ({d['kind']}) → {d['file']}:{d['line']}")
+    return lines
+
 # =============================================================================
 # Worker Calls (Ollama via call-agent.sh)
 # =============================================================================
 
-def call_worker(agent_name: str, prompt: str) -> dict:
+def load_agent_prompt(agent_name: str) -> str:
+    """Load a worker's system prompt (empty if the agent has no file)"""
+    agent_file = AGENTS_DIR / f"{agent_name}.md"
+    if agent_file.exists():
+        return agent_file.read_text()
+    return ""
+
+def call_worker(agent_name: str, prompt: str, project: str = None) -> dict:
     """Call a worker agent via call-agent.sh"""
-    log("INFO", f"Calling worker: {agent_name}")
-    log_json({"event": "worker_call", "agent": agent_name, "prompt_length": len(prompt)})
+    # Pre-seed with exact source for symbols the prompt mentions
+    if project and agent_name in SNIPPET_AGENTS:
+        index = get_repo_index(project)
+        snippets = repo_index.format_snippets(index, prompt) if index else ""
+        if snippets:
+            prompt = f"{prompt}\n\n## Relevant code (from repo index)\n\n{snippets}"
+    
+    sizing = choose_num_ctx(agent_name, load_agent_prompt(agent_name), prompt)
+    log("INFO", f"Calling worker: {agent_name} (num_ctx {sizing['num_ctx']})")
+    log_json({
+        "event": "worker_call",
+        "agent": agent_name,
+        "prompt_length": len(prompt),
+        **sizing
+    })
     
     script_path = SCRIPTS_DIR / "call-agent.sh"
     if not script_path.exists():
@@ -261,6 +706,13 @@ def call_worker(agent_name: str, prompt: str) -> dict:
             "output": ""
         }
     
+    hedge_after = hedge_delay(agent_name)
+    if hedge_after is not None:
+        return call_worker_hedged(script_path, agent_name, prompt, project, sizing["num_ctx"], hedge_after)
+
+    pool = get_ollama_pool()
+    host = pool.acquire(WORKER_MODEL)
+    success = False
     start_time = time.time()
     try:
         result = subprocess.run(
@@ -268,19 +720,27 @@ def call_worker(agent_name: str, prompt: str) -> dict:
             capture_output=True,
             text=True,
             timeout=WORKER_TIMEOUT,
-            env={**os.environ, "OLLAMA_URL": OLLAMA_URL}
+            env={**os.environ, "OLLAMA_URL": host.url, "NUM_CTX": str(sizing["num_ctx"])}
         )
         
         latency = time.time() - start_time
+        success = result.returncode == 0
+        if success:
+            record_worker_latency(agent_name, int(latency * 1000))
         log("INFO", f"Worker {agent_name} responded in {latency:.1f}s")
         log_json({
             "event": "worker_response",
             "agent": agent_name,
+            "model": WORKER_MODEL,
+            "project": project,
+            "success": success,
+            "host": host.url,
+            "num_ctx": sizing["num_ctx"],
             "latency_ms": int(latency * 1000),
             "exit_code": result.returncode
         })
         
-        if result.returncode == 0:
+        if success:
             return {
                 "success": True,
                 "output": result.stdout,
@@ -307,6 +767,190 @@ def call_worker(agent_name: str, prompt: str) -> dict:
             "error": str(e),
             "output": ""
         }
+    finally:
+        latency_ms = int((time.time() - start_time) * 1000)
+        pool.release(host, success, latency_ms, WORKER_MODEL)
+        log_json({"event": "ollama_host", "success": success, "latency_ms": latency_ms, **host.stats()})
+
+# =============================================================================
+# Hedged Worker Calls
+# =============================================================================
+
+_agent_latencies = None
+HEDGE_STATS = {"eligible": 0, "hedged": 0, "hedge_wins": 0, "saved_ms_est": 0, "duplicate_ms": 0,
+               "over_budget": 0}
+
+def agent_latencies() -> dict:
+    """Recent successful latencies (ms) per hedged agent, seeded from the event logs"""
+    global _agent_latencies
+    if _agent_latencies is None:
+        _agent_latencies = {agent: deque(maxlen=LATENCY_WINDOW) for agent in HEDGE_AGENTS}
+        for path in sorted(LOGS_DIR.glob("events-*.jsonl"))[-2:]:
+            with open(path, "rb") as f:
+                f.seek(max(0, path.stat().st_size - HEDGE_SEED_BYTES))
+                lines = f.read().decode("utf-8", errors="replace").splitlines()
+            for line in lines:
+                try:
+                    event = json.loads(line)
+                except ValueError:
+                    continue  # Includes the partial first line after seeking
+                # A hedged response's latency is cut short by the hedge; not a sample
+                if (event.get("event") == "worker_response" and event.get("success")
+                        and not event.get("hedged") and event.get("agent") in _agent_latencies):
+                    _agent_latencies[event["agent"]].append(event["latency_ms"])
+    return _agent_latencies
+
+def record_worker_latency(agent_name: str, latency_ms: int):
+    """Add a successful call to the agent's latency window (hedged agents only)"""
+    if agent_name in HEDGE_AGENTS:
+        agent_latencies()[agent_name].append(latency_ms)
+
+def hedge_delay(agent_name: str) -> Optional[float]:
+    """Seconds before a call gets a duplicate: the agent's p95, or None if not hedged"""
+    if agent_name not in HEDGE_AGENTS:
+        return None
+    samples = agent_latencies()[agent_name]
+    if len(samples) < HEDGE_MIN_SAMPLES:
+        return None
+    return max(HEDGE_MIN_DELAY, percentile(samples, 95) / 1000)
+
+def within_hedge_budget() -> bool:
+    """Whether one more hedge keeps this process within HEDGE_BUDGET of eligible calls"""
+    # The first hedge is always allowed, so short sessions can hedge at all
+    return HEDGE_STATS["hedged"] <= HEDGE_BUDGET * HEDGE_STATS["eligible"]
+
+def acquire_hedge_host(pool, primary) -> tuple:
+    """Host and model for a duplicate call: another host, else the hedge model anywhere"""
+    model = HEDGE_MODEL or WORKER_MODEL
+    host = pool.acquire(model, exclude=primary)
+    if host is None and HEDGE_MODEL:
+        host = pool.acquire(HEDGE_MODEL)
+    return host, model
+
+def start_worker_process(script_path: Path, agent_name: str, prompt: str, host, num_ctx: int, model: str):
+    """Launch call-agent.sh in its own process group, so cancelling it also stops curl"""
+    return subprocess.Popen(
+        [str(script_path), agent_name, prompt],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True,
+        start_new_session=True,
+        env={**os.environ, "OLLAMA_URL": host.url, "NUM_CTX": str(num_ctx), "CLAWD_MODEL": model}
+    )
+
+def call_worker_hedged(script_path: Path, agent_name: str, prompt: str, project: Optional[str],
+                       num_ctx: int, hedge_after: float) -> dict:
+    """Call a read-only worker, racing a duplicate once it outlasts hedge_after seconds"""
+    pool = get_ollama_pool()
+    attempts = []
+    executor = ThreadPoolExecutor(max_workers=2)
+
+    def launch(role, host, model):
+        process = start_worker_process(script_path, agent_name, prompt, host, num_ctx, model)
+        attempts.append({"role": role, "host": host, "model": model, "process": process,
+                         "start": time.time(), "future": executor.submit(process.communicate)})
+
+    HEDGE_STATS["eligible"] += 1
+    start_time = time.time()
+    launch("primary", pool.acquire(WORKER_MODEL), WORKER_MODEL)
+    hedge_checked = False
+    winner = None
+    while winner is None:
+        elapsed = time.time() - start_time
+        running = [a for a in attempts if "returncode" not in a]
+        if not running or elapsed >= WORKER_TIMEOUT:
+            break
+        timeout = WORKER_TIMEOUT - elapsed if hedge_checked else min(WORKER_TIMEOUT, hedge_after) - elapsed
+        done, _ = wait([a["future"] for a in running], timeout=max(0, timeout), return_when=FIRST_COMPLETED)
+        for attempt in running:
+            if attempt["future"] not in done:
+                continue
+            attempt["stdout"], attempt["stderr"] = attempt["future"].result()
+            attempt["returncode"] = attempt["process"].returncode
+            attempt["latency_ms"] = int((time.time() - attempt["start"]) * 1000)
+            success = attempt["returncode"] == 0
+            pool.release(attempt["host"], success, attempt["latency_ms"], attempt["model"])
+            if success and winner is None:
+                winner = attempt
+        primary = attempts[0]
+        if winner is None and not hedge_checked and time.time() - start_time >= hedge_after:
+            hedge_checked = True
+            if "returncode" not in primary and not within_hedge_budget():
+                HEDGE_STATS["over_budget"] += 1
+                log("INFO", f"Worker {agent_name} past p95 ({hedge_after:.0f}s), but the hedge budget is spent")
+            elif "returncode" not in primary:
+                host, model = acquire_hedge_host(pool, primary["host"])
+                if host is not None:
+                    log("INFO", f"Worker {agent_name} past p95 ({hedge_after:.0f}s), hedging on {host.url} ({model})")
+                    launch("hedge", host, model)
+
+    # Cancel whatever is still running: the hedge loser, or everything on timeout
+    for attempt in attempts:
+        if "returncode" not in attempt:
+            try:
+                os.killpg(attempt["process"].pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+            pool.cancel(attempt["host"])
+            attempt["cancelled_ms"] = int((time.time() - attempt["start"]) * 1000)
+    executor.shutdown(wait=True)
+
+    latency_ms = int((time.time() - start_time) * 1000)
+    answered = winner or next((a for a in reversed(attempts) if "returncode" in a), None)
+
+    if len(attempts) > 1:
+        # The primary's true latency is unknown once cancelled; estimate it from the agent's tail
+        tail = [ms for ms in agent_latencies()[agent_name] if ms >= hedge_after * 1000]
+        saved_ms = max(0, int(sum(tail) / len(tail)) - latency_ms) if tail and winner and winner["role"] == "hedge" else 0
+        duplicate_ms = attempts[1].get("latency_ms", attempts[1].get("cancelled_ms", 0))
+        HEDGE_STATS["hedged"] += 1
+        HEDGE_STATS["hedge_wins"] += 1 if winner and winner["role"] == "hedge" else 0
+        HEDGE_STATS["saved_ms_est"] += saved_ms
+        HEDGE_STATS["duplicate_ms"] += duplicate_ms
+        log_json({
+            "event": "worker_hedge",
+            "agent": agent_name,
+            "hedge_after_ms": int(hedge_after * 1000),
+            "primary_host": attempts[0]["host"].url,
+            "hedge_host": attempts[1]["host"].url,
+            "hedge_model": attempts[1]["model"],
+            "winner": winner["role"] if winner else None,
+            "latency_ms": latency_ms,
+            "latency_saved_ms_est": saved_ms,
+            "duplicate_ms": duplicate_ms,
+            "hedge_rate": round(HEDGE_STATS["hedged"] / HEDGE_STATS["eligible"], 3)
+        })
+
+    # Only the primary's own completion time is a latency sample: a hedge win
+    # cuts the call short and would drag the p95, and the hedge delay, down
+    if attempts[0].get("returncode") == 0:
+        record_worker_latency(agent_name, attempts[0]["latency_ms"])
+    if answered is None:
+        log("ERROR", f"Worker {agent_name} timed out after {WORKER_TIMEOUT}s")
+        return {"success": False, "error": f"Timeout after {WORKER_TIMEOUT}s", "output": ""}
+
+    success = answered["returncode"] == 0
+    log("INFO", f"Worker {agent_name} responded in {latency_ms / 1000:.1f}s ({answered['role']})")
+    log_json({
+        "event": "worker_response",
+        "agent": agent_name,
+        "model": answered["model"],
+        "project": project,
+        "success": success,
+        "host": answered["host"].url,
+        "num_ctx": num_ctx,
+        "latency_ms": latency_ms,
+        "exit_code": answered["returncode"],
+        "hedged": len(attempts) > 1
+    })
+    log_json({"event": "ollama_host", "success": success, "latency_ms": latency_ms, **answered["host"].stats()})
+    if success:
+        return {"success": True, "output": answered["stdout"], "error": None}
+    return {
+        "success": False,
+        "output": answered["stdout"],
+        "error": answered["stderr"] or f"Exit code {answered['returncode']}"
+    }
 
 # =============================================================================
 # State Management
@@ -357,6 +1001,14 @@ def sanitize_task(task_content: str) -> tuple[str, list]:
     # Director should be aware of potential issues
     return task_content, warnings
 
+def get_blob_store() -> BlobStore:
+    """Blob store for large worker outputs referenced from history"""
+    return BlobStore(BLOBS_DIR)
+
+def history_result(entry: dict) -> str:
+    """Full worker output for a history entry (loads spilled blobs lazily)"""
+    return load_result(get_blob_store(), entry)
+
 def init_state(task: str) -> dict:
     """Initialize fresh state for a task"""
     return {
@@ -373,43 +1025,76 @@ def init_state(task: str) -> dict:
         "status": "running"
     }
 
-def save_checkpoint(state: dict):
-    """Save state to checkpoint file"""
-    CHECKPOINT_DIR.mkdir(parents=True, exist_ok=True)
-    
-    timestamp = datetime.now().strftime("%Y%m%d-%H%M%S")
-    checkpoint_file = CHECKPOINT_DIR / f"chk-{state['task_id']}-{timestamp}.json"
-    
-    with open(checkpoint_file, "w") as f:
-        json.dump(state, f, indent=2, default=str)
-    
+def write_durable(path: Path, text: str):
+    """Write via a temp file, fsync and rename, so a crash leaves the old or new file whole"""
+    # Per-process temp name: concurrent runs share current-state.json
+    tmp = path.parent / f".{path.name}.{os.getpid()}.tmp"
+    with open(tmp, "w") as f:
+        f.write(text)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+def write_checkpoint(task_id: str, payload: str, checkpoint_file: Path, current_state_file: Path):
+    """Persist one serialized checkpoint (runs on the state I/O lane)"""
+    start = time.time()
+    checkpoint_file.parent.mkdir(parents=True, exist_ok=True)
+    write_durable(checkpoint_file, payload)
     # Also update current-state.json
-    current_state_file = MEMORY_DIR / "current-state.json"
-    with open(current_state_file, "w") as f:
-        json.dump(state, f, indent=2, default=str)
-    
+    write_durable(current_state_file, payload)
+
     log("INFO", f"Checkpoint saved: {checkpoint_file.name}")
-    log_json({"event": "checkpoint", "file": str(checkpoint_file)})
+    log_json({"event": "checkpoint", "file": str(checkpoint_file), "write_ms": int((time.time() - start) * 1000)})
+
+    # Thin and compress this task's older checkpoints
+    try:
+        retention = apply_retention(checkpoint_file.parent, task_id=task_id)
+        if retention["deleted"]:
+            # Outputs only the deleted checkpoints referred to go with them
+            retention.update(sweep_blobs(checkpoint_file.parent, BLOBS_DIR, [current_state_file]))
+        if retention["deleted"] or retention["compressed"]:
+            log_json({"event": "checkpoint_retention", **retention})
+    except Exception as e:
+        log("WARN", f"Checkpoint retention failed: {e}")
+
+def save_checkpoint(state: dict) -> Future:
+    """Queue a checkpoint of state as it is now; held notifications follow it"""
+    # Serialize here: the loop keeps changing state while the write is queued
+    payload = json.dumps(state, indent=2, default=str)
+    timestamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+    checkpoint_file = CHECKPOINT_DIR / f"chk-{state['task_id']}-{timestamp}.json"
+    future = STATE_IO.submit(write_checkpoint, state["task_id"], payload, checkpoint_file,
+                             MEMORY_DIR / "current-state.json")
+    if _unacknowledged:
+        NOTIFY_IO.submit(acknowledge, future, list(_unacknowledged))
+        _unacknowledged.clear()
+    return future
+
+def wait_durable(state: dict):
+    """Block until every queued checkpoint is on disk, counting the wait against the turn"""
+    state["io_wait_ms"] = state.get("io_wait_ms", 0) + STATE_IO.drain()
 
 def load_latest_checkpoint() -> Optional[dict]:
     """Load most recent checkpoint"""
     if not CHECKPOINT_DIR.exists():
         return None
 
-    checkpoints = sorted(CHECKPOINT_DIR.glob("chk-*.json"))
+    checkpoints = list_checkpoints(CHECKPOINT_DIR)
     if not checkpoints:
         return None
 
     latest = checkpoints[-1]
     log("INFO", f"Loading checkpoint: {latest.name}")
 
-    with open(latest) as f:
-        return json.load(f)
+    return read_checkpoint(latest)
 
 def save_session_summary(state: dict):
     """Save structured session summary for analysis"""
     LOGS_DIR.mkdir(parents=True, exist_ok=True)
 
+    director_calls = state.get("director_calls", 0)
+    saved = state.get("director_calls_saved", 0)
+
     # Build session summary
     session = {
         "session_id": state.get("task_id"),
@@ -417,13 +1102,31 @@ def save_session_summary(state: dict):
         "start_time": state.get("started_at"),
         "end_time": datetime.now().isoformat(),
         "status": state.get("status"),
+        "project": state.get("project"),
+        "model": WORKER_MODEL,
         "turns": [],
         "metrics": {
             "total_turns": state.get("turn", 0),
             "workers_used": list(set(h.get("agent") for h in state.get("history", []))),
             "escalations": 1 if state.get("status") == "escalated" else 0,
             "errors": sum(1 for h in state.get("history", []) if not h.get("success", True)),
-            "consecutive_failures": state.get("consecutive_failures", 0)
+            "consecutive_failures": state.get("consecutive_failures", 0),
+            "director_calls": director_calls,
+            "plans": state.get("plans_started", 0),
+            "plan_breaches": state.get("plan_breaches", 0),
+            "director_calls_saved": saved,
+            # Saved calls at this session's mean Director latency
+            "director_ms_saved_est": int(saved * state.get("director_ms", 0) / director_calls) if director_calls else 0,
+            # Which Director tier decided, and how fast
+            "director_tiers": {
+                tier: {"calls": len(latencies), "p50_ms": percentile(latencies, 50)}
+                for tier, latencies in state.get("director_latency", {}).items()
+            },
+            # Extra worker load from hedging, and what it bought
+            "hedge_rate": round(HEDGE_STATS["hedged"] / HEDGE_STATS["eligible"], 3) if HEDGE_STATS["eligible"] else 0,
+            "hedge": dict(HEDGE_STATS),
+            # Time the loop spent blocked on checkpoint writes
+            "io_wait_ms": state.get("io_wait_ms", 0)
         }
     }
 
@@ -466,6 +1169,10 @@ def notify(message: str, severity: str = "info"):
 # Alerts & Escalation
 # =============================================================================
 
+def alert_context(state: dict) -> dict:
+    """The parts of state an alert shows, copied so a held alert is not affected by later turns"""
+    return {"task_id": state.get("task_id"), "turn": state.get("turn"), "history": state.get("history", [])[-3:]}
+
 def create_alert(title: str, severity: str, description: str, state: dict):
     """Create an escalation alert"""
     ALERTS_DIR.mkdir(parents=True, exist_ok=True)
@@ -539,30 +1246,43 @@ def run_orchestrator(task_file: str = None, resume: bool = False):
         task, security_warnings = sanitize_task(task_raw)
         state = init_state(task)
         state["security_warnings"] = security_warnings
+        try:
+            state["task_file"] = str(task_path.resolve().relative_to(CLAWD_HOME.resolve()))
+        except ValueError:
+            state["task_file"] = str(task_path)
+        state["project"] = detect_task_project(task)
+        if state["project"]:
+            state["repo_context"] = build_repo_context(state["project"], task)
         log("INFO", f"Starting new task: {state['task_id']}")
-        notify(f"Task started: {state['task_id']}", "info")
+        after_checkpoint(notify, f"Task started: {state['task_id']}", "info")
     
     # Save initial checkpoint
     save_checkpoint(state)
     
-    # Main loop
+    # Main loop. Each turn's checkpoint is written in the background while
+    # the next Director call runs; a worker only starts once it is on disk.
     while state["turn"] < MAX_TURNS and state["status"] == "running":
         state["turn"] += 1
         
         # Check for too many consecutive failures
         if state["consecutive_failures"] >= MAX_CONSECUTIVE_FAILURES:
             log("ERROR", f"Too many consecutive failures ({MAX_CONSECUTIVE_FAILURES})")
-            create_alert(
+            after_checkpoint(
+                create_alert,
                 "Consecutive Failures",
                 "HIGH",
                 f"Agent failed {MAX_CONSECUTIVE_FAILURES} times in a row",
-                state
+                alert_context(state)
             )
             state["status"] = "halted"
             break
         
-        # Get Director decision
-        decision = call_director(state)
+        # An active plan runs its next step without asking the Director
+        decision = next_plan_step(state)
+        if decision is None:
+            decision = call_director(state)
+            if decision.get("action") == "plan":
+                decision = start_plan(state, decision)
         state["decisions"].append({
             "turn": state["turn"],
             "decision": decision,
@@ -583,14 +1303,16 @@ def run_orchestrator(task_file: str = None, resume: bool = False):
                 state["consecutive_failures"] += 1
                 continue
             
-            result = call_worker(agent, prompt)
+            # Workers change files; never run one ahead of the state that led to it
+            wait_durable(state)
+            result = call_worker(agent, prompt, state.get("project"))
             
-            # Record in history
+            # Record in history (large outputs go to the blob store)
             state["history"].append({
                 "turn": state["turn"],
                 "agent": agent,
                 "prompt": prompt,
-                "result": result.get("output", ""),
+                **spill_result(get_blob_store(), result.get("output", "")),
                 "success": result.get("success", False),
                 "error": result.get("error"),
                 "timestamp": datetime.now().isoformat()
@@ -601,25 +1323,28 @@ def run_orchestrator(task_file: str = None, resume: bool = False):
             else:
                 state["consecutive_failures"] += 1
                 log("WARN", f"Worker {agent} failed: {result.get('error')}")
+
+            if decision.get("plan_step"):
+                advance_plan(state, result)
         
         elif action == "complete":
             log("INFO", "Task completed successfully!")
             state["status"] = "complete"
             state["completed_at"] = datetime.now().isoformat()
-            notify(f"Task {state['task_id']} completed in {state['turn']} turns", "info")
+            after_checkpoint(notify, f"Task {state['task_id']} completed in {state['turn']} turns", "info")
 
         elif action == "escalate":
             reason = decision.get("thought", decision.get("reason", "Unknown reason"))
             log("WARN", f"Escalating: {reason}")
-            create_alert("Director Escalation", "MEDIUM", reason, state)
+            after_checkpoint(create_alert, "Director Escalation", "MEDIUM", reason, alert_context(state))
             state["status"] = "escalated"
-            notify(f"ESCALATION: {reason[:100]}", "error")
+            after_checkpoint(notify, f"ESCALATION: {reason[:100]}", "error")
 
         elif action == "halt":
             reason = decision.get("thought", decision.get("reason", "Director requested halt"))
             log("INFO", f"Halting: {reason}")
             state["status"] = "halted"
-            notify(f"Task halted: {reason[:100]}", "warn")
+            after_checkpoint(notify, f"Task halted: {reason[:100]}", "warn")
         
         else:
             log("WARN", f"Unknown action: {action}")
@@ -627,17 +1352,18 @@ def run_orchestrator(task_file: str = None, resume: bool = False):
         
         # Checkpoint after each turn
         save_checkpoint(state)
-        
-        # Brief pause to avoid hammering APIs
-        time.sleep(1)
+        # No fixed pause: the Director rate limiter paces API calls
     
     # Final status
     if state["turn"] >= MAX_TURNS and state["status"] == "running":
         log("WARN", f"Max turns ({MAX_TURNS}) reached")
-        create_alert("Max Turns Reached", "MEDIUM", f"Task did not complete in {MAX_TURNS} turns", state)
+        after_checkpoint(create_alert, "Max Turns Reached", "MEDIUM", f"Task did not complete in {MAX_TURNS} turns",
+                         alert_context(state))
         state["status"] = "max_turns"
     
     save_checkpoint(state)
+    wait_durable(state)
+    NOTIFY_IO.drain()
     save_session_summary(state)
     log("INFO", f"Orchestrator finished. Status: {state['status']}")
     log_json({"event": "orchestrator_end", "status": state["status"], "turns": state["turn"]})
@@ -651,18 +1377,34 @@ def run_orchestrator(task_file: str = None, resume: bool = False):
 def print_usage():
     print(__doc__)
 
+def list_resumable():
+    """Print the latest checkpoint per task, newest first"""
+    latest = {}
+    for path in list_checkpoints(CHECKPOINT_DIR):
+        task_id, timestamp = parse_checkpoint_name(path)
+        latest[task_id] = (timestamp, path)
+    if not latest:
+        print("No checkpoints found")
+        return
+    for task_id, (timestamp, path) in sorted(latest.items(), key=lambda item: item[1][0], reverse=True):
+        print(f"{timestamp}  {task_id}  {path.name}")
+
 def main():
     if len(sys.argv) < 2:
         print_usage()
         sys.exit(1)
     
-    if sys.argv[1] == "--resume":
-        run_orchestrator(resume=True)
+    if sys.argv[1] == "--list":
+        list_resumable()
     elif sys.argv[1] == "--help" or sys.argv[1] == "-h":
         print_usage()
     else:
-        task_file = sys.argv[1]
-        run_orchestrator(task_file=task_file)
+        if sys.argv[1] == "--resume":
+            state = run_orchestrator(resume=True)
+        else:
+            state = run_orchestrator(task_file=sys.argv[1])
+        # The task queue files runs by exit code: only a completed task is done
+        sys.exit(0 if state and state["status"] == "complete" else 1)
 
 if __name__ == "__main__":
     main()
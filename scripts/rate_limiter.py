@@ -0,0 +1,181 @@
+"""Client-side rate limiting for the Director (Claude API).
+
+Token buckets for requests, input tokens and output tokens per minute,
+plus a shared pause window driven by `retry-after` on 429/529 responses.
+One limiter is shared by every task running in the process.
+"""
+
+import os
+import random
+import threading
+import time
+from typing import Optional
+
+# Defaults match the Anthropic tier-1 limits for Sonnet
+DIRECTOR_RPM = int(os.environ.get("DIRECTOR_RPM", 50))
+DIRECTOR_ITPM = int(os.environ.get("DIRECTOR_ITPM", 30000))
+DIRECTOR_OTPM = int(os.environ.get("DIRECTOR_OTPM", 8000))
+
+# Retry configuration
+DIRECTOR_MAX_RETRIES = int(os.environ.get("DIRECTOR_MAX_RETRIES", 5))
+INITIAL_BACKOFF = 2.0
+MAX_BACKOFF = 60.0
+RETRYABLE_STATUS = {429, 500, 502, 503, 529}
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token estimate (~4 characters per token)."""
+    return max(1, len(text) // 4)
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parse a retry-after header value in seconds, or None if absent/invalid."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        return None
+
+
+def backoff_delay(attempt: int, retry_after: Optional[float] = None) -> float:
+    """Jittered exponential backoff, never shorter than retry-after.
+
+    Args:
+        attempt: 1-based retry attempt number.
+        retry_after: Server-provided delay in seconds, if any.
+    """
+    ceiling = min(MAX_BACKOFF, INITIAL_BACKOFF * (2 ** (attempt - 1)))
+    delay = random.uniform(ceiling / 2, ceiling)  # "equal jitter"
+    if retry_after is not None:
+        # Spread retries a little past the server's hint so concurrent
+        # tasks don't all wake up on the same instant
+        delay = retry_after + random.uniform(0, min(retry_after, 1.0) + 0.25)
+    return delay
+
+
+class TokenBucket:
+    """Thread-safe token bucket refilled continuously at `per_minute`.
+
+    The level may go negative when actual usage exceeds what was reserved;
+    later callers then wait until the debt is repaid.
+    """
+
+    def __init__(self, per_minute: float, clock=time.monotonic):
+        self.capacity = float(per_minute)
+        self.rate = float(per_minute) / 60.0
+        self.level = self.capacity
+        self._clock = clock
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = self._clock()
+        self.level = min(self.capacity, self.level + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def try_consume(self, amount: float) -> float:
+        """Consume `amount` if available. Returns 0 on success, else seconds to wait."""
+        with self._lock:
+            self._refill()
+            # Requests larger than the whole bucket only need a full bucket
+            needed = min(amount, self.capacity)
+            if self.level >= needed:
+                self.level -= amount
+                return 0.0
+            return (needed - self.level) / self.rate
+
+    def wait_time(self, amount: float = 0.0) -> float:
+        """Seconds until `amount` could be consumed (0 if available now)."""
+        with self._lock:
+            self._refill()
+            needed = min(amount, self.capacity)
+            if self.level >= needed:
+                return 0.0
+            return (needed - self.level) / self.rate
+
+    def adjust(self, delta: float):
+        """Debit (positive) or credit (negative) tokens after the fact."""
+        with self._lock:
+            self._refill()
+            self.level = min(self.capacity, self.level - delta)
+
+
+class RateLimiter:
+    """Requests/input/output per-minute limiter with a shared retry-after pause."""
+
+    def __init__(
+        self,
+        rpm: int = DIRECTOR_RPM,
+        itpm: int = DIRECTOR_ITPM,
+        otpm: int = DIRECTOR_OTPM,
+        clock=time.monotonic,
+        sleep=time.sleep,
+    ):
+        self.requests = TokenBucket(rpm, clock)
+        self.input_tokens = TokenBucket(itpm, clock)
+        self.output_tokens = TokenBucket(otpm, clock)
+        self._clock = clock
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self._paused_until = 0.0
+        self.stats = {"requests": 0, "waited_s": 0.0, "throttled": 0}
+
+    def pause(self, seconds: float):
+        """Block all callers for `seconds` (e.g. after a 429 with retry-after)."""
+        with self._lock:
+            self._paused_until = max(self._paused_until, self._clock() + seconds)
+            self.stats["throttled"] += 1
+
+    def _pause_remaining(self) -> float:
+        with self._lock:
+            return max(0.0, self._paused_until - self._clock())
+
+    def acquire(self, estimated_input_tokens: int) -> float:
+        """Block until a request with this input size fits the budget.
+
+        Returns:
+            Total seconds spent waiting.
+        """
+        waited = 0.0
+        while True:
+            delay = max(self._pause_remaining(), self.output_tokens.wait_time())
+            if delay <= 0:
+                delay = self.requests.wait_time(1)
+            if delay <= 0:
+                delay = self.input_tokens.try_consume(estimated_input_tokens)
+                if delay <= 0:
+                    delay = self.requests.try_consume(1)
+                    if delay > 0:
+                        # Lost a race for the request slot; give back the tokens
+                        self.input_tokens.adjust(-estimated_input_tokens)
+            if delay <= 0:
+                break
+            self._sleep(delay)
+            waited += delay
+
+        with self._lock:
+            self.stats["requests"] += 1
+            self.stats["waited_s"] += waited
+        return waited
+
+    def record_usage(self, usage: dict, estimated_input_tokens: int):
+        """Reconcile the input estimate and debit output tokens from response `usage`."""
+        if not usage:
+            return
+        actual_input = usage.get("input_tokens", 0) + usage.get("cache_creation_input_tokens", 0)
+        self.input_tokens.adjust(actual_input - estimated_input_tokens)
+        self.output_tokens.adjust(usage.get("output_tokens", 0))
+
+
+_director_limiter: Optional[RateLimiter] = None
+_director_limiter_lock = threading.Lock()
+
+
+def get_director_limiter() -> RateLimiter:
+    """Process-wide limiter shared by all concurrent tasks."""
+    global _director_limiter
+    with _director_limiter_lock:
+        if _director_limiter is None:
+            _director_limiter = RateLimiter()
+        return _director_limiter
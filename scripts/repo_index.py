@@ -0,0 +1,354 @@
+#!/usr/bin/env python3
+"""
+Repo Index - Incremental file and symbol index for project repositories.
+
+Indexes every Python file in a project from config/repositories.json:
+mtime/size, functions and classes (from the AST), imports and call sites.
+Updates are incremental - via `git diff` against the last indexed commit
+plus `git status` when the project is a git repo, otherwise by re-statting
+files - and only changed files are re-parsed. Lookup tables are built in
+memory on load, so "where is X defined / who calls X" answers in
+milliseconds.
+
+Usage:
+    python scripts/repo_index.py <project> update
+    python scripts/repo_index.py <project> def <name>
+    python scripts/repo_index.py <project> callers <name>
+    python scripts/repo_index.py <project> stats
+
+Environment:
+    CLAWD_HOME - Clawd directory (default: ~/clawd)
+"""
+
+import argparse
+import ast
+import json
+import os
+import re
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Optional
+
+CLAWD_HOME = Path(os.environ.get("CLAWD_HOME", Path.home() / "clawd"))
+CONFIG_FILE = CLAWD_HOME / "config" / "repositories.json"
+INDEX_DIR = CLAWD_HOME / "memory" / "index"
+
+INDEX_VERSION = 1
+SKIP_DIRS = {".git", ".venv", "venv", "__pycache__", "node_modules", ".tox", ".nox", "build", "dist"}
+MAX_SNIPPET_LINES = 60
+IDENTIFIER_RE = re.compile(r"\b[A-Za-z_][A-Za-z0-9_]{3,}\b")
+
+
+def load_projects(config_file: Path = CONFIG_FILE) -> dict:
+    with open(config_file) as f:
+        return json.load(f).get("projects", {})
+
+
+PROJECT_LINE_RE = re.compile(r"^[\s*_#>-]*project[*_]*\s*:[*_]*\s*`?([\w.-]+)", re.IGNORECASE | re.MULTILINE)
+
+
+def detect_project(text: str, projects: dict) -> Optional[str]:
+    """Project key the text names explicitly.
+
+    A "Project: <key or sentry slug>" line wins. Otherwise a Sentry slug or
+    the project's full path must appear. Bare keys, names and directory
+    basenames are ordinary words ("budget", "testing") and never match.
+    """
+    declared = {m.lower() for m in PROJECT_LINE_RE.findall(text)}
+    for key, config in projects.items():
+        if declared & {key.lower(), config.get("sentry_project", "").lower()} - {""}:
+            return key
+
+    lowered = text.lower()
+    for key, config in projects.items():
+        slug = config.get("sentry_project", "").lower()
+        if slug and re.search(rf"(?<![\w-]){re.escape(slug)}(?![\w-])", lowered):
+            return key
+        path = config.get("path", "")
+        spellings = {path, str(Path(path).expanduser())} if path else set()
+        if any(re.search(rf"{re.escape(p.lower())}(?![\w-])", lowered) for p in spellings):
+            return key
+    return None
+
+
+# =============================================================================
+# Parsing
+# =============================================================================
+
+class _FileVisitor(ast.NodeVisitor):
+    """Collects definitions, imports and call sites with enclosing scope."""
+
+    def __init__(self):
+        self.symbols = []
+        self.imports = []
+        self.calls = []
+        self._scope = []
+        self._scope_kinds = []
+
+    def _define(self, node, kind):
+        qualname = ".".join(self._scope + [node.name])
+        if kind == "function" and self._scope and self._scope_kinds[-1] == "class":
+            kind = "method"
+        self.symbols.append({
+            "name": node.name,
+            "qualname": qualname,
+            "kind": kind,
+            "line": node.lineno,
+            "end_line": getattr(node, "end_lineno", node.lineno),
+        })
+        self._scope.append(node.name)
+        self._scope_kinds.append("class" if kind == "class" else "function")
+        self.generic_visit(node)
+        self._scope.pop()
+        self._scope_kinds.pop()
+
+    def visit_FunctionDef(self, node):
+        self._define(node, "function")
+
+    visit_AsyncFunctionDef = visit_FunctionDef
+
+    def visit_ClassDef(self, node):
+        self._define(node, "class")
+
+    def visit_Import(self, node):
+        self.imports.extend(alias.name for alias in node.names)
+
+    def visit_ImportFrom(self, node):
+        self.imports.append("." * node.level + (node.module or ""))
+
+    def visit_Call(self, node):
+        func = node.func
+        name = func.id if isinstance(func, ast.Name) else func.attr if isinstance(func, ast.Attribute) else None
+        if name:
+            self.calls.append([name, node.lineno, ".".join(self._scope) or "<module>"])
+        self.generic_visit(node)
+
+
+def parse_file(path: Path) -> dict:
+    """Symbols, imports and calls for one Python file (empty on syntax errors)."""
+    try:
+        tree = ast.parse(path.read_text(encoding="utf-8", errors="replace"))
+    except (SyntaxError, ValueError):
+        return {"symbols": [], "imports": [], "calls": [], "error": "syntax"}
+    visitor = _FileVisitor()
+    visitor.visit(tree)
+    return {"symbols": visitor.symbols, "imports": visitor.imports, "calls": visitor.calls}
+
+
+def iter_python_files(root: Path):
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = [d for d in dirnames if d not in SKIP_DIRS and not d.startswith(".")]
+        for name in filenames:
+            if name.endswith(".py"):
+                yield Path(dirpath) / name
+
+
+def _git(root: Path, *args) -> Optional[list]:
+    try:
+        result = subprocess.run(["git", *args], cwd=root, capture_output=True, text=True, timeout=30)
+    except (OSError, subprocess.TimeoutExpired):
+        return None
+    return result.stdout.splitlines() if result.returncode == 0 else None
+
+
+# =============================================================================
+# Index
+# =============================================================================
+
+class RepoIndex:
+    """Persistent per-project index with in-memory lookup tables."""
+
+    def __init__(self, root: Path, index_file: Path):
+        self.root = Path(root).expanduser()
+        self.index_file = Path(index_file)
+        self.data = {"version": INDEX_VERSION, "root": str(self.root), "git_head": None, "files": {}}
+        self._definitions = None
+        self._callers = None
+        if self.index_file.exists():
+            loaded = json.loads(self.index_file.read_text())
+            if loaded.get("version") == INDEX_VERSION and loaded.get("root") == str(self.root):
+                self.data = loaded
+
+    # -- Updating -----------------------------------------------------------------
+
+    def _candidate_paths(self) -> Optional[set]:
+        """Relative paths that may have changed since the last update, via git.
+
+        Returns None when a full stat walk is needed.
+        """
+        old_head = self.data.get("git_head")
+        head = _git(self.root, "rev-parse", "HEAD")
+        prefix = _git(self.root, "rev-parse", "--show-prefix")
+        # git reports paths from the repo top level; walk if root is a subdirectory
+        if not old_head or not head or prefix not in ([""], []):
+            return None
+        diff = _git(self.root, "diff", "--name-only", old_head, head[0])
+        status = _git(self.root, "status", "--porcelain", "--untracked-files=all")
+        if diff is None or status is None:
+            return None
+        paths = set(diff)
+        for line in status:
+            # "XY path" or "XY old -> new"
+            paths.update(p.strip() for p in line[3:].split(" -> "))
+        # Uncommitted edits stay in `git status` until committed, so files
+        # already indexed at their current mtime are skipped below
+        return {p for p in paths if p.endswith(".py") and not SKIP_DIRS.intersection(Path(p).parts)}
+
+    def _reindex(self, rel: str) -> bool:
+        """Re-parse one file if its mtime/size changed. Returns True if updated."""
+        path = self.root / rel
+        files = self.data["files"]
+        if not path.is_file():
+            return files.pop(rel, None) is not None
+        stat = path.stat()
+        entry = files.get(rel)
+        if entry and entry["mtime"] == stat.st_mtime and entry["size"] == stat.st_size:
+            return False
+        files[rel] = {"mtime": stat.st_mtime, "size": stat.st_size, **parse_file(path)}
+        return True
+
+    def update(self, full: bool = False) -> dict:
+        """Bring the index up to date. Returns counts of scanned and updated files."""
+        start = time.time()
+        candidates = None if full else self._candidate_paths()
+        updated = 0
+        if candidates is None:
+            current = {str(p.relative_to(self.root)) for p in iter_python_files(self.root)}
+            for rel in set(self.data["files"]) - current:
+                del self.data["files"][rel]
+                updated += 1
+            candidates = current
+            mode = "walk"
+        else:
+            mode = "git"
+
+        updated += sum(1 for rel in sorted(candidates) if self._reindex(rel))
+        head = _git(self.root, "rev-parse", "HEAD")
+        self.data["git_head"] = head[0] if head else None
+        if updated or mode == "walk":
+            self._definitions = self._callers = None
+        return {"mode": mode, "scanned": len(candidates), "updated": updated,
+                "files": len(self.data["files"]), "ms": int((time.time() - start) * 1000)}
+
+    def save(self):
+        self.index_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.index_file.with_suffix(".tmp")
+        tmp.write_text(json.dumps(self.data))
+        os.replace(tmp, self.index_file)
+
+    # -- Queries ------------------------------------------------------------------
+
+    def _build_tables(self):
+        definitions, callers = {}, {}
+        for rel, entry in self.data["files"].items():
+            for sym in entry["symbols"]:
+                definitions.setdefault(sym["name"], []).append({**sym, "file": rel})
+            for name, line, scope in entry["calls"]:
+                callers.setdefault(name, []).append({"file": rel, "line": line, "caller": scope})
+        self._definitions, self._callers = definitions, callers
+
+    def definitions(self, name: str) -> list:
+        """Where `name` (function, method or class; or a dotted qualname) is defined."""
+        if self._definitions is None:
+            self._build_tables()
+        short = name.rsplit(".", 1)[-1]
+        found = self._definitions.get(short, [])
+        if "." in name:
+            found = [d for d in found if d["qualname"].endswith(name)]
+        return found
+
+    def callers(self, name: str) -> list:
+        """Call sites of `name` (matched by called function/attribute name)."""
+        if self._callers is None:
+            self._build_tables()
+        return self._callers.get(name.rsplit(".", 1)[-1], [])
+
+    def snippet(self, definition: dict, max_lines: int = MAX_SNIPPET_LINES) -> str:
+        """Source lines of a definition, capped at max_lines."""
+        path = self.root / definition["file"]
+        try:
+            lines = path.read_text(encoding="utf-8", errors="replace").splitlines()
+        except OSError:
+            return ""
+        start = definition["line"] - 1
+        end = min(definition["end_line"], start + max_lines)
+        body = "\n".join(lines[start:end])
+        if definition["end_line"] > end:
+            body += "\n    ..."
+        return body
+
+    def mentioned_symbols(self, text: str) -> list:
+        """Defined symbol names that appear in free text, in order of appearance."""
+        if self._definitions is None:
+            self._build_tables()
+        seen = []
+        for word in IDENTIFIER_RE.findall(text):
+            if word in self._definitions and word not in seen:
+                seen.append(word)
+        return seen
+
+
+def open_index(project: str, projects: dict = None, update: bool = True) -> RepoIndex:
+    """Load a project's index from memory/index/, updating it incrementally."""
+    projects = projects if projects is not None else load_projects()
+    index = RepoIndex(Path(projects[project]["path"]).expanduser(), INDEX_DIR / f"{project}.json")
+    if update and index.root.is_dir():
+        if index.update()["updated"] or not index.index_file.exists():
+            index.save()
+    return index
+
+
+def format_snippets(index: RepoIndex, text: str, max_symbols: int = 3, max_chars: int = 4000) -> str:
+    """Markdown block with source for symbols mentioned in text (or "" if none)."""
+    blocks, used = [], 0
+    for name in index.mentioned_symbols(text)[:max_symbols]:
+        for definition in index.definitions(name)[:1]:
+            code = index.snippet(definition)
+            block = f"### {definition['qualname']} ({definition['file']}:{definition['line']})\n```python\n{code}\n```"
+            if used + len(block) > max_chars:
+                return "\n\n".join(blocks)
+            blocks.append(block)
+            used += len(block)
+    return "\n\n".join(blocks)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Incremental repository symbol index")
+    parser.add_argument("project", help="Project key from repositories.json")
+    parser.add_argument("command", choices=["update", "def", "callers", "stats"])
+    parser.add_argument("name", nargs="?", help="Symbol name for def/callers")
+    parser.add_argument("--full", action="store_true", help="Re-stat every file on update")
+    args = parser.parse_args()
+
+    projects = load_projects()
+    if args.project not in projects:
+        print(f"[ERROR] Unknown project: {args.project}", file=sys.stderr)
+        sys.exit(1)
+
+    index = open_index(args.project, projects, update=args.command != "update")
+    if args.command == "update":
+        result = index.update(full=args.full)
+        index.save()
+        print(json.dumps(result))
+    elif args.command == "stats":
+        files = index.data["files"]
+        print(json.dumps({
+            "files": len(files),
+            "symbols": sum(len(f["symbols"]) for f in files.values()),
+            "git_head": index.data["git_head"],
+        }))
+    else:
+        if not args.name:
+            parser.error(f"{args.command} needs a symbol name")
+        start = time.time()
+        results = index.definitions(args.name) if args.command == "def" else index.callers(args.name)
+        for r in results:
+            detail = r.get("qualname") or f"in {r['caller']}"
+            print(f"{r['file']}:{r['line']}  {detail}")
+        print(f"({len(results)} results in {(time.time() - start) * 1000:.1f}ms)", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
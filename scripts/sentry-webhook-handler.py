@@ -4,6 +4,13 @@ Sentry Webhook Handler - Receives Sentry alerts and forwards to Molty gateway.
 
 Listens on port 18790 for POST requests from Sentry webhooks.
 Parses error context and dispatches to clawdbot for triage/auto-fix.
+Auto-fixable errors are also queued straight away as orchestrator tasks
+(see task_queue.py), once per error fingerprint.
+
+Request bodies are read in chunks up to SENTRY_MAX_BODY_BYTES, feeding the
+signature check (and the optional gzipped raw log) as they arrive, and only
+the fields extract_error_context reads are kept when parsing. Breadcrumbs,
+frame variables and the like never become Python objects.
 
 Usage:
     python scripts/sentry-webhook-handler.py
@@ -11,12 +18,17 @@ Usage:
 Environment:
     WEBHOOK_PORT - Port to listen on (default: 18790)
     CLAWD_HOME - Clawd directory (default: ~/clawd)
+    SENTRY_AUTOFIX_DISPATCH - Queue auto-fixable errors as tasks (default: true)
+    SENTRY_MAX_BODY_BYTES - Larger webhooks are rejected with 413 (default: 4 MiB)
+    SENTRY_LOG_RAW - Keep each accepted raw payload, gzipped (default: true)
 """
 
+import gzip
 import hashlib
 import hmac
 import json
 import os
+import re
 import subprocess
 import sys
 from datetime import datetime
@@ -24,26 +36,81 @@ from http.server import HTTPServer, BaseHTTPRequestHandler
 from pathlib import Path
 from urllib.parse import parse_qs
 
+sys.path.insert(0, str(Path(__file__).parent))
+from task_queue import TaskQueue
+
 # Configuration
 WEBHOOK_PORT = int(os.environ.get("WEBHOOK_PORT", 18790))
 CLAWD_HOME = Path(os.environ.get("CLAWD_HOME", Path.home() / "clawd"))
 LOG_DIR = CLAWD_HOME / "logs" / "sentry-webhooks"
 SENTRY_CLIENT_SECRET = os.environ.get("SENTRY_CLIENT_SECRET")
+AUTOFIX_DISPATCH = os.environ.get("SENTRY_AUTOFIX_DISPATCH", "true").lower() == "true"
+TASK_QUEUE_DIR = CLAWD_HOME / "memory" / "tasks" / "queue"
+MAX_BODY_BYTES = int(os.environ.get("SENTRY_MAX_BODY_BYTES", 4 * 1024 * 1024))
+LOG_RAW_PAYLOADS = os.environ.get("SENTRY_LOG_RAW", "true").lower() == "true"
+READ_CHUNK_BYTES = 64 * 1024
 
 
-def verify_signature(body: bytes, signature: str) -> bool:
-    """Verify Sentry webhook signature using HMAC-SHA256."""
+def new_signature_mac():
+    """Incremental HMAC-SHA256 for a request body, or None if no secret is configured."""
     if not SENTRY_CLIENT_SECRET:
+        return None
+    return hmac.new(SENTRY_CLIENT_SECRET.encode(), digestmod=hashlib.sha256)
+
+
+def signature_matches(mac, signature: str) -> bool:
+    """Compare a fully fed HMAC with the Sentry-Hook-Signature header."""
+    if mac is None:
         print("[WARN] SENTRY_CLIENT_SECRET not set - skipping signature verification")
         return True  # Allow if not configured (for backward compatibility)
     if not signature:
         return False
-    expected = hmac.new(
-        SENTRY_CLIENT_SECRET.encode(),
-        body,
-        hashlib.sha256
-    ).hexdigest()
-    return hmac.compare_digest(expected, signature)
+    return hmac.compare_digest(mac.hexdigest(), signature)
+
+
+def verify_signature(body: bytes, signature: str) -> bool:
+    """Verify Sentry webhook signature using HMAC-SHA256."""
+    mac = new_signature_mac()
+    if mac is not None:
+        mac.update(body)
+    return signature_matches(mac, signature)
+
+
+def read_body(rfile, length: int, mac=None, raw_sink=None) -> bytearray:
+    """Read exactly `length` bytes in chunks, feeding the HMAC and raw log as they arrive."""
+    body = bytearray()
+    remaining = length
+    while remaining:
+        chunk = rfile.read(min(READ_CHUNK_BYTES, remaining))
+        if not chunk:
+            raise ConnectionError(f"client closed with {remaining} bytes of the body unsent")
+        body += chunk
+        if mac is not None:
+            mac.update(chunk)
+        if raw_sink is not None:
+            raw_sink.write(chunk)
+        remaining -= len(chunk)
+    return body
+
+
+# Every key extract_error_context reads, at any depth. Anything else
+# (breadcrumbs, frame vars and source lines, request, contexts, sdk...) is
+# dropped as soon as its parent object is parsed.
+CONTEXT_KEYS = frozenset({
+    "data", "event", "project", "project_slug", "slug", "url", "web_url", "level", "culprit",
+    "message", "title", "exception", "values", "type", "value", "stacktrace", "frames",
+    "filename", "abs_path", "lineno", "function", "in_app",
+})
+
+
+def _context_fields(pairs: list) -> dict:
+    return {key: value for key, value in pairs if key in CONTEXT_KEYS}
+
+
+def parse_payload(body: bytes) -> dict:
+    """Parse a webhook body, keeping only the fields extract_error_context needs."""
+    payload = json.loads(body, object_pairs_hook=_context_fields)
+    return payload if isinstance(payload, dict) else {}
 
 # Project mapping (Sentry project slug → local path)
 PROJECT_PATHS = {
@@ -331,17 +398,76 @@ def notify_molty(message: str, context: dict):
         print(f"[ERROR] Failed to notify Molty: {e}")
 
 
-def log_webhook(context: dict, raw_payload: dict):
-    """Log webhook for debugging and audit."""
+def error_fingerprint(context: dict) -> str:
+    """Stable id for one error: project, type, location and message with numbers masked."""
+    message = re.sub(r"\d+", "N", context.get("error_message") or "")
+    fields = [str(context.get(k) or "") for k in ("project", "error_type", "file", "function")]
+    return hashlib.sha256("|".join(fields + [message]).encode()).hexdigest()[:16]
+
+
+def format_autofix_task(context: dict, triage: dict, fingerprint: str) -> str:
+    """Orchestrator task file for an auto-fixable error."""
+    project_path = PROJECT_PATHS.get(context["project"], "unknown")
+    location = f" in {context['file']}" if context["file"] else ""
+    return f"""# Auto-fix: {context['error_type']}{location}
+
+Sentry reported an error in project {context['project']} ({project_path}) that triage marked auto-fixable.
+
+## Error
+
+{format_triage_context(context)}
+
+## Suggested Fix
+
+{triage['fix_suggestion']}
+
+## Instructions
+
+1. Scout: find the failing code at the location above and what causes the error.
+2. Builder: make the smallest change that fixes it; do not refactor surrounding code.
+3. Inspector: run the project's tests and confirm nothing else broke.
+
+Escalate instead if the fix needs more than a small, local change.
+
+Sentry fingerprint: {fingerprint}
+"""
+
+
+def dispatch_autofix(context: dict, triage: dict) -> dict:
+    """Queue an orchestrator task for an auto-fixable error, once per fingerprint."""
+    if not AUTOFIX_DISPATCH:
+        return {"status": "disabled"}
+    if context["project"] not in PROJECT_PATHS:
+        return {"status": "skipped", "reason": f"no repo path for project {context['project']}"}
+
+    fingerprint = error_fingerprint(context)
+    try:
+        path = TaskQueue(TASK_QUEUE_DIR).submit(
+            f"autofix-{context['project']}-{context['error_type']}",
+            format_autofix_task(context, triage, fingerprint),
+            fingerprint=fingerprint,
+        )
+    except OSError as e:
+        print(f"[ERROR] Could not queue auto-fix task: {e}")
+        return {"status": "error", "error": str(e), "fingerprint": fingerprint}
+
+    if path is None:
+        print(f"[DISPATCH] Duplicate of an already queued error ({fingerprint})")
+        return {"status": "duplicate", "fingerprint": fingerprint}
+    print(f"[DISPATCH] Queued auto-fix task {path.name}")
+    return {"status": "queued", "task": path.name, "fingerprint": fingerprint}
+
+
+def log_webhook(context: dict, stamp: str, raw_file: str = None):
+    """Log webhook for debugging and audit (the raw payload, if kept, is in raw_file)."""
     LOG_DIR.mkdir(parents=True, exist_ok=True)
 
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    log_file = LOG_DIR / f"webhook_{timestamp}.json"
+    log_file = LOG_DIR / f"webhook_{stamp}.json"
 
     log_entry = {
         "received_at": context["timestamp"],
         "context": context,
-        "raw_payload": raw_payload,
+        "raw_payload_file": raw_file,
     }
 
     with open(log_file, "w") as f:
@@ -353,28 +479,72 @@ def log_webhook(context: dict, raw_payload: dict):
 class SentryWebhookHandler(BaseHTTPRequestHandler):
     """HTTP handler for Sentry webhooks."""
 
+    def respond(self, status: int, body: dict):
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.end_headers()
+        self.wfile.write(json.dumps(body).encode())
+
+    def read_verified_body(self, stamp: str):
+        """Stream the body in, checking its size and signature; returns (body, raw log file) or None."""
+        try:
+            content_length = int(self.headers.get("Content-Length", ""))
+            if content_length < 0:
+                raise ValueError(content_length)
+        except ValueError:
+            self.close_connection = True
+            self.respond(411, {"error": "Content-Length required"})
+            return None
+        if content_length > MAX_BODY_BYTES:
+            # Never read it: drop the connection instead of draining the body
+            print(f"[REJECT] {content_length} byte body from {self.client_address[0]} "
+                  f"exceeds {MAX_BODY_BYTES}")
+            self.close_connection = True
+            self.respond(413, {"error": f"Body larger than {MAX_BODY_BYTES} bytes"})
+            return None
+
+        mac = new_signature_mac()
+        raw_file = LOG_DIR / f"webhook_{stamp}.raw.json.gz" if LOG_RAW_PAYLOADS else None
+        if raw_file is None:
+            body = read_body(self.rfile, content_length, mac)
+        else:
+            # Compressed as it streams in; kept only if the signature checks out
+            raw_tmp = raw_file.with_name(f".{raw_file.name}.tmp")
+            LOG_DIR.mkdir(parents=True, exist_ok=True)
+            try:
+                with gzip.open(raw_tmp, "wb") as raw_sink:
+                    body = read_body(self.rfile, content_length, mac, raw_sink)
+            except BaseException:
+                raw_tmp.unlink(missing_ok=True)
+                raise
+
+        # Verify Sentry signature
+        if not signature_matches(mac, self.headers.get("Sentry-Hook-Signature", "")):
+            print(f"[REJECT] Invalid signature from {self.client_address[0]}")
+            if raw_file:
+                raw_tmp.unlink(missing_ok=True)
+            self.respond(401, {"error": "Invalid signature"})
+            return None
+        if raw_file:
+            os.replace(raw_tmp, raw_file)
+        return body, raw_file.name if raw_file else None
+
     def do_POST(self):
         """Handle POST requests from Sentry."""
         try:
-            content_length = int(self.headers.get("Content-Length", 0))
-            body = self.rfile.read(content_length)
-
-            # Verify Sentry signature
-            signature = self.headers.get("Sentry-Hook-Signature", "")
-            if not verify_signature(body, signature):
-                print(f"[REJECT] Invalid signature from {self.client_address[0]}")
-                self.send_response(401)
-                self.send_header("Content-Type", "application/json")
-                self.end_headers()
-                self.wfile.write(json.dumps({"error": "Invalid signature"}).encode())
+            stamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+            received = self.read_verified_body(stamp)
+            if received is None:
                 return
+            raw_file = received[1]
 
             # Parse JSON payload
             try:
-                payload = json.loads(body.decode("utf-8"))
-            except json.JSONDecodeError:
-                # Try form-encoded
-                payload = {"raw": body.decode("utf-8")}
+                payload = parse_payload(received[0])
+            except ValueError:
+                print("[WARN] Webhook body is not JSON")
+                payload = {}
+            del received  # Only the slimmed payload is kept from here on
 
             print(f"\n[WEBHOOK] Received from Sentry (signature verified)")
 
@@ -385,12 +555,19 @@ class SentryWebhookHandler(BaseHTTPRequestHandler):
             triage = triage_error(context)
             context["triage"] = triage
 
-            # Log the webhook (includes triage decision)
-            log_webhook(context, payload)
+            # Auto-fixable errors go straight to the orchestrator's queue
+            dispatch = dispatch_autofix(context, triage) if triage["action"] == "auto-fix" else None
+            context["dispatch"] = dispatch
+
+            # Log the webhook (includes triage and dispatch decisions)
+            log_webhook(context, stamp, raw_file)
 
-            # Format and send notification
+            # Format and send notification (a duplicate was already announced)
             message = format_molty_message(context, triage)
-            notify_molty(message, context)
+            if dispatch and dispatch["status"] == "queued":
+                message += f" | Queued {dispatch['task']}"
+            if not dispatch or dispatch["status"] != "duplicate":
+                notify_molty(message, context)
 
             # Print triage decision
             triage_context = format_triage_context(context)
@@ -401,17 +578,13 @@ class SentryWebhookHandler(BaseHTTPRequestHandler):
             print(f"\n[CONTEXT]\n{triage_context}\n")
 
             # Send success response
-            self.send_response(200)
-            self.send_header("Content-Type", "application/json")
-            self.end_headers()
-            self.wfile.write(json.dumps({"status": "ok"}).encode())
+            self.respond(200, {"status": "ok", "dispatch": dispatch})
 
+        except ConnectionError as e:
+            print(f"[WARN] Webhook request aborted: {e}")
         except Exception as e:
             print(f"[ERROR] Webhook processing failed: {e}")
-            self.send_response(500)
-            self.send_header("Content-Type", "application/json")
-            self.end_headers()
-            self.wfile.write(json.dumps({"error": str(e)}).encode())
+            self.respond(500, {"error": str(e)})
 
     def do_GET(self):
         """Health check endpoint."""
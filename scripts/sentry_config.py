@@ -1,8 +1,10 @@
-"""Sentry error monitoring configuration."""
+"""Sentry error monitoring configuration.
+
+sentry_sdk and python-dotenv are imported on first use, so importing this
+module costs nothing for commands that never initialize Sentry.
+"""
 
 import os
-import sentry_sdk
-from dotenv import load_dotenv
 
 
 def init_sentry() -> bool:
@@ -11,12 +13,16 @@ def init_sentry() -> bool:
     Returns:
         True if Sentry was initialized, False if DSN not configured.
     """
+    from dotenv import load_dotenv
+
     load_dotenv()
 
     dsn = os.getenv("SENTRY_DSN")
     if not dsn:
         return False
 
+    import sentry_sdk
+
     environment = os.getenv("ENVIRONMENT", "development")
 
     sentry_sdk.init(
@@ -32,9 +38,13 @@ def init_sentry() -> bool:
 
 def capture_exception(exception: Exception = None):
     """Capture an exception and send to Sentry."""
+    import sentry_sdk
+
     sentry_sdk.capture_exception(exception)
 
 
 def capture_message(message: str, level: str = "info"):
     """Send a message to Sentry."""
+    import sentry_sdk
+
     sentry_sdk.capture_message(message, level=level)
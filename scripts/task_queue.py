@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""
+Task Queue - File-based queue of orchestrator tasks.
+
+Producers (the Sentry webhook handler, or `submit`) drop markdown task files
+into memory/tasks/queue/. Each file is written to a temporary name and
+renamed into place, so a reader never sees a half-written task. `run`
+claims the oldest task by renaming it into running/ (only one runner can
+win the rename), runs orchestrator.py on it, and moves it to done/ with
+the outcome in its name: .done.md if the task completed, .failed.md if it
+halted, escalated, ran out of turns or crashed. With --watch it keeps
+polling, so tasks start minutes after they are queued instead of waiting
+for the overnight run.
+
+A runner holds a lock on each task it runs (running/.<task>.owner, with its
+pid and start time for humans), so the lock dies with the runner. `run`
+first recovers tasks left in running/ by a runner that was killed or a
+reboot: a task is requeued once (as <task>.retry.md), and fails if it is
+interrupted again; a failed task's fingerprint is dropped so the error can
+be queued again.
+
+Tasks can carry a fingerprint (e.g. one Sentry error). A fingerprint seen
+within the dedupe window is counted but not queued again.
+
+Usage:
+    python scripts/task_queue.py list
+    python scripts/task_queue.py submit memory/tasks/fix-login.md
+    python scripts/task_queue.py run            # Run the next task, if any
+    python scripts/task_queue.py run --watch    # Keep draining the queue
+
+Environment:
+    CLAWD_HOME - Clawd directory (default: ~/clawd)
+    TASK_QUEUE_INTERVAL - Seconds between polls with --watch (default: 30)
+"""
+
+import argparse
+import fcntl
+import json
+import os
+import re
+import subprocess
+import sys
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+CLAWD_HOME = Path(os.environ.get("CLAWD_HOME", Path.home() / "clawd"))
+QUEUE_DIR = CLAWD_HOME / "memory" / "tasks" / "queue"
+ORCHESTRATOR = Path(__file__).parent / "orchestrator.py"
+
+TASK_QUEUE_INTERVAL = int(os.environ.get("TASK_QUEUE_INTERVAL", 30))
+DEDUPE_SECONDS = 24 * 3600
+
+
+def slugify(text: str, limit: int = 48) -> str:
+    return re.sub(r"[^a-z0-9]+", "-", text.lower()).strip("-")[:limit] or "task"
+
+
+class TaskQueue:
+    """Pending, running and done task files under one queue directory."""
+
+    def __init__(self, root: Path = QUEUE_DIR):
+        self.root = Path(root)
+        self.running_dir = self.root / "running"
+        self.done_dir = self.root / "done"
+        self.ledger_file = self.root / "fingerprints.json"
+        self._owned = {}  # Running task path -> its locked owner file
+
+    @contextmanager
+    def _locked(self):
+        self.root.mkdir(parents=True, exist_ok=True)
+        with open(self.root / "queue.lock", "w") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            yield
+
+    def _read_ledger(self) -> dict:
+        try:
+            return json.loads(self.ledger_file.read_text())
+        except (OSError, ValueError):
+            return {}
+
+    def _write_atomic(self, path: Path, text: str):
+        tmp = path.parent / f".{path.name}.tmp"
+        tmp.write_text(text)
+        os.replace(tmp, path)
+
+    # -- Producing ------------------------------------------------------------
+
+    def submit(self, name: str, content: str, fingerprint: str = None,
+               dedupe_seconds: float = DEDUPE_SECONDS) -> Optional[Path]:
+        """Queue a task; returns its path, or None if the fingerprint is a recent duplicate."""
+        with self._locked():
+            now = time.time()
+            ledger = self._read_ledger()
+            if fingerprint:
+                seen = ledger.get(fingerprint)
+                if seen and now - seen["queued_at"] < dedupe_seconds:
+                    seen["duplicates"] = seen.get("duplicates", 0) + 1
+                    seen["last_seen"] = now
+                    self._write_atomic(self.ledger_file, json.dumps(ledger, indent=2))
+                    return None
+
+            # Timestamp prefix keeps pending() in arrival order
+            base = f"{datetime.now().strftime('%Y%m%d-%H%M%S-%f')}-{slugify(name)}"
+            path, n = self.root / f"{base}.md", 1
+            while path.exists():
+                n += 1
+                path = self.root / f"{base}~{n}.md"
+            self._write_atomic(path, content)
+
+            if fingerprint:
+                # Drop entries that have aged out of the window
+                ledger = {fp: e for fp, e in ledger.items() if now - e["queued_at"] < dedupe_seconds}
+                ledger[fingerprint] = {"task": path.name, "queued_at": now, "last_seen": now, "duplicates": 0}
+                self._write_atomic(self.ledger_file, json.dumps(ledger, indent=2))
+            return path
+
+    # -- Consuming ------------------------------------------------------------
+
+    def pending(self) -> list:
+        if not self.root.exists():
+            return []
+        return sorted(p for p in self.root.glob("*.md") if not p.name.startswith("."))
+
+    def running(self) -> list:
+        return sorted(self.running_dir.glob("*.md")) if self.running_dir.exists() else []
+
+    def _owner_path(self, path: Path) -> Path:
+        return self.running_dir / f".{path.name}.owner"
+
+    def claim(self) -> Optional[Path]:
+        """Move the oldest pending task to running/; None if the queue is empty."""
+        self.running_dir.mkdir(parents=True, exist_ok=True)
+        with self._locked():
+            for path in self.pending():
+                target = self.running_dir / path.name
+                try:
+                    os.rename(path, target)
+                except FileNotFoundError:
+                    continue  # Another runner claimed it first
+                owner = open(self._owner_path(target), "w")
+                fcntl.flock(owner, fcntl.LOCK_EX)
+                owner.write(json.dumps({"pid": os.getpid(), "started": time.time()}))
+                owner.flush()
+                self._owned[target] = owner
+                return target
+        return None
+
+    def finish(self, path: Path, outcome: str) -> Path:
+        self.done_dir.mkdir(parents=True, exist_ok=True)
+        target = self.done_dir / f"{path.stem}.{outcome}.md"
+        os.replace(path, target)
+        owner = self._owned.pop(path, None)
+        self._owner_path(path).unlink(missing_ok=True)
+        if owner:
+            owner.close()
+        return target
+
+    def recover_stale(self) -> list:
+        """Requeue or fail running tasks whose runner is gone; returns (task, action) pairs."""
+        recovered = []
+        with self._locked():
+            for path in self.running():
+                with open(self._owner_path(path), "a") as owner:
+                    try:
+                        fcntl.flock(owner, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    except BlockingIOError:
+                        continue  # Its runner is alive
+                self._owner_path(path).unlink()
+                if path.stem.endswith(".retry"):
+                    self.finish(path, "failed")
+                    self._forget(path.name.split(".")[0])
+                    recovered.append((path.name, "failed"))
+                else:
+                    os.rename(path, self.root / f"{path.stem}.retry.md")
+                    recovered.append((path.name, "requeued"))
+        return recovered
+
+    def _forget(self, stem: str):
+        """Drop the fingerprints of a task (called with the queue locked)."""
+        ledger = self._read_ledger()
+        kept = {fp: e for fp, e in ledger.items() if Path(e["task"]).stem != stem}
+        if kept != ledger:
+            self._write_atomic(self.ledger_file, json.dumps(kept, indent=2))
+
+
+def run_next(queue: TaskQueue, command: list = None) -> Optional[dict]:
+    """Claim and run one task with the orchestrator; None if nothing was queued."""
+    path = queue.claim()
+    if path is None:
+        return None
+    command = command or [sys.executable, str(ORCHESTRATOR)]
+    start = time.time()
+    print(f"[{datetime.now().isoformat()}] Running {path.name}", flush=True)
+    result = subprocess.run([*command, str(path)], cwd=CLAWD_HOME if CLAWD_HOME.exists() else None)
+    outcome = "done" if result.returncode == 0 else "failed"
+    finished = queue.finish(path, outcome)
+    print(f"[{datetime.now().isoformat()}] {path.name} {outcome} in {time.time() - start:.0f}s", flush=True)
+    return {"task": finished.name, "outcome": outcome, "exit_code": result.returncode}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("list", help="Show pending and running tasks")
+    submit = sub.add_parser("submit", help="Queue a task file")
+    submit.add_argument("file")
+    run = sub.add_parser("run", help="Run queued tasks")
+    run.add_argument("--watch", action="store_true", help="Keep polling for new tasks")
+    run.add_argument("--interval", type=int, default=TASK_QUEUE_INTERVAL)
+    args = parser.parse_args()
+
+    queue = TaskQueue()
+    if args.command == "list":
+        for path in queue.running():
+            print(f"running  {path.name}")
+        for path in queue.pending():
+            print(f"pending  {path.name}")
+    elif args.command == "submit":
+        source = Path(args.file)
+        print(queue.submit(source.stem, source.read_text()))
+    elif args.command == "run":
+        for name, action in queue.recover_stale():
+            print(f"[{datetime.now().isoformat()}] Interrupted task {name} {action}", flush=True)
+        while True:
+            ran = run_next(queue)
+            if ran is None:
+                if not args.watch:
+                    break
+                time.sleep(args.interval)
+
+
+if __name__ == "__main__":
+    main()
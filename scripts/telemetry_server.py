@@ -0,0 +1,414 @@
+#!/usr/bin/env python3
+"""
+Telemetry Server - Live overnight-run feed for the canvas dashboard.
+
+Follows memory/logs/events-*.jsonl and memory/current-state.json and pushes
+updates to browsers over Server-Sent Events. One follower thread reads only
+the bytes appended since its last read (woken by inotify on Linux, stat
+polling elsewhere) and publishes each update once as pre-encoded SSE
+frames, so every extra viewer costs a socket write and nothing else.
+
+Endpoints:
+    /           canvas/dashboard.html (turn, phase, latency, queue depth)
+    /events     SSE stream: "metrics" snapshots and raw "log" events
+    /snapshot   Current metrics as JSON
+
+Usage:
+    python scripts/telemetry_server.py [--port 8765] [--poll]
+
+Environment:
+    CLAWD_HOME - Clawd directory (default: ~/clawd)
+    TELEMETRY_PORT - Listen port (default: 8765)
+"""
+
+import argparse
+import ctypes
+import ctypes.util
+import json
+import os
+import select
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Optional
+
+CLAWD_HOME = Path(os.environ.get("CLAWD_HOME", Path.home() / "clawd"))
+MEMORY_DIR = CLAWD_HOME / "memory"
+LOGS_DIR = MEMORY_DIR / "logs"
+DASHBOARD_FILE = CLAWD_HOME / "canvas" / "dashboard.html"
+TELEMETRY_PORT = int(os.environ.get("TELEMETRY_PORT", 8765))
+
+POLL_INTERVAL = 1.0
+HEARTBEAT_SECONDS = 15
+TAIL_BYTES = 64 * 1024  # History shown to the first viewer after startup
+RECENT_EVENTS = 200
+LATENCY_SAMPLES = 100
+BACKLOG_FRAMES = 1000
+
+# inotify flags (linux/inotify.h)
+IN_MODIFY = 0x002
+IN_CLOSE_WRITE = 0x008
+IN_MOVED_TO = 0x080
+IN_CREATE = 0x100
+
+
+# =============================================================================
+# File watching
+# =============================================================================
+
+class PollWatcher:
+    """Wakes up every interval; the follower's stat checks find what changed."""
+
+    def __init__(self, interval: float = POLL_INTERVAL):
+        self.interval = interval
+
+    def wait(self, timeout: float):
+        time.sleep(min(timeout, self.interval))
+
+    def close(self):
+        pass
+
+
+class InotifyWatcher:
+    """Blocks until something in the watched directories changes (Linux only)."""
+
+    def __init__(self, directories: list):
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self.fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        mask = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+        for directory in directories:
+            if libc.inotify_add_watch(self.fd, str(directory).encode(), mask) < 0:
+                os.close(self.fd)
+                raise OSError(ctypes.get_errno(), f"inotify_add_watch failed for {directory}")
+
+    def wait(self, timeout: float):
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if ready:
+            try:
+                while os.read(self.fd, 65536):
+                    pass
+            except BlockingIOError:
+                pass
+
+    def close(self):
+        os.close(self.fd)
+
+
+def make_watcher(directories: list, poll: bool = False):
+    if not poll:
+        try:
+            return InotifyWatcher(directories)
+        except (AttributeError, OSError):
+            pass  # No inotify (macOS) or watch limit reached
+    return PollWatcher()
+
+
+# =============================================================================
+# Telemetry state
+# =============================================================================
+
+def _percentile(samples, pct: float) -> Optional[int]:
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+class Telemetry:
+    """Live metrics folded from events and current-state.json."""
+
+    def __init__(self):
+        self.state = {}
+        self.director_ms = deque(maxlen=LATENCY_SAMPLES)
+        self.worker_ms = {}
+        self.workers_in_flight = 0
+        self.hosts = {}
+        self.last_event = None
+        self.counts = {}
+        self.recent = deque(maxlen=RECENT_EVENTS)
+
+    def apply_event(self, event: dict):
+        kind = event.get("event", "")
+        self.counts[kind] = self.counts.get(kind, 0) + 1
+        self.last_event = event.get("timestamp")
+        self.recent.append(event)
+        if kind == "director_call" and "turn" in event:
+            self.state["turn"] = event["turn"]
+        elif kind == "director_response":
+            self.director_ms.append(event.get("latency_ms", 0))
+        elif kind == "worker_call":
+            self.workers_in_flight += 1
+        elif kind == "worker_response":
+            self.workers_in_flight = max(0, self.workers_in_flight - 1)
+            agent = event.get("agent", "?")
+            self.worker_ms.setdefault(agent, deque(maxlen=LATENCY_SAMPLES)).append(event.get("latency_ms", 0))
+        elif kind == "ollama_host" and "host" in event:
+            self.hosts[event["host"]] = {"outstanding": event.get("outstanding", 0),
+                                         "p95_ms": event.get("p95_ms")}
+        elif kind == "orchestrator_end":
+            self.state["status"] = event.get("status")
+            self.workers_in_flight = 0
+
+    def apply_state(self, state: dict):
+        self.state = {
+            "task_id": state.get("task_id"),
+            "task": str(state.get("task", ""))[:200],
+            "phase": state.get("phase"),
+            "turn": state.get("turn"),
+            "status": state.get("status"),
+            "consecutive_failures": state.get("consecutive_failures"),
+            "history": len(state.get("history", [])),
+        }
+
+    def metrics(self) -> dict:
+        return {
+            **self.state,
+            "latency": {
+                "director": {"last": self.director_ms[-1] if self.director_ms else None,
+                             "p50": _percentile(self.director_ms, 50),
+                             "p95": _percentile(self.director_ms, 95)},
+                "workers": {agent: {"last": s[-1], "p50": _percentile(s, 50), "p95": _percentile(s, 95)}
+                            for agent, s in sorted(self.worker_ms.items())},
+            },
+            "queue": {
+                "workers_in_flight": self.workers_in_flight,
+                "host_outstanding": sum(h["outstanding"] for h in self.hosts.values()),
+                "hosts": self.hosts,
+            },
+            "counts": self.counts,
+            "last_event": self.last_event,
+        }
+
+
+# =============================================================================
+# Broadcasting
+# =============================================================================
+
+def sse_frame(kind: str, data) -> bytes:
+    return f"event: {kind}\ndata: {json.dumps(data, default=str)}\n\n".encode("utf-8")
+
+
+class Broadcaster:
+    """Sequence-numbered SSE frames shared by all viewers."""
+
+    def __init__(self):
+        self.frames = deque(maxlen=BACKLOG_FRAMES)
+        self.seq = 0
+        self.cond = threading.Condition()
+
+    def publish(self, frames: list):
+        if not frames:
+            return
+        with self.cond:
+            for frame in frames:
+                self.seq += 1
+                self.frames.append((self.seq, frame))
+            self.cond.notify_all()
+
+    def since(self, seq: int, timeout: float):
+        """Frames after seq (waiting up to timeout), the new seq, and whether frames were dropped."""
+        with self.cond:
+            self.cond.wait_for(lambda: self.seq > seq, timeout)
+            if self.seq == seq:
+                return [], seq, False
+            oldest = self.frames[0][0]
+            return [f for s, f in self.frames if s > seq], self.seq, seq + 1 < oldest
+
+
+class Follower:
+    """Reads appended event lines and state rewrites, then publishes them."""
+
+    def __init__(self, logs_dir: Path = LOGS_DIR, state_file: Path = MEMORY_DIR / "current-state.json",
+                 poll: bool = False):
+        self.logs_dir = Path(logs_dir)
+        self.state_file = Path(state_file)
+        self.poll = poll
+        self.telemetry = Telemetry()
+        self.broadcaster = Broadcaster()
+        self.lock = threading.Lock()
+        self.bytes_read = 0
+        self._file = None
+        self._offset = 0
+        self._state_stat = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _current_events_file(self) -> Optional[Path]:
+        files = sorted(self.logs_dir.glob("events-*.jsonl"))
+        return files[-1] if files else None
+
+    def _read(self, path: Path, offset: int) -> bytes:
+        with open(path, "rb") as f:
+            f.seek(offset)
+            data = f.read()
+        self.bytes_read += len(data)
+        return data
+
+    def _new_events(self) -> list:
+        path = self._current_events_file()
+        if path is None:
+            return []
+        if path != self._file:
+            first = self._file is None
+            self._file, self._offset = path, 0
+            if first:
+                # Start near the end: recent history without reading old turns
+                size = path.stat().st_size
+                if size > TAIL_BYTES:
+                    data = self._read(path, size - TAIL_BYTES)
+                    self._offset = size - TAIL_BYTES + data.find(b"\n") + 1
+        if path.stat().st_size <= self._offset:
+            return []
+        data = self._read(path, self._offset)
+        end = data.rfind(b"\n") + 1  # Leave a partially written line for next time
+        self._offset += end
+        events = []
+        for line in data[:end].splitlines():
+            try:
+                events.append(json.loads(line))
+            except ValueError:
+                continue
+        return events
+
+    def _new_state(self) -> Optional[dict]:
+        try:
+            stat = self.state_file.stat()
+        except FileNotFoundError:
+            return None
+        key = (stat.st_mtime_ns, stat.st_size)
+        if key == self._state_stat:
+            return None
+        try:
+            state = json.loads(self._read(self.state_file, 0))
+        except ValueError:
+            return None  # Mid-write; the closing write wakes us again
+        self._state_stat = key
+        return state
+
+    def step(self):
+        """Fold in whatever changed since the last step and publish it."""
+        with self.lock:
+            events = self._new_events()
+            state = self._new_state()
+            for event in events:
+                self.telemetry.apply_event(event)
+            if state is not None:
+                self.telemetry.apply_state(state)
+            if events or state is not None:
+                frames = [sse_frame("log", e) for e in events]
+                frames.append(sse_frame("metrics", self.telemetry.metrics()))
+                self.broadcaster.publish(frames)
+
+    def snapshot(self) -> tuple:
+        """Metrics and recent events as SSE frames, plus the seq they correspond to."""
+        with self.lock:
+            frames = [sse_frame("metrics", self.telemetry.metrics()),
+                      sse_frame("recent", list(self.telemetry.recent))]
+            with self.broadcaster.cond:
+                return frames, self.broadcaster.seq
+
+    def _run(self):
+        self.logs_dir.mkdir(parents=True, exist_ok=True)
+        watcher = make_watcher([self.logs_dir, self.state_file.parent], self.poll)
+        try:
+            while not self._stop.is_set():
+                self.step()
+                watcher.wait(POLL_INTERVAL)
+        finally:
+            watcher.close()
+
+    def start(self):
+        self.step()
+        self._thread = threading.Thread(target=self._run, name="telemetry-follower", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+
+
+# =============================================================================
+# HTTP
+# =============================================================================
+
+class TelemetryHandler(BaseHTTPRequestHandler):
+    follower: Follower = None
+    dashboard_file: Path = DASHBOARD_FILE
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status: int, content_type: str, body: bytes):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path == "/events":
+            self._stream()
+        elif self.path == "/snapshot":
+            with self.follower.lock:
+                body = json.dumps(self.follower.telemetry.metrics(), default=str).encode("utf-8")
+            self._send(200, "application/json", body)
+        elif self.path in ("/", "/dashboard.html") and self.dashboard_file.exists():
+            self._send(200, "text/html; charset=utf-8", self.dashboard_file.read_bytes())
+        else:
+            self._send(404, "text/plain", b"Not found\n")
+
+    def _stream(self):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+        frames, seq = self.follower.snapshot()
+        try:
+            self.wfile.write(b"".join(frames))
+            self.wfile.flush()
+            while True:
+                frames, seq, dropped = self.follower.broadcaster.since(seq, HEARTBEAT_SECONDS)
+                if dropped:
+                    # Too slow to keep up: resync from a fresh snapshot
+                    frames, seq = self.follower.snapshot()
+                self.wfile.write(b"".join(frames) if frames else b": ping\n\n")
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+
+def make_server(follower: Follower, host: str = "127.0.0.1", port: int = TELEMETRY_PORT,
+                dashboard_file: Path = DASHBOARD_FILE) -> ThreadingHTTPServer:
+    handler = type("Handler", (TelemetryHandler,), {"follower": follower, "dashboard_file": dashboard_file})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Live telemetry feed for the canvas dashboard")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=TELEMETRY_PORT)
+    parser.add_argument("--poll", action="store_true", help="Poll files instead of using inotify")
+    args = parser.parse_args()
+
+    follower = Follower(poll=args.poll)
+    follower.start()
+    server = make_server(follower, args.host, args.port)
+    print(f"Telemetry dashboard: http://{args.host}:{server.server_address[1]}/")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        follower.stop()
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+import json
+import os
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+from analytics import Analytics, histogram_percentile, latency_bucket
+
+
+class TestAnalytics(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.logs = Path(self.tmp.name) / "logs"
+        self.logs.mkdir()
+        self.root = Path(self.tmp.name) / "analytics"
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def append(self, name, *records):
+        with open(self.logs / name, "a") as f:
+            for r in records:
+                f.write(json.dumps(r) + "\n")
+
+    def session(self, task_id, status, turns, end="2026-10-18T03:00:00", project="dice"):
+        path = self.logs / f"session-{task_id}.json"
+        path.write_text(json.dumps({
+            "session_id": task_id, "status": status, "project": project, "model": "qwen",
+            "start_time": "2026-10-18T02:00:00", "end_time": end,
+            "metrics": {"total_turns": len(turns)},
+            "turns": [{"agent": a, "success": ok, "duration_ms": ms} for a, ok, ms in turns],
+        }))
+        # Rewrites within one test must look changed
+        stamp = time.time() + len(list(self.logs.iterdir())) + len(turns)
+        os.utime(path, (stamp, stamp))
+
+    def analytics(self):
+        return Analytics(self.logs, self.root)
+
+    def test_percentiles_from_histogram(self):
+        hist = {}
+        for ms in range(1, 1001):
+            key = str(latency_bucket(ms))
+            hist[key] = hist.get(key, 0) + 1
+        p50 = histogram_percentile(hist, 50, lambda b: round(1.1 ** b))
+        self.assertTrue(450 <= p50 <= 560, p50)
+
+    def test_events_are_read_incrementally(self):
+        self.append("events-20261018.jsonl",
+                    {"event": "worker_response", "agent": "scout", "exit_code": 0, "latency_ms": 1000,
+                     "timestamp": "2026-10-18T01:00:00"},
+                    {"event": "director_call", "turn": 1, "timestamp": "2026-10-18T01:00:01"})
+        self.assertEqual(self.analytics().ingest()["events"], 2)
+        self.assertEqual(self.analytics().ingest()["events"], 0)
+
+        self.append("events-20261018.jsonl",
+                    {"event": "worker_response", "agent": "scout", "exit_code": 1, "latency_ms": 3000,
+                     "timestamp": "2026-10-18T01:05:00"})
+        self.assertEqual(self.analytics().ingest()["events"], 1)
+
+        rows = self.analytics().query("2026-10-18", "2026-10-18", ("agent",), source="event", kind="worker_response")
+        self.assertEqual(len(rows), 1)
+        self.assertEqual((rows[0]["count"], rows[0]["success_rate"]), (2, 0.5))
+
+    def test_partial_line_waits_for_newline(self):
+        with open(self.logs / "calls.jsonl", "w") as f:
+            f.write('{"timestamp":"2026-10-18T01:00:00","agent":"scout","status":"success","latency_ms":5}\n{"timest')
+        self.assertEqual(self.analytics().ingest()["calls"], 1)
+        with open(self.logs / "calls.jsonl", "a") as f:
+            f.write('amp":"2026-10-18T02:00:00","agent":"scout","status":"http_error","latency_ms":9}\n')
+        self.assertEqual(self.analytics().ingest()["calls"], 1)
+        rows = self.analytics().query("2026-10-18", "2026-10-18", ("status",), source="call")
+        self.assertEqual({r["status"]: r["count"] for r in rows}, {"success": 1, "http_error": 1})
+
+    def test_sessions_rollup_index_and_rewrite(self):
+        self.session("t1", "complete", [("scout", True, 100), ("builder", True, 200)])
+        self.session("t2", "escalated", [("scout", False, 50)])
+        self.analytics().ingest()
+
+        analytics = self.analytics()
+        self.assertEqual(analytics.task("t1")["turns"], 2)
+        self.assertEqual(sorted(t["task_id"] for t in analytics.tasks_on("2026-10-18")), ["t1", "t2"])
+        summary = analytics.daily_summary("2026-10-18")
+        self.assertEqual((summary["completed"], summary["escalated"]), (1, 1))
+
+        # Resumed task: its old contribution is replaced, not double counted
+        self.session("t2", "complete", [("scout", False, 50), ("scout", True, 70), ("inspector", True, 90)])
+        self.assertEqual(self.analytics().ingest()["sessions"], 1)
+        analytics = self.analytics()
+        summary = analytics.daily_summary("2026-10-18")
+        self.assertEqual((summary["completed"], summary["escalated"]), (2, 0))
+        tasks = analytics.query("2026-10-18", "2026-10-18", ("project",), source="session", kind="task")
+        self.assertEqual((tasks[0]["count"], tasks[0]["p90_turns"]), (2, 3))
+        turns = {r["agent"]: r for r in analytics.query("2026-10-18", "2026-10-18", ("agent",),
+                                                         source="session", kind="turn")}
+        self.assertEqual(turns["scout"]["count"], 3)
+        self.assertEqual(turns["scout"]["success_rate"], 0.667)
+
+    def test_query_spans_days_without_raw_logs(self):
+        for day in range(1, 31):
+            self.append(f"events-202609{day:02d}.jsonl",
+                        {"event": "director_response", "latency_ms": 1000 + day,
+                         "timestamp": f"2026-09-{day:02d}T01:00:00"})
+        self.analytics().ingest()
+        for path in self.logs.glob("events-*.jsonl"):
+            path.unlink()
+
+        start = time.time()
+        rows = self.analytics().query("2026-09-01", "2026-09-30", ("kind",), source="event")
+        self.assertLess(time.time() - start, 1.0)
+        self.assertEqual(rows[0]["count"], 30)
+        self.assertEqual(rows[0]["success_rate"], 1.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
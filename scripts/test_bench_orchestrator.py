@@ -0,0 +1,35 @@
+import random
+import unittest
+
+import bench_orchestrator
+
+
+class TestBenchOrchestrator(unittest.TestCase):
+    def test_latency_specs(self):
+        rng = random.Random(1)
+        self.assertEqual(bench_orchestrator.parse_latency("fixed:0.25")(rng), 0.25)
+        self.assertTrue(0.1 <= bench_orchestrator.parse_latency("uniform:0.1:0.2")(rng) <= 0.2)
+        self.assertGreater(bench_orchestrator.parse_latency("lognormal:0.05:0.5")(rng), 0)
+        with self.assertRaises(ValueError):
+            bench_orchestrator.parse_latency("gamma:1")
+
+    def test_concurrent_tasks_run_end_to_end(self):
+        run = bench_orchestrator.run_config(turns=3, output_bytes=4096, concurrency=2,
+                                            director_latency="fixed:0.01", worker_latency="fixed:0.02")
+        self.assertEqual(run["completed"], 2)
+        # 4 Director calls and 3 worker calls per task
+        self.assertAlmostEqual(run["simulated_latency_s"], 0.1, places=2)
+        self.assertGreater(run["disk_bytes"]["checkpoints"], 0)
+        self.assertGreater(run["disk_bytes"]["blobs"], 0)  # 4KB outputs spill to the blob store
+        self.assertGreater(run["cpu_per_turn_ms"], 0)
+        self.assertGreater(run["peak_rss_mb"], 0)
+
+    def test_regressions_against_baseline(self):
+        old = {"turns": 10, "output_bytes": 1024, "concurrency": 1, "overhead_per_turn_ms": 100, "cpu_per_turn_ms": 5}
+        new = {**old, "overhead_per_turn_ms": 140, "cpu_per_turn_ms": 5.5}
+        regressions = bench_orchestrator.find_regressions([new], {"runs": [old]}, tolerance=1.25)
+        self.assertEqual(regressions, ["10x1024x1 overhead_per_turn_ms: 100 -> 140"])
+
+
+if __name__ == "__main__":
+    unittest.main()
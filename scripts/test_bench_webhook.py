@@ -0,0 +1,40 @@
+import json
+import random
+import unittest
+
+import bench_webhook
+
+
+class TestBenchWebhook(unittest.TestCase):
+    def test_payloads_are_signed_and_parse(self):
+        handler = bench_webhook.load_handler_module()
+        rng = random.Random(3)
+        for depth in bench_webhook.STACK_DEPTHS:
+            payload = bench_webhook.make_payload(rng, depth)
+            body = json.dumps(payload).encode("utf-8")
+            self.assertTrue(handler.verify_signature(body, bench_webhook.sign(body)))
+            self.assertFalse(handler.verify_signature(body, "0" * 64))
+            context = handler.extract_error_context(payload)
+            self.assertTrue(context["error_type"])
+            self.assertIn(handler.triage_error(context)["action"], {"auto-fix", "escalate"})
+
+    def test_micro_reports_each_function(self):
+        results = bench_webhook.run_micro(iterations=50)
+        self.assertIn("triage_error_us", results)
+        self.assertIn("extract_error_context_depth200_us", results)
+        self.assertTrue(any(k.startswith("verify_signature_") for k in results))
+
+    def test_load_against_live_handler(self):
+        report = bench_webhook.run_load(requests=20, concurrency=2, invalid_ratio=0.25, seed=2)
+        self.assertEqual(report["error_rate"], 0)
+        self.assertEqual(sum(report["statuses"].values()), 20)
+        # Every accepted webhook reaches clawdbot except repeats of a queued error
+        self.assertEqual(report["clawdbot_calls"] + report["autofix_duplicates"], report["statuses"].get("200", 0))
+        self.assertGreater(report["autofix_tasks_queued"], 0)
+        self.assertGreater(report["disk_growth_bytes"], 0)
+        self.assertGreater(report["throughput_rps"], 0)
+        self.assertLessEqual(report["p50_ms"], report["p99_ms"])
+
+
+if __name__ == "__main__":
+    unittest.main()
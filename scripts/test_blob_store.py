@@ -0,0 +1,58 @@
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+from blob_store import BLOB_THRESHOLD, BlobStore, load_result, spill_result
+
+
+class TestBlobStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.store = BlobStore(Path(self.tmp.name))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_roundtrip_and_dedupe(self):
+        text = "def f():\n    return 1\n" * 500
+        digest = self.store.put(text)
+        self.assertEqual(self.store.put(text), digest)
+        self.assertEqual(self.store.get(digest), text)
+        blobs = list(Path(self.tmp.name).rglob("*.gz"))
+        self.assertEqual(len(blobs), 1)
+        self.assertLess(blobs[0].stat().st_size, len(text))
+
+    def test_small_result_stays_inline(self):
+        entry = spill_result(self.store, "ok")
+        self.assertEqual(entry, {"result": "ok"})
+        self.assertEqual(load_result(self.store, entry), "ok")
+
+    def test_large_result_is_spilled(self):
+        text = "x" * (BLOB_THRESHOLD + 1)
+        entry = spill_result(self.store, text)
+        self.assertNotIn("result", entry)
+        self.assertEqual(entry["result_size"], len(text))
+        self.assertEqual(len(entry["result_preview"]), 500)
+        self.assertEqual(load_result(self.store, entry), text)
+
+    def test_missing_blob_raises(self):
+        with self.assertRaises(FileNotFoundError):
+            self.store.get("0" * 64)
+
+    def test_sweep_keeps_referenced_and_recent_blobs(self):
+        old, kept, reused = (self.store.put(f"{name}\n" * 1000) for name in ("old", "kept", "reused"))
+        for digest in (old, kept, reused):
+            os.utime(self.store._path(digest), (0, 0))
+        self.store.put("reused\n" * 1000)  # Reuse by a run that has not checkpointed yet
+
+        self.assertEqual(self.store.sweep({kept}, dry_run=True)["blobs_deleted"], 1)
+        self.assertTrue(self.store.exists(old))
+        summary = self.store.sweep({kept})
+        self.assertEqual(summary["blobs_deleted"], 1)
+        self.assertGreater(summary["blob_bytes_freed"], 0)
+        self.assertEqual([self.store.exists(d) for d in (old, kept, reused)], [False, True, True])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,95 @@
+import json
+import os
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from blob_store import BlobStore
+from checkpoint_retention import apply_retention, list_checkpoints, read_checkpoint, sweep_blobs
+
+NOW = datetime(2026, 2, 10, 12, 0, 0)
+
+
+class TestCheckpointRetention(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dir = Path(self.tmp.name)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, task_id, ts, status="running", history=()):
+        path = self.dir / f"chk-{task_id}-{ts.strftime('%Y%m%d-%H%M%S')}.json"
+        state = {"task_id": task_id, "status": status, "ts": ts.isoformat(), "history": list(history)}
+        path.write_text(json.dumps(state, indent=2))
+        return path
+
+    def test_keeps_last_n_plain(self):
+        for i in range(5):
+            self.write("task-a", NOW - timedelta(seconds=i))
+        summary = apply_retention(self.dir, now=NOW)
+        self.assertEqual(summary["deleted"], 0)
+        self.assertEqual(summary["compressed"], 0)
+        self.assertEqual(len(list(self.dir.glob("*.json"))), 5)
+
+    def test_thins_and_compresses_old_turns(self):
+        # 60 turns one minute apart, all within the same two hours
+        for i in range(60):
+            self.write("task-a", NOW - timedelta(hours=1, minutes=i))
+        summary = apply_retention(self.dir, now=NOW)
+        remaining = list_checkpoints(self.dir)
+        self.assertLess(len(remaining), 15)
+        self.assertGreater(summary["deleted"], 40)
+        self.assertTrue(any(p.name.endswith(".gz") for p in remaining))
+
+    def test_terminal_checkpoints_survive(self):
+        terminal = self.write("task-a", NOW - timedelta(days=60), status="complete")
+        for i in range(20):
+            self.write("task-a", NOW - timedelta(days=60, minutes=-i - 1))
+        apply_retention(self.dir, now=NOW)
+        names = [p.name for p in list_checkpoints(self.dir)]
+        self.assertIn(terminal.name + ".gz", names)
+
+    def test_compressed_checkpoints_load_and_sort(self):
+        for i in range(15):
+            self.write("task-a", NOW - timedelta(hours=i))
+        apply_retention(self.dir, now=NOW)
+        checkpoints = list_checkpoints(self.dir)
+        self.assertTrue(checkpoints[0].name.endswith(".gz"))
+        self.assertEqual(read_checkpoint(checkpoints[0])["task_id"], "task-a")
+        self.assertEqual(read_checkpoint(checkpoints[-1])["ts"], NOW.isoformat())
+
+    def test_task_filter_and_dry_run(self):
+        for i in range(30):
+            self.write("task-a", NOW - timedelta(minutes=i))
+            self.write("task-b", NOW - timedelta(minutes=i))
+        summary = apply_retention(self.dir, task_id="task-a", now=NOW, dry_run=True)
+        self.assertGreater(summary["deleted"] + summary["compressed"], 0)
+        self.assertEqual(len(list(self.dir.glob("*.json"))), 60)
+        apply_retention(self.dir, task_id="task-a", now=NOW)
+        self.assertEqual(len(list_checkpoints(self.dir, "task-b")), 30)
+
+    def test_blobs_of_deleted_checkpoints_are_swept(self):
+        store = BlobStore(self.dir / "blobs")
+        digests = [store.put(f"worker output {i}\n" * 200) for i in range(63)]
+        for i, digest in enumerate(digests[:60]):
+            self.write("task-a", NOW - timedelta(hours=1, minutes=i), history=[{"result_ref": digest}])
+        current_state = self.dir / "current-state.json"
+        current_state.write_text(json.dumps({"history": [{"result_ref": digests[60]}]}))
+        for digest in digests[:62]:
+            os.utime(store._path(digest), (0, 0))  # Past the grace period
+        # digests[61] is referenced nowhere; digests[62] is new and its run has not checkpointed yet
+
+        summary = apply_retention(self.dir, now=NOW)
+        sweep = sweep_blobs(self.dir, self.dir / "blobs", [current_state])
+
+        kept = {read_checkpoint(p)["history"][0]["result_ref"] for p in list_checkpoints(self.dir)}
+        remaining = {d for d in digests if store.exists(d)}
+        self.assertEqual(remaining, kept | {digests[60], digests[62]})
+        self.assertEqual(sweep["blobs_deleted"], summary["deleted"] + 1)
+        self.assertEqual(store.get(digests[60]), "worker output 60\n" * 200)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,82 @@
+import json
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+from compound_watermark import batch_sections, collect, commit, split_sections
+
+
+class TestCompoundWatermark(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.memory = Path(self.tmp.name) / "memory"
+        self.watermark = self.memory / "learnings" / "compound-watermark.json"
+        self.out = Path(self.tmp.name) / "batches"
+        self.write("2026-10-18.md", "# Session\n\n## Turn 1\nscout found the bug\n\n## Turn 2\nfixed it\n")
+        self.write("learnings/compound-2026-10-18.md", "### Lesson: already distilled\n")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, rel, text):
+        path = self.memory / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(text)
+        # Distinct mtimes even on coarse-grained filesystems
+        stamp = path.stat().st_mtime + len(text)
+        os.utime(path, (stamp, stamp))
+
+    def collect(self, batch_tokens=6000):
+        return collect(7, self.out, batch_tokens, self.memory, self.watermark)
+
+    def commit_all(self):
+        manifest = json.loads((self.out / "pending.json").read_text())
+        for batch in list(manifest["batches"]):
+            commit(self.out, batch, self.watermark)
+
+    def batch_text(self):
+        return "".join(p.read_text() for p in sorted(self.out.glob("batch-*.md")))
+
+    def test_split_sections(self):
+        sections = split_sections("intro\n# A\nalpha\n## B\nbeta\n#### not a split\n")
+        self.assertEqual(len(sections), 3)
+        self.assertTrue(sections[2].startswith("## B") and "#### not a split" in sections[2])
+
+    def test_first_run_collects_everything_but_learnings(self):
+        self.assertEqual(self.collect(), 1)
+        text = self.batch_text()
+        self.assertIn("### File: 2026-10-18.md", text)
+        self.assertIn("fixed it", text)
+        self.assertNotIn("already distilled", text)
+
+    def test_only_new_turns_after_commit(self):
+        self.collect()
+        self.commit_all()
+        self.assertEqual(self.collect(), 0)
+
+        self.write("2026-10-18.md", "# Session\n\n## Turn 1\nscout found the bug\n\n## Turn 2\nfixed it\n"
+                                    "\n## Turn 3\ninspector passed\n")
+        self.assertEqual(self.collect(), 1)
+        text = self.batch_text()
+        self.assertIn("inspector passed", text)
+        self.assertNotIn("scout found the bug", text)
+
+    def test_uncommitted_batch_is_retried(self):
+        self.write("2026-10-19.md", "## Turn 1\n" + "x" * 400 + "\n")
+        self.assertEqual(self.collect(batch_tokens=100), 2)
+        commit(self.out, "batch-001", self.watermark)
+
+        self.assertEqual(self.collect(batch_tokens=100), 1)
+        self.assertIn("x" * 50, self.batch_text())
+
+    def test_batches_respect_token_budget(self):
+        sections = [("a.md", str(i), "y" * 150) for i in range(5)]
+        batches = batch_sections(sections, batch_tokens=100)
+        self.assertEqual([len(b) for b in batches], [2, 2, 1])
+        oversized = batch_sections([("a.md", "0", "z" * 1000)], batch_tokens=100)
+        self.assertLess(len(oversized[0][0][2]), 450)
+
+
+if __name__ == "__main__":
+    unittest.main()
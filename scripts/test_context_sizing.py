@@ -0,0 +1,41 @@
+import unittest
+
+import context_sizing
+from context_sizing import choose_num_ctx
+
+LADDER = [4096, 8192, 16384, 32768]
+
+
+class TestContextSizing(unittest.TestCase):
+    def setUp(self):
+        context_sizing._last_bucket = None
+
+    def test_short_prompt_gets_smallest_bucket(self):
+        sizing = choose_num_ctx("scout", "You are Scout.", "Where is X?", LADDER, sticky=False)
+        self.assertEqual(sizing["num_ctx"], 4096)
+
+    def test_large_prompt_gets_larger_bucket(self):
+        prompt = "x" * 30000  # ~10k tokens
+        sizing = choose_num_ctx("builder", "", prompt, LADDER, sticky=False)
+        self.assertEqual(sizing["num_ctx"], 16384)
+        self.assertGreater(sizing["num_ctx"], sizing["required_tokens"])
+
+    def test_overflow_uses_largest_bucket(self):
+        sizing = choose_num_ctx("builder", "", "x" * 200000, LADDER, sticky=False)
+        self.assertEqual(sizing["num_ctx"], 32768)
+        self.assertTrue(sizing["overflow"])
+
+    def test_sticky_reuses_adjacent_bucket(self):
+        choose_num_ctx("builder", "", "x" * 6000, LADDER, sticky=True)  # 8192
+        sizing = choose_num_ctx("scout", "", "short", LADDER, sticky=True)
+        self.assertEqual(sizing["num_ctx"], 8192)
+        self.assertTrue(sizing["reused_bucket"])
+
+    def test_sticky_shrinks_from_distant_bucket(self):
+        choose_num_ctx("builder", "", "x" * 60000, LADDER, sticky=True)  # 32768
+        sizing = choose_num_ctx("scout", "", "short", LADDER, sticky=True)
+        self.assertEqual(sizing["num_ctx"], 4096)
+
+
+if __name__ == '__main__':
+    unittest.main()
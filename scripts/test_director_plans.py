@@ -0,0 +1,156 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import orchestrator
+
+
+class FakeDirector:
+    """Returns scripted decisions and records the state it was shown."""
+
+    def __init__(self, decisions):
+        self.decisions = list(decisions)
+        self.calls = []
+
+    def __call__(self, state):
+        self.calls.append({"turn": state["turn"], "last_plan": state.get("last_plan")})
+        state["director_calls"] = state.get("director_calls", 0) + 1
+        state["director_ms"] = state.get("director_ms", 0) + 1000
+        return self.decisions.pop(0)
+
+
+class TestDirectorPlans(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        home = Path(self.tmp.name)
+        memory = home / "memory"
+        self.logs = memory / "logs"
+        self.task_file = home / "task.md"
+        self.task_file.write_text("# Task\nFix the priority bug.\n")
+        patcher = mock.patch.multiple(
+            orchestrator, CLAWD_HOME=home, MEMORY_DIR=memory, CHECKPOINT_DIR=memory / "checkpoints",
+            ALERTS_DIR=memory / "alerts", LOGS_DIR=self.logs, BLOBS_DIR=memory / "blobs",
+            SCRIPTS_DIR=home / "scripts", CONFIG_FILE=home / "config" / "repositories.json",
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(self.tmp.cleanup)
+        self.worker_calls = []
+
+    def run_task(self, director, worker_results):
+        results = list(worker_results)
+
+        def fake_worker(agent, prompt, project=None):
+            self.worker_calls.append((agent, prompt))
+            return results.pop(0)
+
+        with mock.patch.object(orchestrator, "call_director", director), \
+                mock.patch.object(orchestrator, "call_worker", fake_worker):
+            return orchestrator.run_orchestrator(task_file=str(self.task_file))
+
+    def session(self, state):
+        return json.loads((self.logs / f"session-{state['task_id']}.json").read_text())
+
+    def test_plan_runs_without_director_round_trips(self):
+        director = FakeDirector([
+            {"action": "plan", "steps": [
+                {"agent": "scout", "prompt": "Find the bug"},
+                {"agent": "builder", "prompt": "Fix it", "with_previous_output": True},
+                {"agent": "inspector", "prompt": "Run tests", "stop_if_output": "FAIL"},
+            ]},
+            {"action": "complete"},
+        ])
+        ok = {"success": True, "error": None}
+        state = self.run_task(director, [{**ok, "output": "bug in priority.py:45"},
+                                         {**ok, "output": "fixed"}, {**ok, "output": "all PASS"}])
+
+        self.assertEqual(state["status"], "complete")
+        self.assertEqual([a for a, _ in self.worker_calls], ["scout", "builder", "inspector"])
+        self.assertIn("bug in priority.py:45", self.worker_calls[1][1])
+        self.assertEqual(len(director.calls), 2)
+        self.assertEqual(director.calls[1]["last_plan"]["outcome"], "completed")
+
+        metrics = self.session(state)["metrics"]
+        self.assertEqual(metrics["director_calls"], 2)
+        self.assertEqual(metrics["director_calls_saved"], 2)
+        self.assertEqual(metrics["director_ms_saved_est"], 2000)
+        self.assertEqual((metrics["plans"], metrics["plan_breaches"]), (1, 0))
+
+    def test_stop_condition_returns_control_to_director(self):
+        director = FakeDirector([
+            {"action": "plan", "steps": [
+                {"agent": "inspector", "prompt": "Run tests", "stop_if_output": "FAIL"},
+                {"agent": "scribe", "prompt": "Write it up"},
+            ]},
+            {"action": "halt", "reason": "tests failing"},
+        ])
+        state = self.run_task(director, [{"success": True, "error": None, "output": "test_x FAIL"}])
+
+        self.assertEqual([a for a, _ in self.worker_calls], ["inspector"])
+        self.assertEqual(director.calls[1]["last_plan"]["outcome"], "stopped")
+        self.assertIsNone(state["plan"])
+        self.assertEqual(self.session(state)["metrics"]["plan_breaches"], 1)
+
+    def test_worker_failure_breaches_unless_continue(self):
+        director = FakeDirector([
+            {"action": "plan", "steps": [
+                {"agent": "refactorer", "prompt": "Tidy", "on_failure": "continue"},
+                {"agent": "inspector", "prompt": "Run tests"},
+                {"agent": "scribe", "prompt": "Write it up"},
+            ]},
+            {"action": "halt"},
+        ])
+        failed = {"success": False, "error": "Timeout", "output": ""}
+        state = self.run_task(director, [failed, failed])
+
+        self.assertEqual([a for a, _ in self.worker_calls], ["refactorer", "inspector"])
+        self.assertIn("inspector failed", director.calls[1]["last_plan"]["reason"])
+        self.assertEqual(state["director_calls_saved"], 1)
+
+    def test_invalid_plan_is_rejected(self):
+        director = FakeDirector([
+            {"action": "plan", "steps": [{"agent": "wizard", "prompt": "Magic"}]},
+            {"action": "halt"},
+        ])
+        self.run_task(director, [])
+
+        self.assertEqual(self.worker_calls, [])
+        self.assertEqual(director.calls[1]["last_plan"]["outcome"], "rejected")
+        self.assertIn("unknown agent", director.calls[1]["last_plan"]["reason"])
+
+    def test_malformed_steps_are_rejected(self):
+        for steps, problem in [(["scout", "builder"], "step 1: expected an object"),
+                               ({"agent": "scout", "prompt": "Look"}, "steps must be a list, not dict"),
+                               ([{"agent": ["scout"], "prompt": "Look"}], "unknown agent")]:
+            with self.subTest(steps=steps):
+                director = FakeDirector([{"action": "plan", "steps": steps}, {"action": "halt"}])
+                self.run_task(director, [])
+                self.assertEqual(director.calls[1]["last_plan"]["outcome"], "rejected")
+                self.assertIn(problem, director.calls[1]["last_plan"]["reason"])
+        self.assertEqual(self.worker_calls, [])
+
+    def test_last_plan_is_shown_once(self):
+        decisions = [{"action": "plan", "steps": [{"agent": "scout", "prompt": "Find the bug"}]},
+                     None,  # The remote tier fails; the local fallback must still see the plan outcome
+                     {"action": "spawn_agent", "agent": "builder", "prompt": "Fix it"},
+                     {"action": "complete"}]
+        prompts = []
+
+        def fake_tier(state, tier, system_prompt, user_message, reason):
+            prompts.append((state["turn"], user_message))
+            return decisions.pop(0)
+
+        ok = {"success": True, "error": None, "output": "done"}
+        with mock.patch.object(orchestrator, "ask_director_tier", fake_tier), \
+                mock.patch.object(orchestrator, "DIRECTOR_LOCAL_MODEL", "local"), \
+                mock.patch.object(orchestrator, "is_routine_turn", lambda state: False):
+            self.run_task(orchestrator.call_director, [ok, ok])
+
+        shown = [(turn, "## Last Plan" in prompt) for turn, prompt in prompts]
+        self.assertEqual(shown, [(1, False), (2, True), (2, True), (3, False)])
+
+
+if __name__ == "__main__":
+    unittest.main()
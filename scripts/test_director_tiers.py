@@ -0,0 +1,125 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import orchestrator
+
+
+def decision(action, **fields):
+    return "```json\n" + json.dumps({"action": action, **fields}) + "\n```"
+
+
+class FakeTier:
+    """Scripted Director tier: returns responses in order, raising exceptions it is given."""
+
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.calls = []
+
+    def __call__(self, system_prompt, user_message, **kwargs):
+        self.calls.append(kwargs)
+        response = self.responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+
+class TestDirectorTiers(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        home = Path(self.tmp.name)
+        self.logs = home / "memory" / "logs"
+        patcher = mock.patch.multiple(
+            orchestrator, CLAWD_HOME=home, LOGS_DIR=self.logs, AGENTS_DIR=home / "agents",
+            DIRECTOR_LOCAL_MODEL="qwen-director", DIRECTOR_LOCAL_ROUTINE=True, _remote_down_until=0.0,
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(self.tmp.cleanup)
+        self.state = orchestrator.init_state("Fix the priority bug")
+
+    def run_director(self, remote, local, turn=1):
+        self.state["turn"] = turn
+        with mock.patch.object(orchestrator, "call_claude_api", remote), \
+                mock.patch.object(orchestrator, "call_local_director", local), \
+                mock.patch.object(orchestrator, "relevant_lessons", lambda state: []):
+            return orchestrator.call_director(self.state)
+
+    def after_builder_success(self):
+        self.state["history"].append({"turn": 1, "agent": "builder", "success": True, "result": "done"})
+
+    def test_routine_turn_is_decided_locally(self):
+        self.after_builder_success()
+        remote, local = FakeTier(), FakeTier(decision("spawn_agent", agent="inspector", prompt="Run tests"))
+        result = self.run_director(remote, local, turn=2)
+
+        self.assertEqual((result["action"], result["tier"]), ("spawn_agent", "local"))
+        self.assertEqual(remote.calls, [])
+        self.assertEqual(list(self.state["director_latency"]), ["local"])
+
+    def test_local_tier_defers_task_endings_to_remote(self):
+        self.after_builder_success()
+        remote, local = FakeTier(decision("complete")), FakeTier(decision("complete"))
+        result = self.run_director(remote, local, turn=2)
+        self.assertEqual((result["action"], result["tier"]), ("complete", "remote"))
+
+    def test_local_tier_never_plans_or_writes_on_routine_turns(self):
+        self.after_builder_success()
+        for choice in [decision("plan", steps=[{"agent": "builder", "prompt": "Fix"}]),
+                       decision("spawn_agent", agent="builder", prompt="Fix more")]:
+            with self.subTest(choice=choice):
+                remote = FakeTier(decision("spawn_agent", agent="inspector", prompt="Run tests"))
+                result = self.run_director(remote, FakeTier(choice), turn=2)
+                self.assertEqual((result["agent"], result["tier"]), ("inspector", "remote"))
+
+    def test_local_tier_is_off_by_default(self):
+        env = {k: v for k, v in os.environ.items() if k != "DIRECTOR_LOCAL_MODEL"}
+        probe = "import orchestrator; print(repr(orchestrator.DIRECTOR_LOCAL_MODEL))"
+        result = subprocess.run([sys.executable, "-c", probe], cwd=Path(orchestrator.__file__).parent,
+                                env=env, capture_output=True, text=True, timeout=60)
+        self.assertEqual(result.stdout.strip(), "''")
+        with mock.patch.object(orchestrator, "DIRECTOR_LOCAL_MODEL", ""):
+            remote = FakeTier(decision("spawn_agent", agent="scout", prompt="Look"))
+            self.run_director(remote, FakeTier())
+        self.assertEqual(remote.calls, [{"timeout": orchestrator.DIRECTOR_TIMEOUT}])
+
+    def test_non_routine_turn_uses_remote_with_short_timeout(self):
+        remote, local = FakeTier(decision("spawn_agent", agent="scout", prompt="Look")), FakeTier()
+        result = self.run_director(remote, local)
+        self.assertEqual(result["tier"], "remote")
+        self.assertEqual(remote.calls, [{"timeout": orchestrator.DIRECTOR_SLOW_SECONDS}])
+        self.assertEqual(local.calls, [])
+
+    def test_outage_falls_back_locally_then_leads_with_local(self):
+        remote = FakeTier(TimeoutError("timed out"))
+        local = FakeTier(decision("spawn_agent", agent="scout", prompt="Look"),
+                         decision("spawn_agent", agent="architect", prompt="Design"))
+        self.assertEqual(self.run_director(remote, local)["tier"], "local")
+
+        # Within the cooldown the remote is not tried first
+        result = self.run_director(remote, local, turn=2)
+        self.assertEqual((result["agent"], result["tier"]), ("architect", "local"))
+        self.assertEqual(len(remote.calls), 1)
+
+        events = [json.loads(line) for path in self.logs.glob("events-*.jsonl") for line in path.open()]
+        reasons = [e["reason"] for e in events if e["event"] == "director_response"]
+        self.assertEqual(reasons, ["remote_failed", "remote_down"])
+
+        summary = orchestrator.save_session_summary(self.state)
+        self.assertEqual(summary["metrics"]["director_tiers"]["local"]["calls"], 2)
+
+    def test_halts_when_every_tier_fails(self):
+        with mock.patch.object(orchestrator, "DIRECTOR_LOCAL_MODEL", ""):
+            remote = FakeTier(ConnectionError("refused"))
+            result = self.run_director(remote, FakeTier())
+        self.assertEqual((result["action"], result["reason"]), ("halt", "director_error"))
+        self.assertEqual(remote.calls, [{"timeout": orchestrator.DIRECTOR_TIMEOUT}])
+
+
+if __name__ == "__main__":
+    unittest.main()
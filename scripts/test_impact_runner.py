@@ -0,0 +1,77 @@
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+from impact_runner import DependencyMap, run_impact, select_affected, shard
+
+
+class TestImpactRunner(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        self.write("pkg/__init__.py", "")
+        self.write("pkg/math_utils.py", "def add(a, b):\n    return a + b\n")
+        self.write("pkg/strings.py", "from .math_utils import add\n\ndef shout(s):\n    return s.upper()\n")
+        self.write("pkg/other.py", "VALUE = 1\n")
+        self.write("tests/test_math.py",
+                   "from pkg.math_utils import add\n\ndef test_add():\n    assert add(1, 2) == 3\n")
+        self.write("tests/test_strings.py",
+                   "from pkg import strings\n\ndef test_shout():\n    assert strings.shout('a') == 'A'\n")
+        self.write("tests/test_other.py",
+                   "from pkg.other import VALUE\n\ndef test_value():\n    assert VALUE == 1\n")
+        self.cache = self.root / "cache.json"
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, rel, text):
+        path = self.root / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(text)
+
+    def run_impact(self, changed, **kwargs):
+        return run_impact(self.root, "python -m pytest tests/", changed,
+                          cache_file=self.cache, python=sys.executable, **kwargs)
+
+    def test_transitive_dependencies(self):
+        dep_map = DependencyMap(self.root)
+        deps = dep_map.test_deps(Path("tests/test_strings.py"))
+        self.assertIn(Path("pkg/strings.py"), deps)
+        self.assertIn(Path("pkg/math_utils.py"), deps)
+        self.assertNotIn(Path("pkg/other.py"), deps)
+
+    def test_selects_only_affected(self):
+        dep_map = DependencyMap(self.root)
+        tests = [Path("tests/test_math.py"), Path("tests/test_strings.py"), Path("tests/test_other.py")]
+        affected = select_affected(tests, ["pkg/math_utils.py"], dep_map)
+        self.assertEqual(affected, tests[:2])
+        self.assertEqual(select_affected(tests, ["pyproject.toml"], dep_map), tests)
+
+    def test_run_and_cache(self):
+        summary = self.run_impact(["pkg/other.py"], full=True)
+        self.assertEqual((summary["affected"], summary["ran"], summary["passed"]), (1, 3, 3))
+        self.assertEqual(summary["status"], "pass")
+
+        summary = self.run_impact([], full=True)
+        self.assertEqual((summary["ran"], summary["cached"]), (0, 3))
+
+        self.write("pkg/math_utils.py", "def add(a, b):\n    return a - b\n")
+        summary = self.run_impact(["pkg/math_utils.py"], full=True)
+        self.assertEqual(summary["status"], "fail")
+        self.assertEqual(summary["stopped_after"], "affected")
+        self.assertEqual(summary["failures"][0]["test"], "tests/test_math.py::test_add")
+
+    def test_sharded_full_run(self):
+        summary = self.run_impact([], full=True, shards=3)
+        self.assertEqual((summary["ran"], summary["passed"]), (3, 3))
+
+    def test_shard_balances_by_duration(self):
+        tests = [Path(f"t{i}.py") for i in range(4)]
+        groups = shard(tests, 2, {"t0.py": 10.0, "t1.py": 1.0, "t2.py": 1.0, "t3.py": 1.0})
+        self.assertEqual(groups[0], [Path("t0.py")])
+        self.assertEqual(len(groups[1]), 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,88 @@
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+from memory_search import MemoryIndex, chunk_markdown, format_lessons
+
+
+class TestMemorySearch(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.base = Path(self.tmp.name)
+        self.memory = self.base / "memory"
+        self.write("memory/learnings/ollama.md",
+                   "# Ollama\n\n## Timeouts\nOllama worker timeouts happen when num_ctx is too large; "
+                   "retry with a smaller context.\n\n## Models\nqwen3 loads in 20 seconds.\n")
+        self.write("memory/decisions-log.md",
+                   "# Decisions\n\n## Sentry\nAuto-fix only ImportError and KeyError from Sentry webhooks.\n")
+        self.write("memory/checkpoints/notes.md", "# Ollama timeouts everywhere\n")
+        self.index_file = self.base / "memory" / "index" / "memory-search.json"
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, rel, text):
+        path = self.base / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(text)
+
+    def index(self):
+        return MemoryIndex([self.memory], self.index_file, self.base)
+
+    def test_chunks_by_heading(self):
+        chunks = chunk_markdown("intro text\n## A\nalpha\n## B\nbeta\n")
+        self.assertEqual([h for h, _ in chunks], ["", "A", "B"])
+
+    def test_ranks_relevant_chunk_first(self):
+        index = self.index()
+        self.assertEqual(index.update(), 2)
+        results = index.search("worker timeouts from ollama", k=2)
+        self.assertEqual((results[0]["file"], results[0]["heading"]),
+                         ("memory/learnings/ollama.md", "Timeouts"))
+        self.assertEqual(index.search("sentry keyerror")[0]["file"], "memory/decisions-log.md")
+
+    def test_exclude_and_skip_dirs(self):
+        index = self.index()
+        index.update()
+        results = index.search("ollama timeouts", exclude={"memory/learnings/ollama.md"})
+        self.assertEqual(results, [])
+
+    def test_task_queue_is_not_indexed(self):
+        self.write("memory/tasks/queue/20260101-000000-fix-keyerror.md",
+                   "# Fix KeyError\n\n## Stacktrace\nKeyError 'amount' in copytrader orders.\n")
+        self.write("memory/tasks/done/20251231-000000-fix-import.failed.md", "# Fix ImportError in copytrader\n")
+        index = self.index()
+        index.update()
+        files = {r["file"] for r in index.search("copytrader keyerror importerror amount", k=10)}
+        self.assertEqual(files, {"memory/decisions-log.md"})
+
+    def test_alerts_are_not_indexed(self):
+        self.write("memory/alerts/OLLAMA-20261019-031500-gpu-box.md",
+                   "# ESCALATION: Ollama worker timeouts\n\nRestarted ollama on gpu-box after canary timeouts.\n")
+        index = self.index()
+        index.update()
+        files = {r["file"] for r in index.search("ollama worker timeouts restarted canary", k=10)}
+        self.assertEqual(files, {"memory/learnings/ollama.md"})
+
+    def test_persisted_incremental_update(self):
+        index = self.index()
+        index.update()
+        index.save()
+        reloaded = self.index()
+        self.assertEqual(reloaded.update(), 0)
+        time.sleep(0.01)
+        self.write("memory/decisions-log.md", "# Decisions\n\n## Budget\nCategorize transfers separately.\n")
+        self.assertEqual(reloaded.update(), 1)
+        self.assertEqual(reloaded.search("sentry"), [])
+        self.assertEqual(reloaded.search("transfers")[0]["heading"], "Budget")
+
+    def test_format_respects_budget(self):
+        results = [{"file": "memory/a.md", "heading": "H", "text": "x" * 5000, "score": 1.0}] * 3
+        lines = format_lessons(results, max_tokens=300)
+        self.assertLessEqual(sum(len(line) for line in lines), 300 * 4 + 50)
+        self.assertTrue(lines[1].endswith("[truncated]"))
+
+
+if __name__ == '__main__':
+    unittest.main()
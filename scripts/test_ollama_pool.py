@@ -0,0 +1,153 @@
+import json
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import ollama_pool
+from ollama_pool import OllamaPool
+
+
+def start_fake_ollama(models):
+    """Stand-in Ollama serving /api/ps with the given loaded models."""
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            body = json.dumps({"models": [{"name": m} for m in models]}).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestOllamaPool(unittest.TestCase):
+    def setUp(self):
+        self.servers = []
+
+    def tearDown(self):
+        for server in self.servers:
+            server.shutdown()
+            server.server_close()
+
+    def fake(self, models):
+        server, url = start_fake_ollama(models)
+        self.servers.append(server)
+        return url
+
+    def test_least_outstanding(self):
+        urls = [self.fake(["qwen3:14b"]) for _ in range(3)]
+        pool = OllamaPool(urls)
+        leased = [pool.acquire("qwen3:14b") for _ in range(6)]
+        counts = {h.url: h.outstanding for h in pool.hosts}
+        self.assertEqual(sorted(counts.values()), [2, 2, 2])
+        for host in leased:
+            pool.release(host, True, 100)
+        self.assertTrue(all(h.outstanding == 0 for h in pool.hosts))
+
+    def test_model_affinity(self):
+        cold = self.fake(["llama3:8b"])
+        warm = self.fake(["qwen3:14b"])
+        pool = OllamaPool([cold, warm])
+        self.assertEqual(pool.acquire("qwen3:14b").url, warm)
+        # Warm host is preferred until its queue outweighs a cold load
+        self.assertEqual(pool.acquire("qwen3:14b").url, warm)
+        self.assertEqual(pool.acquire("qwen3:14b").url, cold)
+
+    def test_untagged_model_matches_latest(self):
+        url = self.fake(["qwen-coder-16k:latest"])
+        pool = OllamaPool([self.fake([]), url])
+        self.assertEqual(pool.acquire("qwen-coder-16k").url, url)
+
+    def test_unreachable_host_is_ejected(self):
+        good = self.fake(["qwen3:14b"])
+        dead_server, dead = start_fake_ollama([])
+        # Stop the serving thread too, or it keeps polling a descriptor number
+        # that a later test's pipe may reuse
+        dead_server.shutdown()
+        dead_server.server_close()
+        clock = FakeClock()
+        pool = OllamaPool([dead, good], clock=clock)
+        dead_host = pool.hosts[0]
+        for _ in range(ollama_pool.EJECT_AFTER):
+            pool.refresh(force=True)
+        self.assertTrue(dead_host.is_ejected(clock()))
+        for _ in range(4):
+            self.assertEqual(pool.acquire("other:7b").url, good)
+        clock.now += ollama_pool.EJECT_SECONDS + 1
+        self.assertFalse(dead_host.is_ejected(clock()))
+
+    def test_failed_calls_eject_then_success_restores(self):
+        clock = FakeClock()
+        pool = OllamaPool(["http://a", "http://b"], clock=clock)
+        pool._last_probe = clock()  # skip probing unreachable test hosts
+        host_a = pool.hosts[0]
+        for _ in range(ollama_pool.EJECT_AFTER):
+            pool.release(host_a, False, 0)
+        self.assertEqual(pool.acquire("m").url, "http://b")
+        pool.release(host_a, True, 50)
+        self.assertFalse(host_a.is_ejected(clock()))
+
+    def test_exclude_picks_another_healthy_host(self):
+        clock = FakeClock()
+        pool = OllamaPool(["http://a", "http://b"], clock=clock)
+        pool._last_probe = clock()
+        primary = pool.acquire("m")
+        hedge = pool.acquire("m", exclude=primary)
+        self.assertIsNot(hedge, primary)
+        pool.cancel(hedge)
+        self.assertEqual((hedge.outstanding, hedge.calls, hedge.failures), (0, 0, 0))
+
+        for _ in range(ollama_pool.EJECT_AFTER):
+            pool.release(hedge, False, 0)
+        self.assertIsNone(pool.acquire("m", exclude=primary))
+
+    def test_watchdog_degraded_host_is_avoided(self):
+        slow, fast = self.fake(["qwen3:14b"]), self.fake([])
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        status_file = Path(tmp.name) / "watchdog-status.json"
+        status = {"updated_at": time.time(), "hosts": {slow: {"status": "degraded"}, fast: {"status": "healthy"}}}
+        status_file.write_text(json.dumps(status))
+
+        pool = OllamaPool([slow, fast], watchdog_status_file=status_file)
+        # Preferred over the warm host even with a queue, but never a hedge target
+        for _ in range(3):
+            self.assertEqual(pool.acquire("qwen3:14b").url, fast)
+        self.assertIsNone(pool.acquire("qwen3:14b", exclude=pool.hosts[1]))
+        self.assertTrue(pool.stats()[0]["watchdog_unhealthy"])
+
+        # A stale status (watchdog not running) is ignored
+        status["updated_at"] -= ollama_pool.WATCHDOG_STALE_SECONDS + 1
+        status_file.write_text(json.dumps(status))
+        pool.refresh(force=True)
+        self.assertEqual(pool.acquire("qwen3:14b").url, slow)
+
+    def test_stats_report_latency(self):
+        pool = OllamaPool(["http://a"])
+        host = pool.acquire("m")
+        pool.release(host, True, 120)
+        stats = pool.stats()[0]
+        self.assertEqual(stats["calls"], 1)
+        self.assertEqual(stats["p50_ms"], 120)
+        self.assertFalse(stats["ejected"])
+
+
+if __name__ == '__main__':
+    unittest.main()
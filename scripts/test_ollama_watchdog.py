@@ -0,0 +1,206 @@
+import json
+import subprocess
+import tempfile
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from unittest import mock
+
+import ollama_pool
+import ollama_watchdog
+from ollama_watchdog import Watchdog
+
+
+def start_fake_generate(chunks):
+    """Stand-in Ollama streaming the given /api/generate chunks as JSON lines."""
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            self.rfile.read(int(self.headers["Content-Length"]))
+            self.send_response(200)
+            self.send_header("Content-Type", "application/x-ndjson")
+            self.end_headers()
+            for chunk in chunks:
+                self.wfile.write((json.dumps(chunk) + "\n").encode())
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def canary(tps, ttft_ms=200):
+    return {"tokens": 32, "tokens_per_sec": tps, "ttft_ms": ttft_ms, "load_ms": 0, "total_ms": 1000}
+
+
+class ScriptedHosts:
+    """Canary, reload and restart stand-ins; results are queued per call."""
+
+    def __init__(self, *results):
+        self.results = list(results)
+        self.reloads, self.restarts = [], []
+
+    def canary(self, url, model):
+        result = self.results.pop(0)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    def reload(self, url, model):
+        self.reloads.append(url)
+
+    def restart(self, url):
+        self.restarts.append(url)
+        return True
+
+
+class TestOllamaWatchdog(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        home = Path(self.tmp.name)
+        self.status_file = home / "memory" / "logs" / "watchdog-status.json"
+        patcher = mock.patch.multiple(
+            ollama_watchdog, LOGS_DIR=home / "memory" / "logs", ALERTS_DIR=home / "memory" / "alerts",
+            LOG_FILE=home / "memory" / "logs" / "watchdog.log", OLLAMA_RESTART_COMMAND="",
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(self.tmp.cleanup)
+        self.alerts = home / "memory" / "alerts"
+        self.in_flight = {}
+
+    def watchdog(self, hosts, urls=("http://localhost:11434",)):
+        return Watchdog(list(urls), model="qwen", status_file=self.status_file,
+                        canary=hosts.canary, reload=hosts.reload, restart=hosts.restart,
+                        outstanding=lambda: self.in_flight)
+
+    def test_baseline_builds_then_healthy(self):
+        hosts = ScriptedHosts(*[canary(40)] * 5)
+        watchdog = self.watchdog(hosts)
+        statuses = [watchdog.run_once()["status"] for _ in range(5)]
+        self.assertEqual(statuses, ["warming"] * 4 + ["healthy"])
+
+        status = json.loads(self.status_file.read_text())
+        host = status["hosts"]["http://localhost:11434"]
+        self.assertEqual(host["baseline"], {"tokens_per_sec": 40, "ttft_ms": 200, "samples": 5})
+        self.assertEqual(status["failure_count"], 0)
+
+    def test_sustained_slowdown_reloads_then_restarts(self):
+        slow = canary(12)
+        hosts = ScriptedHosts(*[canary(40)] * 5, slow, slow, slow, slow, slow, slow)
+        watchdog = self.watchdog(hosts)
+        for _ in range(5):
+            watchdog.run_once()
+
+        statuses = [watchdog.run_once()["status"] for _ in range(3)]
+        self.assertEqual(statuses, ["slow", "slow", "degraded"])
+        self.assertEqual(hosts.reloads, ["http://localhost:11434"])
+        self.assertEqual(hosts.restarts, [])
+
+        # The reload did not help: three more slow canaries restart Ollama
+        for _ in range(3):
+            status = watchdog.run_once()
+        self.assertEqual(hosts.restarts, ["http://localhost:11434"])
+        self.assertEqual((status["status"], status["restart_count"]), ("recovering", 1))
+        self.assertEqual(len(list(self.alerts.glob("OLLAMA-*.md"))), 1)
+
+        # Slow samples never entered the baseline
+        self.assertEqual(status["hosts"]["http://localhost:11434"]["baseline"]["tokens_per_sec"], 40)
+
+    def test_one_slow_canary_recovers_without_action(self):
+        hosts = ScriptedHosts(*[canary(40)] * 5, canary(40, ttft_ms=5000), canary(41))
+        watchdog = self.watchdog(hosts)
+        for _ in range(5):
+            watchdog.run_once()
+        self.assertEqual(watchdog.run_once()["status"], "slow")
+        self.assertEqual(watchdog.run_once()["status"], "healthy")
+        self.assertEqual((hosts.reloads, hosts.restarts), ([], []))
+
+    def test_hard_failures_restart_local_but_only_alert_remote(self):
+        failures = [ConnectionError("refused")] * ollama_watchdog.MAX_FAILURES * 2
+        hosts = ScriptedHosts(*failures)
+        watchdog = self.watchdog(hosts, urls=["http://localhost:11434", "http://gpu-box:11434"])
+        for _ in range(ollama_watchdog.MAX_FAILURES):
+            status = watchdog.run_once()
+        self.assertEqual(hosts.restarts, ["http://localhost:11434"])
+        self.assertEqual(status["hosts"]["http://gpu-box:11434"]["status"], "down")
+        self.assertEqual(len(list(self.alerts.glob("OLLAMA-*.md"))), 2)
+
+        # The pool steers work away from the down host
+        with mock.patch.object(ollama_pool, "WATCHDOG_STALE_SECONDS", 60):
+            self.assertEqual(ollama_pool.watchdog_unhealthy(self.status_file), {"http://gpu-box:11434"})
+
+    def test_busy_host_is_never_judged_or_restarted(self):
+        slow = canary(12)
+        hosts = ScriptedHosts(*[canary(40)] * 5, slow, slow, slow, ConnectionError("timed out"))
+        watchdog = self.watchdog(hosts)
+        for _ in range(5):
+            watchdog.run_once()
+
+        # A worker call is in flight: no canary runs at all
+        self.in_flight = {"http://localhost:11434": 1}
+        self.assertEqual(watchdog.run_once()["status"], "healthy")
+        self.assertEqual(len(hosts.results), 4)
+
+        # Slow twice while idle; the third canary overlapped a call that started meanwhile
+        self.in_flight = {}
+        watchdog.run_once(), watchdog.run_once()
+
+        def overlapped(url, model):
+            self.in_flight = {url: 1}
+            return hosts.canary(url, model)
+
+        watchdog._canary = overlapped
+        self.assertEqual(watchdog.run_once()["status"], "slow")
+        self.in_flight = {}
+        self.assertEqual(watchdog.run_once()["status"], "slow")  # The failure was discounted too
+        self.assertEqual((hosts.reloads, hosts.restarts), ([], []))
+        self.assertEqual(hosts.results, [])
+
+    def test_pool_publishes_calls_in_flight(self):
+        inflight_dir = Path(self.tmp.name) / "inflight"
+        pool = ollama_pool.OllamaPool(["http://localhost:11434"], inflight_dir=inflight_dir)
+        host = pool.acquire("qwen")
+        self.assertEqual(ollama_pool.outstanding_calls(inflight_dir), {"http://localhost:11434": 1})
+        pool.release(host, True, 100)
+        self.assertEqual(ollama_pool.outstanding_calls(inflight_dir), {})
+        self.assertEqual(list(inflight_dir.iterdir()), [])
+
+        # A process that died mid-call holds nothing
+        dead = subprocess.Popen(["true"])
+        dead.wait()
+        (inflight_dir / f"{dead.pid}.json").write_text(json.dumps({"hosts": {"http://localhost:11434": 2}}))
+        self.assertEqual(ollama_pool.outstanding_calls(inflight_dir), {})
+
+    def test_baseline_survives_restart_of_the_watchdog(self):
+        watchdog = self.watchdog(ScriptedHosts(*[canary(40)] * 5))
+        for _ in range(5):
+            watchdog.run_once()
+        again = self.watchdog(ScriptedHosts(canary(10)))
+        self.assertEqual(again.run_once()["status"], "slow")
+
+    def test_run_canary_reads_streamed_timings(self):
+        chunks = [{"response": "1", "done": False}, {"response": " 2", "done": False},
+                  {"response": "", "done": True, "eval_count": 32, "eval_duration": 800_000_000,
+                   "load_duration": 0, "prompt_eval_duration": 50_000_000}]
+        server, url = start_fake_generate(chunks)
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        result = ollama_watchdog.run_canary(url, "qwen")
+        self.assertEqual((result["tokens"], result["tokens_per_sec"]), (32, 40.0))
+        # Server-side timings only; no /api/ps here, so the smallest ladder bucket
+        self.assertEqual(result["ttft_ms"], 50)
+        self.assertEqual(result["num_ctx"], min(ollama_watchdog.CTX_LADDER))
+
+        server_error, bad_url = start_fake_generate([{"error": "model 'qwen' not found"}])
+        self.addCleanup(server_error.server_close)
+        self.addCleanup(server_error.shutdown)
+        with self.assertRaises(RuntimeError):
+            ollama_watchdog.run_canary(bad_url, "qwen")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,85 @@
+import unittest
+
+import rate_limiter
+from rate_limiter import RateLimiter, TokenBucket, backoff_delay, parse_retry_after
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+class TestTokenBucket(unittest.TestCase):
+    def test_consume_and_refill(self):
+        clock = FakeClock()
+        bucket = TokenBucket(60, clock)  # 1 token/s
+        self.assertEqual(bucket.try_consume(60), 0)
+        self.assertAlmostEqual(bucket.try_consume(10), 10.0)
+        clock.sleep(10)
+        self.assertEqual(bucket.try_consume(10), 0)
+
+    def test_debt_delays_next_caller(self):
+        clock = FakeClock()
+        bucket = TokenBucket(60, clock)
+        bucket.adjust(90)  # used 30 more than the bucket held
+        self.assertAlmostEqual(bucket.wait_time(), 30.0)
+
+
+class TestRateLimiter(unittest.TestCase):
+    def test_under_quota_does_not_wait(self):
+        clock = FakeClock()
+        limiter = RateLimiter(rpm=50, itpm=30000, otpm=8000, clock=clock, sleep=clock.sleep)
+        for _ in range(10):
+            self.assertEqual(limiter.acquire(1000), 0)
+
+    def test_request_limit_paces_calls(self):
+        clock = FakeClock()
+        limiter = RateLimiter(rpm=2, itpm=30000, otpm=8000, clock=clock, sleep=clock.sleep)
+        limiter.acquire(10)
+        limiter.acquire(10)
+        waited = limiter.acquire(10)
+        self.assertAlmostEqual(waited, 30.0)
+
+    def test_output_usage_throttles(self):
+        clock = FakeClock()
+        limiter = RateLimiter(rpm=50, itpm=30000, otpm=600, clock=clock, sleep=clock.sleep)
+        limiter.acquire(100)
+        limiter.record_usage({"input_tokens": 100, "output_tokens": 1200}, 100)
+        self.assertAlmostEqual(limiter.acquire(100), 60.0)
+
+    def test_pause_blocks_callers(self):
+        clock = FakeClock()
+        limiter = RateLimiter(clock=clock, sleep=clock.sleep)
+        limiter.pause(12)
+        self.assertAlmostEqual(limiter.acquire(10), 12.0)
+        self.assertEqual(limiter.stats["throttled"], 1)
+
+    def test_shared_instance(self):
+        self.assertIs(rate_limiter.get_director_limiter(), rate_limiter.get_director_limiter())
+
+
+class TestBackoff(unittest.TestCase):
+    def test_parse_retry_after(self):
+        self.assertEqual(parse_retry_after("7"), 7.0)
+        self.assertIsNone(parse_retry_after(None))
+        self.assertIsNone(parse_retry_after("Wed, 21 Oct 2026 07:28:00 GMT"))
+
+    def test_backoff_honors_retry_after(self):
+        for _ in range(50):
+            delay = backoff_delay(1, retry_after=20)
+            self.assertGreaterEqual(delay, 20)
+            self.assertLessEqual(delay, 21.25)
+
+    def test_backoff_is_capped(self):
+        for _ in range(50):
+            self.assertLessEqual(backoff_delay(20), rate_limiter.MAX_BACKOFF)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,101 @@
+import subprocess
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+from repo_index import RepoIndex, detect_project, format_snippets, load_projects
+
+
+def git(*args, cwd):
+    subprocess.run(["git", *args], cwd=cwd, check=True, capture_output=True)
+
+
+class TestRepoIndex(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name) / "repo"
+        self.write("src/priority.py",
+                   "class LinkRanker:\n"
+                   "    def get_link_priority(self, card):\n"
+                   "        return card.level\n")
+        self.write("src/combo.py",
+                   "from .priority import LinkRanker\n\n"
+                   "def enumerate_paths(cards):\n"
+                   "    ranker = LinkRanker()\n"
+                   "    return sorted(cards, key=ranker.get_link_priority)\n")
+        self.index_file = Path(self.tmp.name) / "index.json"
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, rel, text):
+        path = self.root / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(text)
+
+    def test_definitions_and_callers(self):
+        index = RepoIndex(self.root, self.index_file)
+        self.assertEqual(index.update()["updated"], 2)
+        [d] = index.definitions("get_link_priority")
+        self.assertEqual((d["file"], d["line"], d["kind"]), ("src/priority.py", 2, "method"))
+        self.assertEqual(d["qualname"], "LinkRanker.get_link_priority")
+        callers = index.callers("LinkRanker")
+        self.assertEqual([(c["file"], c["caller"]) for c in callers], [("src/combo.py", "enumerate_paths")])
+
+    def test_incremental_walk_update(self):
+        index = RepoIndex(self.root, self.index_file)
+        index.update()
+        index.save()
+
+        reloaded = RepoIndex(self.root, self.index_file)
+        self.assertEqual(reloaded.update()["updated"], 0)
+        time.sleep(0.01)
+        self.write("src/combo.py", "def rank_all():\n    pass\n")
+        (self.root / "src/priority.py").unlink()
+        result = reloaded.update()
+        self.assertEqual(result["updated"], 2)
+        self.assertEqual(reloaded.definitions("enumerate_paths"), [])
+        self.assertEqual(len(reloaded.definitions("rank_all")), 1)
+        self.assertEqual(reloaded.definitions("LinkRanker"), [])
+
+    def test_incremental_git_update(self):
+        git("init", "-q", cwd=self.root)
+        git("config", "user.email", "test@example.com", cwd=self.root)
+        git("config", "user.name", "test", cwd=self.root)
+        git("add", ".", cwd=self.root)
+        git("commit", "-q", "-m", "init", cwd=self.root)
+        index = RepoIndex(self.root, self.index_file)
+        index.update()
+        self.write("src/new_module.py", "def fresh_helper():\n    return 1\n")
+        result = index.update()
+        self.assertEqual((result["mode"], result["scanned"], result["updated"]), ("git", 1, 1))
+        self.assertEqual(len(index.definitions("fresh_helper")), 1)
+
+    def test_snippets_for_prompt(self):
+        index = RepoIndex(self.root, self.index_file)
+        index.update()
+        snippets = format_snippets(index, "Fix get_link_priority so it handles None cards")
+        self.assertIn("src/priority.py:2", snippets)
+        self.assertIn("return card.level", snippets)
+        self.assertEqual(format_snippets(index, "nothing relevant here"), "")
+
+    def test_detect_project(self):
+        projects = {"ygo": {"name": "YGO Combo Pipeline", "path": "~/Desktop/testing",
+                            "sentry_project": "ygo-combo-pipeline"}}
+        self.assertEqual(detect_project("Fix step 17 in the ygo-combo-pipeline repo", projects), "ygo")
+        self.assertEqual(detect_project("Tests fail under ~/Desktop/testing/tests", projects), "ygo")
+        self.assertEqual(detect_project("# Fix enumeration\n\n**Project:** ygo\n", projects), "ygo")
+        self.assertIsNone(detect_project("Write a dice roller", projects))
+
+    def test_detect_project_ignores_ordinary_words(self):
+        projects = load_projects(Path(__file__).parent.parent / "config" / "repositories.json")
+        for task in ["Add more testing for the orchestrator", "Keep the token budget under 800",
+                     "Make the ygo step faster", "Split the clawd-multi-agent docs", "See ~/Desktop/testing2"]:
+            with self.subTest(task=task):
+                self.assertIsNone(detect_project(task, projects))
+        self.assertEqual(detect_project("project: budget\nKeep the token budget under 800", projects), "budget")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+ORCHESTRATOR = Path(__file__).parent / "orchestrator.py"
+# Import budget for lightweight commands; launchd starts many short runs
+STARTUP_BUDGET_MS = int(os.environ.get("STARTUP_BUDGET_MS", 300))
+HEAVY_MODULES = {"sentry_sdk", "dotenv", "sentry_config"}
+
+
+def import_times(*args) -> dict:
+    """Cumulative import time in ms per top-level module, via -X importtime."""
+    with tempfile.TemporaryDirectory() as home:
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", str(ORCHESTRATOR), *args],
+            capture_output=True, text=True, timeout=60,
+            env={**os.environ, "CLAWD_HOME": home},
+        )
+    if result.returncode != 0:
+        raise AssertionError(result.stderr[-2000:])
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if not name.startswith("  "):  # Nested imports are counted in their parent
+            times[name.strip()] = int(cumulative) / 1000
+    return times
+
+
+class TestStartup(unittest.TestCase):
+    def check(self, *args):
+        times = import_times(*args)
+        self.assertFalse(HEAVY_MODULES & set(times), f"{args} imported {HEAVY_MODULES & set(times)}")
+        total = sum(times.values())
+        slowest = sorted(times.items(), key=lambda item: item[1], reverse=True)[:5]
+        print(f"\norchestrator {' '.join(args)}: {total:.1f}ms of imports; slowest {slowest}", file=sys.stderr)
+        self.assertLess(total, STARTUP_BUDGET_MS, f"slowest imports: {slowest}")
+
+    def test_help_is_lightweight(self):
+        self.check("--help")
+
+    def test_list_is_lightweight(self):
+        self.check("--list")
+
+
+# Runs the CLI on a missing task (after .env is loaded) and reports settings
+# that sibling modules read at import time
+SETTINGS_PROBE = f"""
+import json, runpy, sys
+sys.path[:0] = [sys.argv[1], {str(ORCHESTRATOR.parent)!r}]
+sys.argv = [{str(ORCHESTRATOR)!r}, "missing-task.md"]
+try:
+    runpy.run_path(sys.argv[0], run_name="__main__")
+except SystemExit:
+    pass
+import ollama_pool, rate_limiter
+print(json.dumps({{"urls": ollama_pool.pool_urls_from_env(), "rpm": rate_limiter.DIRECTOR_RPM}}))
+"""
+
+# Stands in for python-dotenv: loads CLAWD_HOME/.env without overriding
+FAKE_DOTENV = """
+import os
+def load_dotenv():
+    for line in open(os.path.join(os.environ["CLAWD_HOME"], ".env")):
+        key, _, value = line.strip().partition("=")
+        os.environ.setdefault(key, value)
+"""
+
+
+class TestDotenv(unittest.TestCase):
+    def test_dotenv_settings_reach_sibling_modules(self):
+        with tempfile.TemporaryDirectory() as home:
+            (Path(home) / ".env").write_text("OLLAMA_URLS=http://gpu-box:11434\nDIRECTOR_RPM=7\n")
+            (Path(home) / "dotenv.py").write_text(FAKE_DOTENV)
+            env = {k: v for k, v in os.environ.items() if k not in ("OLLAMA_URLS", "DIRECTOR_RPM", "SENTRY_DSN")}
+            result = subprocess.run([sys.executable, "-c", SETTINGS_PROBE, home], capture_output=True, text=True,
+                                    timeout=60, env={**env, "CLAWD_HOME": home})
+        self.assertEqual(result.returncode, 0, result.stderr[-2000:])
+        settings = json.loads(result.stdout.splitlines()[-1])
+        self.assertEqual(settings, {"urls": ["http://gpu-box:11434"], "rpm": 7})
+
+
+if __name__ == "__main__":
+    unittest.main()
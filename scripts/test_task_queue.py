@@ -0,0 +1,170 @@
+import importlib.util
+import json
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from task_queue import TaskQueue, run_next
+
+HANDLER_PATH = Path(__file__).parent / "sentry-webhook-handler.py"
+
+# The real orchestrator CLI with a Director that ends the task as the task file says
+FAKE_ORCHESTRATOR = f"""
+import sys
+sys.path.insert(0, {str(Path(__file__).parent)!r})
+import orchestrator
+action = "complete" if "finish" in open(sys.argv[1]).read() else "halt"
+orchestrator.call_director = lambda state: {{"action": action, "reason": "test"}}
+orchestrator.main()
+"""
+
+
+def load_handler():
+    spec = importlib.util.spec_from_file_location("sentry_webhook_handler", HANDLER_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def sentry_payload(message="'amount'"):
+    frame = {"filename": "copytrader/orders.py", "abs_path": "/Users/dev/Projects/Polymarket_CopyTrader/copytrader/orders.py",
+             "lineno": 45, "function": "place_order", "in_app": True}
+    return {"data": {"event": {
+        "url": "https://sentry.io/api/0/projects/acme/polymarket-copytrader/events/1/",
+        "exception": {"values": [{"type": "KeyError", "value": message, "stacktrace": {"frames": [frame]}}]},
+    }}}
+
+
+class TestTaskQueue(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.queue = TaskQueue(Path(self.tmp.name) / "queue")
+
+    def test_submit_claim_finish(self):
+        first = self.queue.submit("Fix login", "# Fix login\n")
+        second = self.queue.submit("Fix login", "# Fix login again\n")
+        self.assertNotEqual(first, second)
+        self.assertEqual(self.queue.pending(), [first, second])
+        self.assertEqual(list(self.queue.root.glob(".*.tmp")), [])
+
+        claimed = self.queue.claim()
+        self.assertEqual(claimed.read_text(), "# Fix login\n")
+        self.assertEqual(self.queue.pending(), [second])
+        done = self.queue.finish(claimed, "done")
+        self.assertEqual(done.name, f"{first.stem}.done.md")
+
+    def test_claim_skips_tasks_taken_by_another_runner(self):
+        path = self.queue.submit("task", "x")
+        other = TaskQueue(self.queue.root)
+        self.assertEqual(other.claim().name, path.name)
+        self.assertIsNone(self.queue.claim())
+
+    def test_fingerprint_dedupes_within_window(self):
+        self.assertIsNotNone(self.queue.submit("a", "x", fingerprint="fp1"))
+        self.assertIsNone(self.queue.submit("a", "x", fingerprint="fp1"))
+        self.assertIsNotNone(self.queue.submit("b", "y", fingerprint="fp2"))
+        ledger = json.loads(self.queue.ledger_file.read_text())
+        self.assertEqual(ledger["fp1"]["duplicates"], 1)
+
+        # Outside the window the same error is queued again
+        self.assertIsNotNone(self.queue.submit("a", "x", fingerprint="fp1", dedupe_seconds=0))
+
+    def test_run_next_moves_task_by_outcome(self):
+        self.queue.submit("ok", "fine")
+        self.queue.submit("bad", "broken")
+        script = "import sys; sys.exit(1 if 'broken' in open(sys.argv[1]).read() else 0)"
+        command = [sys.executable, "-c", script]
+        self.assertEqual(run_next(self.queue, command)["outcome"], "done")
+        self.assertEqual(run_next(self.queue, command)["outcome"], "failed")
+        self.assertIsNone(run_next(self.queue, command))
+        self.assertEqual(len(list(self.queue.done_dir.glob("*.done.md"))), 1)
+        self.assertEqual(self.queue.running(), [])
+
+    def claim_and_die(self):
+        """A runner in another process claims a task and is killed mid-run."""
+        script = (f"import sys, time; sys.path.insert(0, {str(Path(__file__).parent)!r})\n"
+                  "from task_queue import TaskQueue\n"
+                  f"queue = TaskQueue({str(self.queue.root)!r})\n"
+                  "print(queue.claim(), flush=True)\n"
+                  "time.sleep(60)\n")
+        runner = subprocess.Popen([sys.executable, "-c", script], stdout=subprocess.PIPE, text=True)
+        claimed = Path(runner.stdout.readline().strip())
+        self.assertEqual(self.queue.recover_stale(), [])  # Alive: left alone
+        runner.kill()
+        runner.wait()
+        runner.stdout.close()
+        return claimed
+
+    def test_interrupted_task_is_requeued_once_then_failed(self):
+        self.queue.submit("fix", "# Fix it\n", fingerprint="fp1")
+        first = self.claim_and_die()
+        self.assertEqual(self.queue.recover_stale(), [(first.name, "requeued")])
+        self.assertEqual([p.name for p in self.queue.pending()], [f"{first.stem}.retry.md"])
+        self.assertEqual(self.queue.running(), [])
+
+        second = self.claim_and_die()
+        self.assertEqual(self.queue.recover_stale(), [(second.name, "failed")])
+        self.assertEqual([p.name for p in self.queue.done_dir.iterdir()], [f"{first.stem}.retry.failed.md"])
+        self.assertEqual(list(self.queue.running_dir.iterdir()), [])
+        # The error can be queued again
+        self.assertIsNotNone(self.queue.submit("fix", "# Fix it\n", fingerprint="fp1"))
+
+    def test_halted_orchestrator_run_is_failed(self):
+        self.queue.submit("finish", "# Task\nfinish the job\n")
+        self.queue.submit("stop", "# Task\nstop here\n")
+        command = [sys.executable, "-c", FAKE_ORCHESTRATOR]
+        with mock.patch.dict("os.environ", {"CLAWD_HOME": self.tmp.name}):
+            completed, halted = run_next(self.queue, command), run_next(self.queue, command)
+        self.assertEqual((completed["outcome"], completed["exit_code"]), ("done", 0))
+        self.assertEqual((halted["outcome"], halted["exit_code"]), ("failed", 1))
+
+
+class TestAutofixDispatch(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.handler = load_handler()
+        self.handler.TASK_QUEUE_DIR = Path(self.tmp.name) / "queue"
+
+    def dispatch(self, payload):
+        context = self.handler.extract_error_context(payload)
+        return self.handler.dispatch_autofix(context, self.handler.triage_error(context))
+
+    def test_autofix_error_becomes_task_once(self):
+        result = self.dispatch(sentry_payload())
+        self.assertEqual(result["status"], "queued")
+        task = (self.handler.TASK_QUEUE_DIR / result["task"]).read_text()
+        self.assertIn("KeyError", task)
+        self.assertIn("~/Projects/Polymarket_CopyTrader", task)
+        self.assertIn("copytrader/orders.py:45 in place_order", task)
+        self.assertIn("Use .get() with default", task)
+
+        # Numbers in the message are masked, so this is the same error
+        self.assertEqual(self.dispatch(sentry_payload())["status"], "duplicate")
+        self.assertEqual(self.dispatch(sentry_payload(message="'amount' (row 7)"))["status"], "queued")
+        self.assertEqual(self.dispatch(sentry_payload(message="'amount' (row 9)"))["status"], "duplicate")
+        self.assertEqual(self.dispatch(sentry_payload(message="'price'"))["status"], "queued")
+
+    def test_task_is_routed_to_the_project(self):
+        import repo_index
+
+        result = self.dispatch(sentry_payload())
+        task = (self.handler.TASK_QUEUE_DIR / result["task"]).read_text()
+        projects = repo_index.load_projects(Path(__file__).parent.parent / "config" / "repositories.json")
+        self.assertEqual(repo_index.detect_project(task, projects), "polymarket")
+
+    def test_unknown_project_and_disabled_dispatch_are_skipped(self):
+        payload = sentry_payload()
+        payload["data"]["event"]["url"] = ""
+        payload["data"]["event"]["exception"]["values"][0]["stacktrace"]["frames"][0]["abs_path"] = "/srv/x.py"
+        self.assertEqual(self.dispatch(payload)["status"], "skipped")
+        with mock.patch.object(self.handler, "AUTOFIX_DISPATCH", False):
+            self.assertEqual(self.dispatch(sentry_payload())["status"], "disabled")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,146 @@
+import http.client
+import json
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+
+import telemetry_server
+from telemetry_server import Follower, InotifyWatcher, make_server
+
+
+def write_events(path: Path, count: int, delay: float):
+    """Synthetic orchestrator: worker calls and responses, one line at a time."""
+    for turn in range(1, count + 1):
+        with open(path, "a") as f:
+            f.write(json.dumps({"event": "director_call", "turn": turn, "timestamp": "2026-10-19T01:00:00"}) + "\n")
+            f.write(json.dumps({"event": "worker_call", "agent": "scout", "timestamp": "2026-10-19T01:00:01"}) + "\n")
+        time.sleep(delay)
+        with open(path, "a") as f:
+            f.write(json.dumps({"event": "worker_response", "agent": "scout", "latency_ms": 100 * turn,
+                                "exit_code": 0, "timestamp": "2026-10-19T01:00:02"}) + "\n")
+        time.sleep(delay)
+
+
+class SSEClient:
+    def __init__(self, port: int):
+        self.conn = http.client.HTTPConnection("127.0.0.1", port, timeout=5)
+        self.conn.request("GET", "/events")
+        self.response = self.conn.getresponse()
+
+    def next(self):
+        kind, data = None, None
+        while True:
+            line = self.response.fp.readline().decode("utf-8").rstrip("\n")
+            if line.startswith("event: "):
+                kind = line[len("event: "):]
+            elif line.startswith("data: "):
+                data = json.loads(line[len("data: "):])
+            elif line == "" and kind:
+                return kind, data
+
+    def until(self, predicate, limit: int = 200):
+        for _ in range(limit):
+            kind, data = self.next()
+            if predicate(kind, data):
+                return data
+        raise AssertionError("expected SSE frame never arrived")
+
+    def close(self):
+        self.conn.close()
+
+
+class TestTelemetryServer(unittest.TestCase):
+    poll = True
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        memory = Path(self.tmp.name) / "memory"
+        self.logs = memory / "logs"
+        self.logs.mkdir(parents=True)
+        self.events = self.logs / "events-20261019.jsonl"
+        self.state_file = memory / "current-state.json"
+        self.dashboard = Path(self.tmp.name) / "dashboard.html"
+        self.dashboard.write_text("<title>dash</title>")
+
+        self.old_interval = telemetry_server.POLL_INTERVAL
+        telemetry_server.POLL_INTERVAL = 0.05
+        self.follower = Follower(self.logs, self.state_file, poll=self.poll)
+        self.follower.start()
+        self.server = make_server(self.follower, port=0, dashboard_file=self.dashboard)
+        self.port = self.server.server_address[1]
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.follower.stop()
+        telemetry_server.POLL_INTERVAL = self.old_interval
+        self.tmp.cleanup()
+
+    def test_streams_synthetic_run_to_many_viewers(self):
+        clients = [SSEClient(self.port) for _ in range(3)]
+        for client in clients:
+            self.assertEqual(client.next()[0], "metrics")
+            self.assertEqual(client.next(), ("recent", []))
+
+        writer = threading.Thread(target=write_events, args=(self.events, 5, 0.02))
+        writer.start()
+        writer.join()
+        self.state_file.write_text(json.dumps({"task_id": "task-1", "phase": "verify", "turn": 5,
+                                               "status": "running", "history": []}))
+
+        for client in clients:
+            metrics = client.until(lambda k, d: k == "metrics" and d.get("phase") == "verify"
+                                   and d["counts"].get("worker_response") == 5)
+            self.assertEqual(metrics["turn"], 5)
+            self.assertEqual(metrics["queue"]["workers_in_flight"], 0)
+            self.assertEqual(metrics["latency"]["workers"]["scout"]["last"], 500)
+            client.close()
+
+        # Each appended byte was read once, however many viewers there were
+        appended = self.events.stat().st_size + self.state_file.stat().st_size
+        self.assertEqual(self.follower.bytes_read, appended)
+
+    def test_log_frames_and_in_flight_queue(self):
+        client = SSEClient(self.port)
+        client.next(), client.next()
+        with open(self.events, "a") as f:
+            f.write(json.dumps({"event": "worker_call", "agent": "builder", "timestamp": "t"}) + "\n")
+            f.write('{"event": "worker_resp')  # Partially written line
+        event = client.until(lambda k, d: k == "log")
+        self.assertEqual(event["agent"], "builder")
+        metrics = client.until(lambda k, d: k == "metrics")
+        self.assertEqual(metrics["queue"]["workers_in_flight"], 1)
+
+        with open(self.events, "a") as f:
+            f.write('onse", "agent": "builder", "latency_ms": 7}\n')
+        metrics = client.until(lambda k, d: k == "metrics")
+        self.assertEqual(metrics["queue"]["workers_in_flight"], 0)
+        self.assertEqual(metrics["latency"]["workers"]["builder"]["p50"], 7)
+        client.close()
+
+    def test_serves_dashboard_and_snapshot(self):
+        conn = http.client.HTTPConnection("127.0.0.1", self.port, timeout=5)
+        conn.request("GET", "/")
+        self.assertIn(b"dash", conn.getresponse().read())
+        conn.request("GET", "/snapshot")
+        self.assertIn("queue", json.loads(conn.getresponse().read()))
+        conn.close()
+
+
+try:
+    InotifyWatcher([tempfile.gettempdir()]).close()
+    HAS_INOTIFY = True
+except (AttributeError, OSError):
+    HAS_INOTIFY = False
+
+
+@unittest.skipUnless(HAS_INOTIFY, "inotify not available")
+class TestTelemetryServerInotify(TestTelemetryServer):
+    poll = False
+
+
+if __name__ == "__main__":
+    unittest.main()
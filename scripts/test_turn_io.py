@@ -0,0 +1,107 @@
+import json
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import orchestrator
+
+
+class TestTurnIO(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        home = Path(self.tmp.name)
+        self.memory = home / "memory"
+        self.task_file = home / "task.md"
+        self.task_file.write_text("# Task\nFix the priority bug.\n")
+        patcher = mock.patch.multiple(
+            orchestrator, CLAWD_HOME=home, MEMORY_DIR=self.memory, CHECKPOINT_DIR=self.memory / "checkpoints",
+            ALERTS_DIR=self.memory / "alerts", LOGS_DIR=self.memory / "logs", BLOBS_DIR=self.memory / "blobs",
+            SCRIPTS_DIR=home / "scripts", CONFIG_FILE=home / "config" / "repositories.json",
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(self.tmp.cleanup)
+        self.log = []
+
+        write_checkpoint = orchestrator.write_checkpoint
+
+        def slow_write(task_id, payload, checkpoint_file, current_state_file):
+            time.sleep(0.2)
+            write_checkpoint(task_id, payload, checkpoint_file, current_state_file)
+            self.log.append(("durable", json.loads(payload)["turn"]))
+
+        self.write_patch = mock.patch.object(orchestrator, "write_checkpoint", slow_write)
+        self.write_patch.start()
+        self.addCleanup(self.write_patch.stop)
+
+    def current_state(self) -> dict:
+        return json.loads((self.memory / "current-state.json").read_text())
+
+    def run_task(self, decisions):
+        decisions = list(decisions)
+
+        def director(state):
+            self.log.append(("director", state["turn"]))
+            time.sleep(0.2)
+            return decisions.pop(0)
+
+        def worker(agent, prompt, project=None):
+            self.log.append(("worker", self.current_state()["turn"]))
+            return {"success": True, "output": "done", "error": None}
+
+        def notify(message, severity="info"):
+            self.log.append(("notify", message, self.current_state()["status"]))
+
+        with mock.patch.object(orchestrator, "call_director", director), \
+                mock.patch.object(orchestrator, "call_worker", worker), \
+                mock.patch.object(orchestrator, "notify", notify):
+            return orchestrator.run_orchestrator(task_file=str(self.task_file))
+
+    def test_checkpoint_overlaps_director_but_not_worker(self):
+        start = time.time()
+        state = self.run_task([{"action": "spawn_agent", "agent": "scout", "prompt": "Look"},
+                               {"action": "spawn_agent", "agent": "builder", "prompt": "Fix"},
+                               {"action": "complete"}])
+        elapsed = time.time() - start
+
+        self.assertEqual(state["status"], "complete")
+        # Each Director call starts before the previous turn's checkpoint is on disk...
+        self.assertLess(self.log.index(("director", 1)), self.log.index(("durable", 0)))
+        self.assertLess(self.log.index(("director", 2)), self.log.index(("durable", 1)))
+        # ...but each worker sees the checkpoint of the turn before it
+        self.assertEqual([e[1] for e in self.log if e[0] == "worker"], [0, 1])
+        # Four 0.2s writes and three 0.2s Director calls, partly overlapped
+        self.assertLess(elapsed, 1.3)
+        self.assertGreater(state["io_wait_ms"], 0)
+
+    def test_notifications_wait_for_durable_state(self):
+        state = self.run_task([{"action": "complete"}])
+        notes = [e for e in self.log if e[0] == "notify"]
+        self.assertEqual(notes[0][1:], (f"Task started: {state['task_id']}", "running"))
+        self.assertEqual(notes[1][1:], (f"Task {state['task_id']} completed in 1 turns", "complete"))
+        self.assertLess(self.log.index(("durable", 0)), self.log.index(notes[0]))
+
+    def test_held_alert_shows_state_of_its_turn(self):
+        self.run_task([{"action": "escalate", "reason": "Needs a human"}])
+        alert = next((self.memory / "alerts").glob("ALERT-*.md")).read_text()
+        self.assertIn("Needs a human", alert)
+        self.assertIn("**Turn**: 1", alert)
+        self.assertEqual(self.current_state()["status"], "escalated")
+
+    def test_failed_checkpoint_stops_the_worker(self):
+        def broken_write(*args):
+            raise OSError("disk full")
+
+        self.write_patch.stop()
+        with mock.patch.object(orchestrator, "write_checkpoint", broken_write), \
+                self.assertRaises(OSError):
+            self.run_task([{"action": "spawn_agent", "agent": "builder", "prompt": "Fix"}])
+        self.write_patch.start()
+        self.assertNotIn("worker", [e[0] for e in self.log])
+        orchestrator.NOTIFY_IO.drain()
+
+
+if __name__ == "__main__":
+    unittest.main()
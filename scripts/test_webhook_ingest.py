@@ -0,0 +1,102 @@
+import gzip
+import http.client
+import io
+import json
+import random
+import socket
+import tempfile
+import threading
+import unittest
+from http.server import HTTPServer
+from pathlib import Path
+from unittest import mock
+
+import bench_webhook
+from bench_webhook import load_handler_module, make_payload, sign
+
+
+class TestWebhookIngest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.handler = load_handler_module()
+        home = Path(self.tmp.name)
+        self.handler.LOG_DIR = home / "logs" / "sentry-webhooks"
+        self.handler.TASK_QUEUE_DIR = home / "queue"
+        self.handler.MAX_BODY_BYTES = 512 * 1024
+        self.notified = []
+        self.handler.notify_molty = lambda message, context: self.notified.append(message)
+
+        self.server = HTTPServer(("127.0.0.1", 0), self.handler.SentryWebhookHandler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+
+    def post(self, body: bytes, signature: str = None) -> tuple:
+        conn = http.client.HTTPConnection("127.0.0.1", self.server.server_address[1], timeout=10)
+        conn.request("POST", "/", body=body, headers={"Sentry-Hook-Signature": signature or sign(body)})
+        response = conn.getresponse()
+        status, reply = response.status, json.loads(response.read() or b"{}")
+        conn.close()
+        return status, reply
+
+    def log_files(self, pattern: str) -> list:
+        return sorted(self.handler.LOG_DIR.glob(pattern)) if self.handler.LOG_DIR.exists() else []
+
+    def test_large_event_is_logged_slim_with_compressed_raw(self):
+        body = json.dumps(make_payload(random.Random(1), depth=60, breadcrumb_kb=200)).encode()
+        self.assertEqual(self.post(body)[0], 200)
+
+        raw_file = self.log_files("*.raw.json.gz")[0]
+        self.assertEqual(gzip.decompress(raw_file.read_bytes()), body)
+        self.assertLess(raw_file.stat().st_size, len(body) // 10)
+        entry = json.loads(self.log_files("webhook_*[0-9].json")[0].read_text())
+        self.assertEqual(entry["raw_payload_file"], raw_file.name)
+        self.assertNotIn("raw_payload", entry)
+        self.assertEqual(len(self.notified), 1)
+
+    def test_oversized_body_is_rejected_unread(self):
+        # Only the headers are sent: the handler must answer without waiting for the body
+        with socket.create_connection(self.server.server_address, timeout=10) as sock:
+            sock.sendall(b"POST / HTTP/1.1\r\nHost: x\r\nContent-Length: %d\r\n\r\n" % (600 * 1024))
+            response = http.client.HTTPResponse(sock)
+            response.begin()
+            self.assertEqual(response.status, 413)
+            self.assertIn("larger than", json.loads(response.read())["error"])
+        self.assertEqual((self.log_files("*"), self.notified), ([], []))
+
+    def test_bad_signature_leaves_no_raw_log(self):
+        body = json.dumps(make_payload(random.Random(2))).encode()
+        self.assertEqual(self.post(body, "0" * 64)[0], 401)
+        self.assertEqual(self.log_files("*"), [])
+
+    def test_raw_logging_can_be_disabled(self):
+        self.handler.LOG_RAW_PAYLOADS = False
+        body = json.dumps(make_payload(random.Random(3))).encode()
+        self.assertEqual(self.post(body)[0], 200)
+        self.assertEqual(self.log_files("*.gz"), [])
+        self.assertEqual(len(self.log_files("webhook_*.json")), 1)
+
+    def test_chunked_read_signs_like_whole_body(self):
+        body = json.dumps(make_payload(random.Random(4), depth=200)).encode()
+        mac = self.handler.new_signature_mac()
+        with mock.patch.object(self.handler, "READ_CHUNK_BYTES", 1000):
+            read = self.handler.read_body(io.BytesIO(body), len(body), mac)
+        self.assertEqual(bytes(read), body)
+        self.assertTrue(self.handler.signature_matches(mac, sign(body)))
+        with self.assertRaises(ConnectionError):
+            self.handler.read_body(io.BytesIO(body[:10]), len(body))
+
+    def test_slim_parse_gives_the_same_context(self):
+        rng = random.Random(5)
+        for depth in bench_webhook.STACK_DEPTHS:
+            payload = make_payload(rng, depth, breadcrumb_kb=4)
+            slim = self.handler.parse_payload(json.dumps(payload).encode())
+            self.assertNotIn("breadcrumbs", slim["data"]["event"])
+            full, kept = self.handler.extract_error_context(payload), self.handler.extract_error_context(slim)
+            full.pop("timestamp"), kept.pop("timestamp")
+            self.assertEqual(kept, full)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,126 @@
+import json
+import tempfile
+import time
+import unittest
+from collections import deque
+from pathlib import Path
+from unittest import mock
+
+import orchestrator
+from ollama_pool import OllamaPool
+
+# Stands in for call-agent.sh: hosts named "slow" stall unless a "small" model is asked for
+FAKE_CALL_AGENT = """#!/bin/bash
+if [[ "$OLLAMA_URL" == *slow* && "$CLAWD_MODEL" != *small* ]]; then sleep 1; else sleep 0.05; fi
+echo "$1 answered by $OLLAMA_URL ($CLAWD_MODEL)"
+"""
+
+
+class TestWorkerHedging(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        home = Path(self.tmp.name)
+        self.logs = home / "memory" / "logs"
+        scripts = home / "scripts"
+        scripts.mkdir()
+        (scripts / "call-agent.sh").write_text(FAKE_CALL_AGENT)
+        (scripts / "call-agent.sh").chmod(0o755)
+        patchers = [
+            mock.patch.multiple(
+                orchestrator, CLAWD_HOME=home, LOGS_DIR=self.logs, SCRIPTS_DIR=scripts,
+                AGENTS_DIR=home / "agents", HEDGE_AGENTS={"scout", "inspector", "scribe"},
+                HEDGE_MIN_DELAY=0.1, HEDGE_MODEL="",
+                _agent_latencies={"scout": deque([100] * 30), "inspector": deque([100] * 5), "scribe": deque()},
+            ),
+            mock.patch.dict(orchestrator.HEDGE_STATS, {k: 0 for k in orchestrator.HEDGE_STATS}),
+        ]
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.addCleanup(self.tmp.cleanup)
+
+    def use_pool(self, urls):
+        pool = OllamaPool(urls)
+        pool._last_probe = time.monotonic() + 3600  # Never probe the fake hosts
+        patcher = mock.patch.object(orchestrator, "get_ollama_pool", lambda: pool)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        return pool
+
+    def events(self, kind):
+        lines = [json.loads(line) for path in self.logs.glob("events-*.jsonl") for line in path.open()]
+        return [e for e in lines if e["event"] == kind]
+
+    def test_slow_primary_loses_to_hedge_on_another_host(self):
+        pool = self.use_pool(["http://slow", "http://fast"])
+        start = time.time()
+        result = orchestrator.call_worker("scout", "find the bug")
+
+        self.assertLess(time.time() - start, 0.8)
+        self.assertTrue(result["success"])
+        self.assertIn("http://fast", result["output"])
+        self.assertEqual(orchestrator.HEDGE_STATS["hedged"], 1)
+        self.assertEqual(orchestrator.HEDGE_STATS["hedge_wins"], 1)
+        hedge = self.events("worker_hedge")[0]
+        self.assertEqual((hedge["winner"], hedge["primary_host"]), ("hedge", "http://slow"))
+        self.assertEqual(hedge["hedge_rate"], 1.0)
+        self.assertTrue(self.events("worker_response")[0]["hedged"])
+        # The cancelled loser is no longer outstanding and did not count as a failure
+        self.assertEqual([(h.outstanding, h.failures) for h in pool.hosts], [(0, 0), (0, 0)])
+        # The cut-short call is not a latency sample
+        self.assertEqual(len(orchestrator.agent_latencies()["scout"]), 30)
+
+    def test_hedges_stay_within_budget(self):
+        self.use_pool(["http://slow", "http://fast"])
+        orchestrator.HEDGE_STATS.update(eligible=9, hedged=1)
+        result = orchestrator.call_worker("scout", "find the bug")
+
+        self.assertIn("http://slow", result["output"])
+        self.assertEqual(self.events("worker_hedge"), [])
+        self.assertEqual((orchestrator.HEDGE_STATS["hedged"], orchestrator.HEDGE_STATS["over_budget"]), (1, 1))
+        # The unhedged primary ran to completion, so its latency is recorded
+        self.assertGreaterEqual(orchestrator.agent_latencies()["scout"][-1], 1000)
+
+    def test_fast_primary_is_not_hedged(self):
+        self.use_pool(["http://fast", "http://slow"])
+        result = orchestrator.call_worker("scout", "find the bug")
+        self.assertIn("http://fast", result["output"])
+        self.assertEqual(self.events("worker_hedge"), [])
+        self.assertEqual((orchestrator.HEDGE_STATS["eligible"], orchestrator.HEDGE_STATS["hedged"]), (1, 0))
+
+    def test_hedge_model_on_single_host(self):
+        self.use_pool(["http://slow"])
+        with mock.patch.object(orchestrator, "HEDGE_MODEL", "qwen-small"):
+            result = orchestrator.call_worker("scout", "find the bug")
+        self.assertIn("(qwen-small)", result["output"])
+        self.assertEqual(self.events("worker_response")[0]["model"], "qwen-small")
+
+    def test_single_host_without_hedge_model_waits_for_primary(self):
+        self.use_pool(["http://slow"])
+        result = orchestrator.call_worker("scout", "find the bug")
+        self.assertIn("http://slow", result["output"])
+        self.assertEqual(self.events("worker_hedge"), [])
+
+    def test_only_read_only_agents_with_enough_history_are_hedged(self):
+        self.assertEqual(orchestrator.hedge_delay("scout"), 0.1)
+        self.assertIsNone(orchestrator.hedge_delay("inspector"))  # Too few samples yet
+        self.assertIsNone(orchestrator.hedge_delay("builder"))
+
+    def test_latency_window_is_seeded_from_event_logs(self):
+        self.logs.mkdir(parents=True)
+        with open(self.logs / "events-20261019.jsonl", "w") as f:
+            f.write('ker_response", "truncated by the seek"}\n')
+            for ms in range(1000, 31000, 1000):
+                f.write(json.dumps({"event": "worker_response", "agent": "inspector", "success": True,
+                                    "latency_ms": ms}) + "\n")
+            f.write(json.dumps({"event": "worker_response", "agent": "inspector", "success": False,
+                                "latency_ms": 600000}) + "\n")
+            f.write(json.dumps({"event": "worker_response", "agent": "inspector", "success": True,
+                                "latency_ms": 500, "hedged": True}) + "\n")
+        with mock.patch.object(orchestrator, "_agent_latencies", None):
+            self.assertEqual(len(orchestrator.agent_latencies()["inspector"]), 30)
+            self.assertEqual(orchestrator.hedge_delay("inspector"), 28.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
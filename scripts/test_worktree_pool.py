@@ -0,0 +1,121 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+from worktree_pool import WORKTREE_LEASE_TTL, PoolError, WorktreePool
+
+POOL_SCRIPT = Path(__file__).parent / "worktree_pool.py"
+
+
+def git(*args, cwd):
+    subprocess.run(["git", *args], cwd=cwd, check=True, capture_output=True)
+
+
+class TestWorktreePool(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        root = Path(self.tmp.name)
+        self.repo = root / "repo"
+        self.repo.mkdir()
+        git("init", "-q", cwd=self.repo)
+        git("config", "user.email", "test@example.com", cwd=self.repo)
+        git("config", "user.name", "test", cwd=self.repo)
+        (self.repo / ".gitignore").write_text(".venv\n.env\n")
+        (self.repo / "app.py").write_text("print('hi')\n")
+        git("add", ".", cwd=self.repo)
+        git("commit", "-q", "-m", "init", cwd=self.repo)
+        (self.repo / ".venv").mkdir()
+
+        self.root = root
+        config = root / "config" / "repositories.json"
+        config.parent.mkdir()
+        config.write_text(json.dumps({"projects": {"demo": {"path": str(self.repo), "venv": ".venv"}}}))
+        self.pool = WorktreePool(root / "workspace", config)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_fill_creates_prepared_slots(self):
+        created = self.pool.fill("demo", size=2)
+        self.assertEqual([p.name for p in created], ["demo-pool-1", "demo-pool-2"])
+        self.assertTrue((created[0] / ".venv").is_symlink())
+        self.assertEqual(self.pool.fill("demo", size=2), [])
+
+    def test_acquire_hit_release_recycle(self):
+        self.pool.fill("demo", size=1)
+        slot = self.pool.acquire("demo", "fix-1")
+        self.assertEqual(slot.name, "demo-pool-1")
+        (slot / "app.py").write_text("broken\n")
+        (slot / "scratch.txt").write_text("tmp\n")
+
+        self.pool.release(slot)
+        self.assertEqual((slot / "app.py").read_text(), "print('hi')\n")
+        self.assertFalse((slot / "scratch.txt").exists())
+        self.assertTrue((slot / ".venv").exists())
+
+        self.assertEqual(self.pool.acquire("demo", "fix-2"), slot)
+        self.assertEqual(self.pool.status()["demo"]["hits"], 2)
+
+    def test_miss_falls_back_to_fresh_worktree(self):
+        self.pool.fill("demo", size=1)
+        self.pool.acquire("demo", "fix-1")
+        with self.assertRaises(PoolError):
+            self.pool.acquire("demo", "fix-2", fallback=False)
+        fresh = self.pool.acquire("demo", "fix-3")
+        self.assertEqual(fresh.name, "demo-fix-3")
+        status = self.pool.status()["demo"]
+        self.assertEqual((status["hits"], status["misses"], status["leased"]), (1, 2, 1))
+        self.pool.release(fresh)
+        self.assertFalse(fresh.exists())
+
+    def run_cli(self, *args):
+        env = {**os.environ, "CLAWD_HOME": str(self.root)}
+        return subprocess.run([sys.executable, str(POOL_SCRIPT), *args], env=env, capture_output=True, text=True)
+
+    def test_cli_lease_outlives_the_acquiring_process(self):
+        self.pool.fill("demo", size=1)
+        acquired = self.run_cli("acquire", "demo", "fix-1", "--no-fallback")
+        slot = Path(acquired.stdout.strip())
+        self.assertEqual(slot.name, "demo-pool-1")
+        (slot / "app.py").write_text("work in progress\n")
+        (slot / "new.txt").write_text("new\n")
+
+        # The first CLI has exited, but its fix is still using the slot
+        self.assertEqual(self.run_cli("acquire", "demo", "fix-2", "--no-fallback").returncode, 1)
+        self.assertEqual((slot / "app.py").read_text(), "work in progress\n")
+        self.assertTrue((slot / "new.txt").exists())
+
+        self.assertEqual(self.run_cli("release", str(slot)).returncode, 0)
+        self.assertEqual(Path(self.run_cli("acquire", "demo", "fix-2", "--no-fallback").stdout.strip()), slot)
+
+    def test_expired_lease_is_reclaimed_only_when_clean(self):
+        self.pool.fill("demo", size=1)
+        slot = self.pool.acquire("demo", "fix-1")
+        lease = self.pool.pool_dir / "demo-pool-1.lease"
+        self.assertEqual(json.loads(lease.read_text())["branch"], "fix-1")
+        lease.write_text(json.dumps({"branch": "fix-1", "acquired": time.time() - WORKTREE_LEASE_TTL - 60}))
+        self.assertEqual(self.pool.status()["demo"]["expired"], 1)
+
+        (slot / "app.py").write_text("half-done\n")
+        with self.assertRaises(PoolError):
+            self.pool.acquire("demo", "fix-2", fallback=False)
+        self.assertEqual((slot / "app.py").read_text(), "half-done\n")
+
+        git("checkout", "-q", "app.py", cwd=slot)
+        self.assertEqual(self.pool.acquire("demo", "fix-2", fallback=False), slot)
+        branch = subprocess.run(["git", "branch", "--show-current"], cwd=slot, capture_output=True, text=True)
+        self.assertEqual(branch.stdout.strip(), "fix-2")
+        self.assertEqual(self.pool.status()["demo"]["expired"], 0)
+
+    def test_unknown_project(self):
+        with self.assertRaises(PoolError):
+            self.pool.acquire("nope", "fix-1")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -7,7 +7,7 @@
 # Example:
 #   worktree-cleanup.sh polymarket-sentry-fix-12345
 #
-# This will:
+# This will (pool worktrees <project>-pool-<n> are reset and recycled instead):
 #   1. Remove the worktree directory
 #   2. Prune the worktree reference from git
 #   3. Optionally delete the branch
@@ -28,6 +28,12 @@ if [[ ! -d "$WORKTREE_PATH" ]]; then
     exit 1
 fi
 
+# Pool worktrees are reset and recycled instead of removed
+if [[ "$WORKTREE_NAME" == *-pool-* ]]; then
+    python3 "$CLAWD_HOME/scripts/worktree_pool.py" release "$WORKTREE_PATH"
+    exit $?
+fi
+
 # Extract project and branch from worktree name
 # Format: <project>-<branch>
 PROJECT=$(echo "$WORKTREE_NAME" | cut -d'-' -f1)
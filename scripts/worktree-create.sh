@@ -42,6 +42,18 @@ if [[ ! -d "$PROJECT_PATH" ]]; then
     exit 1
 fi
 
+# Prefer a pre-warmed pool worktree (see worktree_pool.py)
+if POOL_PATH=$(python3 "$CLAWD_HOME/scripts/worktree_pool.py" acquire "$PROJECT" "$BRANCH" --no-fallback 2>/dev/null); then
+    echo "[OK] Pool worktree ready on branch $BRANCH"
+    echo ""
+    echo "To work in the worktree:"
+    echo "  cd $POOL_PATH"
+    echo ""
+    echo "When done:"
+    echo "  $CLAWD_HOME/scripts/worktree-cleanup.sh $(basename "$POOL_PATH")"
+    exit 0
+fi
+
 # Worktree destination
 WORKTREE_NAME="${PROJECT}-${BRANCH}"
 WORKTREE_PATH="$WORKSPACE_DIR/$WORKTREE_NAME"
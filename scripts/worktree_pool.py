@@ -0,0 +1,318 @@
+#!/usr/bin/env python3
+"""
+Worktree Pool - Pre-checked-out git worktrees for fix tasks.
+
+Keeps N clean worktrees per project (from config/repositories.json) at
+~/clawd/workspace/<project>-pool-<n>/ with the project venv linked and
+.env copied. Acquiring a slot takes an exclusive lease file and checks out
+the fix branch from the project's HEAD, which only touches changed files.
+Releasing resets and cleans the slot (ignored files such as caches are kept
+warm) and detaches it for reuse. Leases record the branch they were taken
+for and are only ended by release (worktree-cleanup.sh); the acquiring
+process exits as soon as it prints the path, so its pid says nothing. A
+lease older than WORKTREE_LEASE_TTL whose worktree is clean is assumed
+abandoned and reclaimed by the next acquire; a dirty worktree is never
+reclaimed.
+
+Usage:
+    python scripts/worktree_pool.py fill [project] [--size N]
+    python scripts/worktree_pool.py acquire <project> <branch> [--no-fallback]
+    python scripts/worktree_pool.py release <worktree-path>
+    python scripts/worktree_pool.py status
+
+Environment:
+    CLAWD_HOME - Clawd directory (default: ~/clawd)
+    WORKTREE_POOL_SIZE - Slots per project (default: 2)
+    WORKTREE_LEASE_TTL - Seconds before a clean, unreleased slot is reclaimed (default: 172800)
+"""
+
+import argparse
+import fcntl
+import json
+import os
+import shutil
+import subprocess
+import sys
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Optional
+
+CLAWD_HOME = Path(os.environ.get("CLAWD_HOME", Path.home() / "clawd"))
+WORKSPACE_DIR = CLAWD_HOME / "workspace"
+CONFIG_FILE = CLAWD_HOME / "config" / "repositories.json"
+WORKTREE_POOL_SIZE = int(os.environ.get("WORKTREE_POOL_SIZE", 2))
+WORKTREE_LEASE_TTL = int(os.environ.get("WORKTREE_LEASE_TTL", 2 * 24 * 3600))
+
+
+class PoolError(Exception):
+    """Raised when a worktree cannot be handed out or returned."""
+
+
+def load_projects(config_file: Path = CONFIG_FILE) -> dict:
+    """Projects from repositories.json with paths expanded."""
+    with open(config_file) as f:
+        projects = json.load(f).get("projects", {})
+    for config in projects.values():
+        config["path"] = str(Path(config["path"]).expanduser())
+    return projects
+
+
+def git(*args, cwd: Path) -> str:
+    result = subprocess.run(["git", *args], cwd=cwd, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise PoolError(f"git {' '.join(args)} failed in {cwd}: {result.stderr.strip()}")
+    return result.stdout.strip()
+
+
+class WorktreePool:
+    """Per-project pool of reusable worktrees with atomic leases."""
+
+    def __init__(self, workspace_dir: Path = WORKSPACE_DIR, config_file: Path = CONFIG_FILE):
+        self.workspace_dir = Path(workspace_dir)
+        self.pool_dir = self.workspace_dir / ".pool"
+        self.projects = load_projects(config_file)
+
+    # -- Paths ----------------------------------------------------------------
+
+    def _project(self, project: str) -> dict:
+        if project not in self.projects:
+            raise PoolError(f"Unknown project: {project} (available: {', '.join(self.projects)})")
+        return self.projects[project]
+
+    def slot_path(self, project: str, n: int) -> Path:
+        return self.workspace_dir / f"{project}-pool-{n}"
+
+    def slots(self, project: str) -> list:
+        slots = [
+            p for p in self.workspace_dir.glob(f"{project}-pool-*")
+            if p.name.rsplit("-", 1)[1].isdigit()
+        ]
+        return sorted(slots, key=lambda p: int(p.name.rsplit("-", 1)[1]))
+
+    def _lease_path(self, slot: Path) -> Path:
+        return self.pool_dir / f"{slot.name}.lease"
+
+    def _slot_project(self, path: Path) -> Optional[str]:
+        name = Path(path).name
+        if "-pool-" not in name or not name.rsplit("-", 1)[1].isdigit():
+            return None
+        project = name.rsplit("-pool-", 1)[0]
+        return project if project in self.projects else None
+
+    # -- Environment ------------------------------------------------------------
+
+    def _prepare_env(self, project: str, worktree: Path):
+        """Link the project venv and copy .env, as worktree-create.sh does."""
+        config = self._project(project)
+        project_path = Path(config["path"])
+        venv = project_path / config.get("venv", ".venv")
+        link = worktree / config.get("venv", ".venv")
+        if venv.is_dir() and not link.exists():
+            link.symlink_to(venv)
+        env_file = project_path / ".env"
+        if env_file.is_file():
+            shutil.copy2(env_file, worktree / ".env")
+
+    # -- Pool operations --------------------------------------------------------
+
+    def fill(self, project: str, size: int = None) -> list:
+        """Create missing slots up to `size`. Returns the slots created."""
+        config = self._project(project)
+        size = size or config.get("worktree_pool_size", WORKTREE_POOL_SIZE)
+        project_path = Path(config["path"])
+        self.workspace_dir.mkdir(parents=True, exist_ok=True)
+
+        created = []
+        for n in range(1, size + 1):
+            slot = self.slot_path(project, n)
+            if slot.exists():
+                continue
+            git("worktree", "add", "--detach", str(slot), "HEAD", cwd=project_path)
+            self._prepare_env(project, slot)
+            created.append(slot)
+        return created
+
+    def _try_lease(self, slot: Path, branch: str) -> bool:
+        self.pool_dir.mkdir(parents=True, exist_ok=True)
+        try:
+            fd = os.open(self._lease_path(slot), os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            return False
+        with os.fdopen(fd, "w") as f:
+            json.dump({"branch": branch, "acquired": time.time()}, f)
+        return True
+
+    def _lease_age(self, slot: Path) -> Optional[float]:
+        """Seconds since the slot was leased; None if it is not leased."""
+        lease = self._lease_path(slot)
+        try:
+            text, acquired = lease.read_text(), lease.stat().st_mtime
+        except FileNotFoundError:
+            return None
+        try:
+            acquired = json.loads(text)["acquired"]
+        except (ValueError, KeyError, TypeError):
+            pass  # Half-written or old pid-only lease: fall back to its mtime
+        return time.time() - acquired
+
+    def _reclaim_lease(self, slot: Path, branch: str) -> bool:
+        """Take over a lease past its TTL whose worktree has nothing uncommitted."""
+        with open(self.pool_dir / "lease.lock", "w") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            age = self._lease_age(slot)
+            if age is None or age < WORKTREE_LEASE_TTL:
+                return False
+            if git("status", "--porcelain", cwd=slot):
+                return False  # Someone's work is in there; only release may reset it
+            lease = self._lease_path(slot)
+            tmp = lease.with_suffix(f".{os.getpid()}.tmp")
+            tmp.write_text(json.dumps({"branch": branch, "acquired": time.time()}))
+            os.replace(tmp, lease)
+            return True
+
+    def _drop_lease(self, slot: Path):
+        try:
+            self._lease_path(slot).unlink()
+        except FileNotFoundError:
+            pass
+
+    def acquire(self, project: str, branch: str, fallback: bool = True) -> Path:
+        """Hand out a worktree on a new `branch` from the project's HEAD.
+
+        Uses a free pool slot if there is one (hit); otherwise creates a fresh
+        worktree at workspace/<project>-<branch> (miss) unless fallback=False.
+        """
+        config = self._project(project)
+        project_path = Path(config["path"])
+        base = git("rev-parse", "HEAD", cwd=project_path)
+
+        for slot in self.slots(project):
+            leased = self._try_lease(slot, branch)
+            reclaimed = not leased and self._reclaim_lease(slot, branch)
+            if not (leased or reclaimed):
+                continue
+            try:
+                if reclaimed:
+                    self._reset(project, slot)  # Abandoned on its old branch, but clean
+                git("checkout", "-q", "-b", branch, base, cwd=slot)
+            except PoolError:
+                self._drop_lease(slot)
+                raise
+            self._record(project, "hits")
+            return slot
+
+        self._record(project, "misses")
+        if not fallback:
+            raise PoolError(f"No free pool worktree for {project}")
+
+        worktree = self.workspace_dir / f"{project}-{branch}"
+        if worktree.exists():
+            raise PoolError(f"Worktree already exists: {worktree}")
+        self.workspace_dir.mkdir(parents=True, exist_ok=True)
+        git("worktree", "add", "-b", branch, str(worktree), base, cwd=project_path)
+        self._prepare_env(project, worktree)
+        return worktree
+
+    def release(self, path: Path):
+        """Reset and recycle a pool slot, or remove a fallback worktree."""
+        path = Path(path)
+        project = self._slot_project(path)
+        if project is None:
+            # Not a pool slot: remove it like worktree-cleanup.sh would
+            common_dir = git("rev-parse", "--path-format=absolute", "--git-common-dir", cwd=path)
+            git("worktree", "remove", "--force", str(path), cwd=Path(common_dir).parent)
+            return
+
+        self._reset(project, path)
+        self._drop_lease(path)
+
+    def _reset(self, project: str, slot: Path):
+        venv = self.projects[project].get("venv", ".venv")
+        git("reset", "-q", "--hard", cwd=slot)
+        # Keep ignored files (caches, build output) and the linked env warm
+        git("clean", "-q", "-fd", "-e", venv, "-e", ".env", cwd=slot)
+        git("checkout", "-q", "--detach", cwd=slot)
+
+    # -- Stats ------------------------------------------------------------------
+
+    @contextmanager
+    def _stats_file(self):
+        self.pool_dir.mkdir(parents=True, exist_ok=True)
+        with open(self.pool_dir / "stats.lock", "w") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            stats_file = self.pool_dir / "stats.json"
+            stats = json.loads(stats_file.read_text()) if stats_file.exists() else {}
+            yield stats
+            tmp = stats_file.with_suffix(".tmp")
+            tmp.write_text(json.dumps(stats, indent=2))
+            os.replace(tmp, stats_file)
+
+    def _record(self, project: str, key: str):
+        with self._stats_file() as stats:
+            counts = stats.setdefault(project, {"hits": 0, "misses": 0})
+            counts[key] += 1
+
+    def status(self) -> dict:
+        """Per-project slot counts, leases and hit rate."""
+        with self._stats_file() as stats:
+            counts = dict(stats)
+        report = {}
+        for project in self.projects:
+            slots = self.slots(project)
+            hits = counts.get(project, {}).get("hits", 0)
+            misses = counts.get(project, {}).get("misses", 0)
+            report[project] = {
+                "slots": len(slots),
+                "leased": sum(1 for s in slots if self._lease_path(s).exists()),
+                "expired": sum(1 for s in slots if (self._lease_age(s) or 0) >= WORKTREE_LEASE_TTL),
+                "hits": hits,
+                "misses": misses,
+                "hit_rate": round(hits / (hits + misses), 2) if hits + misses else None,
+            }
+        return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pre-warmed git worktree pool")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    fill = sub.add_parser("fill", help="Create missing pool slots")
+    fill.add_argument("project", nargs="?", help="Project key (default: all)")
+    fill.add_argument("--size", type=int, help="Slots per project")
+
+    acquire = sub.add_parser("acquire", help="Check out a branch in a pool worktree")
+    acquire.add_argument("project")
+    acquire.add_argument("branch")
+    acquire.add_argument("--no-fallback", action="store_true", help="Fail instead of creating a fresh worktree")
+
+    release = sub.add_parser("release", help="Reset and return a worktree")
+    release.add_argument("path", type=Path)
+
+    sub.add_parser("status", help="Show pool occupancy and hit rate")
+    args = parser.parse_args()
+
+    pool = WorktreePool()
+    try:
+        if args.command == "fill":
+            projects = [args.project] if args.project else list(pool.projects)
+            for project in projects:
+                if not Path(pool.projects[project]["path"]).is_dir():
+                    print(f"[WARN] Skipping {project}: project directory not found", file=sys.stderr)
+                    continue
+                for slot in pool.fill(project, args.size):
+                    print(f"[OK] Created {slot}")
+        elif args.command == "acquire":
+            print(pool.acquire(args.project, args.branch, fallback=not args.no_fallback))
+        elif args.command == "release":
+            pool.release(args.path)
+            print(f"[OK] Released {args.path}")
+        elif args.command == "status":
+            print(json.dumps(pool.status(), indent=2))
+    except PoolError as e:
+        print(f"[ERROR] {e}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+"""Time bulk rolls against the one-call-per-roll loop.
+
+Usage:
+    python bench_dice.py            # 1e6 rolls
+    python bench_dice.py 5000000
+"""
+import sys
+import time
+
+import dice
+
+
+def best_of(fn, repeat=3):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    n = int(float(sys.argv[1])) if len(sys.argv) > 1 else 1_000_000
+    backend = "numpy" if dice.np is not None else "pure Python"
+    print(f"{n:,} rolls of 1d6, bulk backend: {backend}")
+
+    loop = best_of(lambda: [dice.roll(6) for _ in range(n)])
+    bulk = best_of(lambda: dice.roll_many(n, 6, seed=1))
+    print(f"  per-call loop       {loop * 1000:8.1f} ms")
+    print(f"  roll_many           {bulk * 1000:8.1f} ms   {loop / bulk:5.1f}x")
+
+    rolls = dice.roll_many(n, 6, seed=1)
+    hist = best_of(lambda: dice.histogram(rolls, 1, 6))
+    print(f"  histogram           {hist * 1000:8.1f} ms")
+
+    loop_sums = best_of(lambda: [dice.roll(6) + dice.roll(6) for _ in range(n)])
+    sums = best_of(lambda: dice.roll_sums(n, 6, dice=2, seed=1))
+    print(f"  2d6 per-call loop   {loop_sums * 1000:8.1f} ms")
+    print(f"  roll_sums           {sums * 1000:8.1f} ms   {loop_sums / sums:5.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,132 @@
 import random
+from array import array
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+CHUNK = 1 << 16  # Rolls generated per random.choices call without NumPy
+
 
 def roll(sides):
     return random.randint(1, sides)
+
+
+def _typecode(high):
+    """Smallest unsigned array typecode that holds values up to high."""
+    return "B" if high < 1 << 8 else "H" if high < 1 << 16 else "L"
+
+
+def _dtype(high):
+    return np.uint8 if high < 1 << 8 else np.uint16 if high < 1 << 16 else np.uint32
+
+
+def _check(sides, dice):
+    if sides < 1 or dice < 1:
+        raise ValueError(f"need at least one die with at least one side, got {dice}d{sides}")
+
+
+def _byte_draws(rng, values, k):
+    """k uniform draws from values (at most 256 of them, each below 256) as a bytearray.
+
+    Random bytes that would bias the draw are deleted and the rest mapped to
+    values by bytes.translate, so no Python int is made per draw.
+    """
+    limit = 256 - 256 % len(values)
+    table = bytes(values[b % len(values)] if b < limit else 0 for b in range(256))
+    reject = bytes(range(limit, 256))
+    out = bytearray()
+    while len(out) < k:
+        out += rng.randbytes(k - len(out) + 64).translate(table, reject)
+    del out[k:]
+    return out
+
+
+def roll_many(n, sides=6, dice=1, seed=None):
+    """Roll `dice` dice with `sides` sides, `n` times, in one call.
+
+    Either backend returns a flat array of n * dice values of the smallest
+    unsigned type, roll by roll: a NumPy array if NumPy is installed, else
+    an array.array. Reshape to (n, dice) to group the dice of each roll. A
+    seed makes the result reproducible for the backend in use.
+    """
+    _check(sides, dice)
+    if np is not None:
+        return np.random.default_rng(seed).integers(1, sides + 1, size=n * dice, dtype=_dtype(sides))
+    rng = random.Random(seed)
+    faces = range(1, sides + 1)
+    rolls = array(_typecode(sides))
+    if sides < 256:
+        rolls.frombytes(_byte_draws(rng, faces, n * dice))
+        return rolls
+    remaining = n * dice
+    while remaining:
+        k = min(CHUNK, remaining)
+        rolls.extend(rng.choices(faces, k=k))
+        remaining -= k
+    return rolls
+
+
+def roll_sums(n, sides=6, dice=2, seed=None):
+    """Totals of `n` rolls of `dice` dice, as a compact 1-D array."""
+    _check(sides, dice)
+    high = sides * dice
+    if np is not None:
+        rolls = np.random.default_rng(seed).integers(1, sides + 1, size=(n, dice), dtype=_dtype(high))
+        return rolls.sum(axis=1, dtype=_dtype(high))
+    rng = random.Random(seed)
+    if sides ** dice <= 256:
+        # One random byte picks a whole outcome; the table maps it to its total
+        outcomes = []
+        for outcome in range(sides ** dice):
+            total = dice
+            for _ in range(dice):
+                outcome, face = divmod(outcome, sides)
+                total += face
+            outcomes.append(total)
+        sums = array("B")
+        sums.frombytes(_byte_draws(rng, outcomes, n))
+        return sums
+    # Draw totals straight from the exact distribution: one draw per roll, not per die
+    totals = range(dice, high + 1)
+    cum_weights = []
+    running = 0
+    for ways in _sum_ways(sides, dice)[dice:]:
+        running += ways
+        cum_weights.append(running)
+    sums = array(_typecode(high))
+    remaining = n
+    while remaining:
+        k = min(CHUNK, remaining)
+        sums.extend(rng.choices(totals, cum_weights=cum_weights, k=k))
+        remaining -= k
+    return sums
+
+
+def histogram(values, low, high):
+    """Counts of each value from low to high in an array from roll_many or roll_sums."""
+    if np is not None and isinstance(values, np.ndarray):
+        return np.bincount(values.ravel(), minlength=high + 1)[low:high + 1].tolist()
+    if getattr(values, "typecode", None) == "B":
+        values = values.tobytes()  # bytes.count scans in C
+    return [values.count(v) for v in range(low, high + 1)]
+
+
+def _sum_ways(sides, dice):
+    """ways[t] = number of the sides ** dice outcomes that total t."""
+    ways = [1]
+    for _ in range(dice):
+        step = [0] * (len(ways) + sides)
+        for total, count in enumerate(ways):
+            if count:
+                for face in range(1, sides + 1):
+                    step[total + face] += count
+        ways = step
+    return ways
+
+
+def sum_distribution(sides=6, dice=2):
+    """Exact probability of each total, as {total: probability}."""
+    outcomes = sides ** dice
+    return {total: ways / outcomes for total, ways in enumerate(_sum_ways(sides, dice)) if ways}
@@ -1,4 +1,6 @@
 import unittest
+from unittest import mock
+
 import dice
 
 class TestDice(unittest.TestCase):
@@ -14,5 +16,79 @@ class TestDice(unittest.TestCase):
         results = [dice.roll(6) for _ in range(10)]
         self.assertTrue(len(set(results)) > 1)
 
+
+class TestBulkRolls(unittest.TestCase):
+    """Runs on the pure-Python fallback; TestBulkRollsNumPy repeats it with NumPy."""
+
+    def setUp(self):
+        patcher = mock.patch.object(dice, "np", self.backend())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def backend(self):
+        return None
+
+    def test_roll_many_in_range_and_compact(self):
+        rolls = dice.roll_many(10000, 6, seed=1)
+        self.assertEqual(len(rolls), 10000)
+        self.assertEqual((min(rolls), max(rolls)), (1, 6))
+        self.assertEqual(rolls.itemsize, 1)
+
+    def test_seed_is_reproducible(self):
+        self.assertEqual(list(dice.roll_many(100, 20, seed=7)), list(dice.roll_many(100, 20, seed=7)))
+        self.assertNotEqual(list(dice.roll_many(100, 20, seed=7)), list(dice.roll_many(100, 20, seed=8)))
+
+    def test_several_dice_per_roll(self):
+        rolls = dice.roll_many(500, 6, dice=3, seed=2)
+        self.assertEqual(len(rolls), 1500)
+        self.assertEqual((min(rolls), max(rolls)), (1, 6))
+
+    def test_rejects_dice_without_sides(self):
+        for sides, count in [(0, 1), (-6, 1), (6, 0)]:
+            with self.subTest(sides=sides, dice=count):
+                with self.assertRaises(ValueError):
+                    dice.roll_many(10, sides, dice=count)
+                with self.assertRaises(ValueError):
+                    dice.roll_sums(10, sides, dice=count)
+
+    def test_histogram_counts_every_roll(self):
+        counts = dice.histogram(dice.roll_many(60000, 6, seed=3), 1, 6)
+        self.assertEqual(sum(counts), 60000)
+        for count in counts:
+            self.assertAlmostEqual(count / 60000, 1 / 6, delta=0.01)
+
+    def test_sums_follow_exact_distribution(self):
+        sums = dice.roll_sums(100000, 6, dice=2, seed=4)
+        self.assertEqual((min(sums), max(sums)), (2, 12))
+        expected = dice.sum_distribution(6, 2)
+        for total, count in zip(range(2, 13), dice.histogram(sums, 2, 12)):
+            self.assertAlmostEqual(count / 100000, expected[total], delta=0.01)
+
+    def test_large_dice_and_many_dice(self):
+        rolls = dice.roll_many(2000, 1000, seed=5)
+        self.assertTrue(1 <= min(rolls) and max(rolls) <= 1000)
+        self.assertEqual(rolls.itemsize, 2)
+        sums = dice.roll_sums(20000, 6, dice=4, seed=6)
+        self.assertTrue(4 <= min(sums) and max(sums) <= 24)
+        self.assertAlmostEqual(sum(dice.histogram(sums, 4, 24)[10:]) / 20000, 0.56, delta=0.02)
+
+
+@unittest.skipIf(dice.np is None, "NumPy not installed")
+class TestBulkRollsNumPy(TestBulkRolls):
+    def backend(self):
+        return dice.np
+
+
+class TestSumDistribution(unittest.TestCase):
+    def test_two_dice(self):
+        dist = dice.sum_distribution(6, 2)
+        self.assertEqual(sorted(dist), list(range(2, 13)))
+        self.assertAlmostEqual(dist[7], 6 / 36)
+        self.assertAlmostEqual(sum(dist.values()), 1.0)
+
+    def test_one_die_is_uniform(self):
+        self.assertEqual(dice.sum_distribution(4, 1), {1: 0.25, 2: 0.25, 3: 0.25, 4: 0.25})
+
+
 if __name__ == '__main__':
     unittest.main()